@@ -1,53 +1,360 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+from __future__ import annotations
+
 import os
 import sys
 import time
 import re
+import gzip
+import json
+import asyncio
+import queue
+import shutil
+import sqlite3
+import hashlib
+import importlib.util
+import random
 import logging
-from datetime import datetime, timedelta
-from typing import Optional, Tuple
-from dataclasses import dataclass
+import logging.handlers
+import threading
+import argparse
+import contextvars
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+from html.parser import HTMLParser
+from http.cookies import SimpleCookie
+from email.utils import parsedate_to_datetime
+from dataclasses import dataclass, fields
 from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+import urllib3
 from selenium.common.exceptions import (
     UnexpectedAlertPresentException,
     TimeoutException,
     WebDriverException,
-    NoSuchElementException
+    NoSuchElementException,
+    InvalidSessionIdException,
+    NoSuchWindowException,
+    NoAlertPresentException
 )
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
+
+try:
+    import psutil
+except ImportError:  # opcional: sem ele a memória do navegador é lida de /proc (Linux)
+    psutil = None
+
+
+class ImportacaoTardia:
+    """Módulo (ou nome dentro dele) importado só no primeiro uso"""
+
+    def __init__(self, modulo: str, nome: Optional[str] = None):
+        self._modulo = modulo
+        self._nome = nome
+        self._alvo = None
+
+    def _carregar(self):
+        if self._alvo is None:
+            alvo = importlib.import_module(self._modulo)
+            self._alvo = getattr(alvo, self._nome) if self._nome else alvo
+        return self._alvo
+
+    def __getattr__(self, nome):
+        return getattr(self._carregar(), nome)
+
+    def __call__(self, *args, **kwargs):
+        return self._carregar()(*args, **kwargs)
+
+
+# selenium.webdriver importa todos os navegadores: fica para quando o driver for criado de fato
+webdriver = ImportacaoTardia("selenium.webdriver")
+By = ImportacaoTardia("selenium.webdriver.common.by", "By")
+WebDriverWait = ImportacaoTardia("selenium.webdriver.support.ui", "WebDriverWait")
+EC = ImportacaoTardia("selenium.webdriver.support.expected_conditions")
+Options = ImportacaoTardia("selenium.webdriver.chrome.options", "Options")
+Service = ImportacaoTardia("selenium.webdriver.chrome.service", "Service")
+FirefoxOptions = ImportacaoTardia("selenium.webdriver.firefox.options", "Options")
+sync_playwright = ImportacaoTardia("playwright.sync_api", "sync_playwright")  # opcional
 
 
 # Configurações
 @dataclass
 class Config:
     URL_LOGIN: str = "https://sisref.inss.gov.br/entrada.php"
-    TEMPO_ESPERA_CAPTCHA: int = 6
+    TEMPO_ESPERA_CAPTCHA: int = 6  # limite; o login segue assim que o CAPTCHA estiver preenchido
+    TAMANHO_CAPTCHA: int = 0  # caracteres do CAPTCHA (0 usa o maxlength do campo)
+    SELETOR_CAPTCHA: str = "input[name*='captcha' i], input[id*='captcha' i]"
+    ESPERA_MAXIMA_PAGINA: int = 3  # limite (segundos) para os campos do ponto aparecerem após o login
+    PAUSA_ANTES_DE_SAIR: int = 0  # segundos de pausa antes de encerrar quando SAIR_APOS_CALCULAR_HORARIO
     HORAS_TRABALHO_MINIMAS: int = 6
     MAX_TENTATIVAS_LOGIN: int = 3
+
+    # Política de novas tentativas: backoff exponencial com jitter e disjuntor
+    BACKOFF_BASE: float = 2.0  # segundos da primeira espera entre tentativas
+    BACKOFF_MAXIMO: float = 120.0  # maior espera entre tentativas
+    LIMITE_FALHAS_DISJUNTOR: int = 5  # falhas seguidas que abrem o disjuntor (no login, até MAX_TENTATIVAS_LOGIN - 1)
+    TEMPO_ABERTURA_DISJUNTOR: float = 300.0  # segundos com o disjuntor aberto antes de testar de novo
     TIMEOUT_PADRAO: int = 15
+
+    # Timeouts adaptativos: cada espera usa um percentil alto das latências já observadas naquele ponto
+    USAR_TIMEOUTS_ADAPTATIVOS: bool = True
+    ARQUIVO_TIMEOUTS: str = "timeouts_adaptativos.json"
+    PERCENTIL_TIMEOUT: float = 0.99
+    FATOR_TIMEOUT: float = 1.5  # multiplicador aplicado ao percentil
+    MARGEM_TIMEOUT: float = 1.0  # segundos somados depois do multiplicador
+    TIMEOUT_MINIMO: float = 3.0
+    TIMEOUT_MAXIMO: float = 60.0
+    AMOSTRAS_MINIMAS_TIMEOUT: int = 10  # abaixo disso usa o timeout fixo do código
     INTERVALO_VERIFICACAO: int = 5  # segundos entre verificações do relógio
     SAIR_APOS_CALCULAR_HORARIO: bool = True  # Nova opção para sair após calcular horário
+    NAVEGADOR_HEADLESS: bool = False  # Chrome sem janela (o CAPTCHA precisa ser resolvido de outra forma)
+    BACKEND_NAVEGADOR: str = "chrome"  # "chrome", "chrome-headless-shell", "firefox" ou "playwright"
+    CAMINHO_CHROME_HEADLESS_SHELL: str = ""  # vazio: procura chrome-headless-shell no PATH
+
+    # Agendador: dorme até perto do horário de saída em vez de verificar a cada INTERVALO_VERIFICACAO
+    MODO_AGENDADOR: bool = False
+    ANTECEDENCIA_AGENDADOR: int = 120  # segundos antes da saída em que passa a verificar mais vezes
+    INTERVALO_MINIMO_AGENDADOR: int = 1  # menor intervalo (segundos) perto do horário de saída
+    INTERVALO_MAXIMO_AGENDADOR: int = 1800  # maior sono contínuo (segundos), para não perder a sessão
+    MAX_DESPERTARES_AGENDADOR: int = 60  # limite de despertares antes de dormir direto até a saída
+
+    # Estimador do relógio do servidor: amostra o relógio da página e responde o horário localmente
+    USAR_ESTIMADOR_RELOGIO: bool = False
+    AMOSTRAS_RELOGIO: int = 3  # leituras do relógio da página em cada sincronização
+    INTERVALO_AMOSTRAS_RELOGIO: float = 1.3  # segundos entre leituras (não inteiro, para refinar a fração)
+    ERRO_MAXIMO_RELOGIO: float = 2.0  # erro estimado (segundos) a partir do qual ressincroniza
+    DERIVA_MAXIMA_RELOGIO: float = 0.001  # deriva assumida entre relógios (segundos por segundo)
+
+    # Cache de seletores: tenta primeiro o seletor que funcionou na última execução
+    USAR_CACHE_SELETORES: bool = True
+    ARQUIVO_CACHE_SELETORES: str = "cache_seletores.json"
+
+    # Sonda em lote: resolve todos os seletores candidatos em um único execute_script
+    USAR_SONDA_LOTE: bool = True
+
+    # Perfil enxuto: após o login, troca o Chrome visível por um headless sem imagens, fontes e analytics
+    PERFIL_ENXUTO: bool = False
+
+    # Pool de drivers pré-aquecidos: mantém um Chrome pronto em segundo plano
+    USAR_POOL_DRIVERS: bool = False
+    REPOR_DRIVER_POOL: bool = True  # cria um novo driver ocioso depois de entregar o anterior
+    IDADE_MAXIMA_DRIVER_OCIOSO: int = 900  # segundos até descartar e recriar o driver ocioso
+    INTERVALO_VERIFICACAO_POOL: int = 30  # segundos entre verificações de saúde do driver ocioso
+
+    # Inicialização: o Chrome do login sobe em paralelo com o banner e o estado salvo
+    INICIAR_DRIVER_EM_PARALELO: bool = True
+
+    # Instrumentação: contagem e latência de cada comando WebDriver por fase da execução
+    INSTRUMENTAR_WEBDRIVER: bool = False
+    ARQUIVO_METRICAS_WEBDRIVER: str = "metricas_webdriver.json"
+    PERFILADOR_PYTHON: str = ""  # "cprofile" ou "amostragem" (vazio desativa)
+    ARQUIVO_PERFIL_PYTHON: str = "perfil_python.prof"  # saída do cProfile
+    INTERVALO_AMOSTRAGEM_PERFIL: float = 0.01  # segundos entre amostras do perfilador por amostragem
+
+    # Sessão HTTP: após detectar a entrada, fecha o Chrome e acompanha a página por HTTP simples
+    MODO_SESSAO_HTTP: bool = False
+    # Segue o link do botão 'Encerrar' sem navegador, quando houver. Pula o confirm() e o JavaScript da página:
+    # só ative se o encerramento do SISREF for mesmo um GET simples
+    ENCERRAR_VIA_HTTP: bool = False
+    TIMEOUT_HTTP: float = 15  # segundos por requisição
+
+    # Modo daemon: fecha o navegador após calcular a saída e só volta a abri-lo perto do horário
+    MODO_DAEMON: bool = False
+    ANTECEDENCIA_DAEMON_MINUTOS: int = 5  # minutos antes da saída para reabrir o navegador
+
+    # Eventos do navegador (WebDriver BiDi): em vez de consultar o relógio, espera a página avisar das mudanças
+    USAR_EVENTOS_NAVEGADOR: bool = False
+
+    # Captura de debug: screenshot e HTML gravados em segundo plano, comprimidos e com retenção limitada
+    DIRETORIO_DEBUG: str = "debug"
+    MAX_ARQUIVOS_DEBUG: int = 40
+    MAX_MB_DEBUG: int = 50
+
+    # Logging: escrita em segundo plano (fila + listener), rotação comprimida e supressão de repetições
+    LOG_ASSINCRONO: bool = True
+    ARQUIVO_LOG: str = "ponto_inss.log"
+    LOG_MAX_MB: int = 5  # rotação por tamanho (0 desativa)
+    LOG_ROTACAO_DIARIA: bool = False  # rotação à meia-noite, usada quando LOG_MAX_MB = 0
+    LOG_BACKUPS: int = 7  # arquivos .gz mantidos
+    LOG_JSON: bool = False  # arquivo em linhas JSON (com fase e latência); o console segue legível
+    LOG_INTERVALO_REPETIDAS: float = 30  # segundos; linhas periódicas iguais (fora os números) são suprimidas
+
+    # Memória do navegador: RSS do chromedriver + Chrome amostrado no monitoramento, com teto opcional
+    VIGIAR_MEMORIA: bool = True
+    INTERVALO_VIGIA_MEMORIA: float = 60  # segundos entre amostras
+    TETO_MEMORIA_MB: int = 0  # acima disso recarrega a página e, se não bastar, troca o driver (0 só registra)
+    PERFIL_ECONOMIA_MEMORIA: bool = False  # flags do Chrome que reduzem processos e serviços em segundo plano
+
+    # Checkpoint: entrada, saída calculada e cookies gravados a cada mudança; após uma queda o
+    # monitoramento é retomado direto da sessão salva, sem novo login
+    USAR_CHECKPOINT: bool = True
+    ARQUIVO_CHECKPOINT: str = "checkpoint_ponto.json"
+
+    # Histórico de frequência: sincronização em lote para um SQLite local e relatórios de saldo
+    URL_HISTORICO: str = "frequencia.php?mes={mes:02d}&ano={ano}"  # relativa a URL_LOGIN; uma página por mês
+    ARQUIVO_HISTORICO: str = "historico_ponto.db"
+    MESES_HISTORICO_INICIAL: int = 3  # meses baixados na primeira sincronização
+
+
+# Formato do relógio da página (HH:MM:SS)
+PADRAO_HORARIO_RELOGIO = r'(\d{1,2}):(\d{2}):(\d{2})'
+
+# Seletores candidatos para cada elemento da página
+SELETORES_RELOGIO = [
+    "#relogio",
+    ".relogio",
+    "*[id*='relogio']",
+    "*[class*='relogio']",
+    "*[id*='hora']",
+    "*[class*='hora']",
+    "*[id*='time']",
+    "span[id*='clock']",
+    "div[id*='clock']"
+]
+
+SELETORES_BOTAO_ENCERRAR = [
+    "//img[@alt='Encerrar Expediente']",
+    "//button[contains(text(), 'Encerrar')]",
+    "//input[@value='Encerrar Expediente']",
+    "//a[contains(text(), 'Encerrar')]",
+    ".btn-encerrar",
+    "*[alt*='Encerrar']",
+    "*[title*='Encerrar']",
+    "*[onclick*='encerrar']",
+    "*[onclick*='Encerrar']"
+]
+
+
+def localizador(seletor: str) -> Tuple[str, str]:
+    """Converte um seletor (XPath se começar com '//', senão CSS) em localizador do Selenium"""
+    if seletor.startswith('//'):
+        return By.XPATH, seletor
+    return By.CSS_SELECTOR, seletor
 
 
 # Configuração de logging
-def configurar_logging():
-    """Configura o sistema de logging"""
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('ponto_inss.log', encoding='utf-8'),
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
+class FiltroFase(logging.Filter):
+    """Anota cada registro com a fase atual (avaliada na thread que gerou o log, antes da fila)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.fase = FASE_ATUAL.get()
+        return True
+
+
+class FiltroMensagensRepetidas(logging.Filter):
+    """Suprime mensagens periódicas repetidas (ignorando os números) dentro de um intervalo
+
+    Só atua nos registros marcados com extra={"repetivel": True}; avisos como "Tentativa de login 2/3"
+    ou um novo pedido de CAPTCHA nunca são suprimidos.
+    """
+
+    def __init__(self, intervalo: float, nivel_maximo: int = logging.INFO):
+        super().__init__()
+        self.intervalo = intervalo
+        self.nivel_maximo = nivel_maximo
+        self.ultimas: Dict[Tuple[int, str], float] = {}
+        self.suprimidas: Dict[Tuple[int, str], int] = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.intervalo <= 0 or record.levelno > self.nivel_maximo or not getattr(record, "repetivel", False):
+            return True
+
+        mensagem = record.getMessage()
+        chave = (record.levelno, re.sub(r'\d+', '#', mensagem))
+        agora = time.monotonic()
+
+        with self.lock:
+            ultima = self.ultimas.get(chave)
+            if ultima is not None and agora - ultima < self.intervalo:
+                self.suprimidas[chave] = self.suprimidas.get(chave, 0) + 1
+                return False
+
+            self.ultimas[chave] = agora
+            suprimidas = self.suprimidas.pop(chave, 0)
+
+        if suprimidas:
+            record.msg = f"{mensagem} (+{suprimidas} repetidas suprimidas)"
+            record.args = None
+        return True
+
+
+class FormatadorJson(logging.Formatter):
+    """Uma linha JSON por registro, com fase e latência quando disponíveis"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        registro = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "fase": getattr(record, "fase", None),
+            "mensagem": record.getMessage(),
+        }
+        latencia_ms = getattr(record, "latencia_ms", None)
+        if latencia_ms is not None:
+            registro["latencia_ms"] = round(latencia_ms, 1)
+        if record.exc_info:
+            registro["excecao"] = self.formatException(record.exc_info)
+        return json.dumps(registro, ensure_ascii=False)
+
+
+def comprimir_log_rotacionado(origem: str, destino: str):
+    """Rotator dos handlers de log: grava o arquivo rotacionado em gzip"""
+    with open(origem, "rb") as entrada, gzip.open(destino, "wb") as saida:
+        while True:
+            bloco = entrada.read(1024 * 1024)
+            if not bloco:
+                break
+            saida.write(bloco)
+    os.remove(origem)
+
+
+def configurar_logging(config: Optional[Config] = None) -> Optional[logging.handlers.QueueListener]:
+    """Configura o sistema de logging; no modo assíncrono devolve o listener (parar ao sair)"""
+    config = config or Config()
+    formato = '%(asctime)s - %(levelname)s - %(message)s'
+
+    if config.LOG_MAX_MB > 0:
+        arquivo = logging.handlers.RotatingFileHandler(
+            config.ARQUIVO_LOG, maxBytes=config.LOG_MAX_MB * 1024 * 1024,
+            backupCount=config.LOG_BACKUPS, encoding='utf-8')
+    elif config.LOG_ROTACAO_DIARIA:
+        arquivo = logging.handlers.TimedRotatingFileHandler(
+            config.ARQUIVO_LOG, when='midnight', backupCount=config.LOG_BACKUPS, encoding='utf-8')
+    else:
+        arquivo = logging.FileHandler(config.ARQUIVO_LOG, encoding='utf-8')
+
+    if isinstance(arquivo, logging.handlers.BaseRotatingHandler):
+        arquivo.namer = lambda nome: nome + ".gz"
+        arquivo.rotator = comprimir_log_rotacionado
+
+    arquivo.setFormatter(FormatadorJson() if config.LOG_JSON else logging.Formatter(formato))
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(logging.Formatter(formato))
+
+    filtros = [FiltroFase(), FiltroMensagensRepetidas(config.LOG_INTERVALO_REPETIDAS)]
+
+    if not config.LOG_ASSINCRONO:
+        for handler in (arquivo, console):
+            for filtro in filtros:
+                handler.addFilter(filtro)
+        logging.basicConfig(level=logging.INFO, handlers=[arquivo, console], force=True)
+        return None
+
+    # O loop só enfileira; a escrita em disco e no console acontece na thread do listener
+    fila: queue.Queue = queue.Queue(-1)
+    handler_fila = logging.handlers.QueueHandler(fila)
+    handler_fila.setFormatter(logging.Formatter('%(message)s'))
+    for filtro in filtros:
+        handler_fila.addFilter(filtro)
+
+    listener = logging.handlers.QueueListener(fila, arquivo, console, respect_handler_level=True)
+    listener.start()
+
+    logging.basicConfig(level=logging.INFO, handlers=[handler_fila], force=True)
+    return listener
 
 
 class CredenciaisManager:
@@ -72,217 +379,2848 @@ class CredenciaisManager:
         return siape, senha
 
 
-class WebDriverManager:
-    """Gerencia o WebDriver com configurações otimizadas"""
+class WebDriverManager:
+    """Gerencia o WebDriver com configurações otimizadas"""
+
+    # Recursos bloqueados no perfil enxuto (a página de login/CAPTCHA nunca usa este perfil). O botão 'Encerrar'
+    # é um <img>: sem a imagem ele pode ficar sem tamanho, por isso a sonda não exige tamanho de imagens
+    URLS_BLOQUEADAS_PERFIL_ENXUTO = [
+        "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp",
+        "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+        "*hotjar.com*", "*facebook.net*", "*clarity.ms*"
+    ]
+
+    # Perfil de economia de memória: um único processo de renderização e sem serviços em segundo plano
+    ARGUMENTOS_ECONOMIA_MEMORIA = [
+        "--renderer-process-limit=1",
+        "--process-per-site",
+        "--disable-background-networking",
+        "--disable-component-update",
+        "--disable-default-apps",
+        "--disable-sync",
+        "--no-first-run",
+        "--disable-features=Translate,OptimizationHints,MediaRouter,BackForwardCache,AutofillServerCommunication"
+    ]
+
+    @staticmethod
+    def criar_driver(enxuto: bool = False, headless: bool = False, economia_memoria: bool = False,
+                     eventos: bool = False, binario: str = "") -> webdriver.Chrome:
+        """Cria e configura o driver do Chrome (enxuto: headless, carregamento 'eager' e sem recursos pesados)"""
+        chrome_options = Options()
+        if binario:
+            chrome_options.binary_location = binario
+        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        chrome_options.add_experimental_option('useAutomationExtension', False)
+        chrome_options.add_argument("--disable-extensions")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_argument("--disable-web-security")
+        chrome_options.add_argument("--allow-running-insecure-content")
+
+        if enxuto or headless:
+            chrome_options.add_argument("--headless=new")
+            chrome_options.add_argument("--window-size=1280,800")
+
+        if enxuto:
+            chrome_options.page_load_strategy = "eager"
+
+        if economia_memoria:
+            for argumento in WebDriverManager.ARGUMENTOS_ECONOMIA_MEMORIA:
+                chrome_options.add_argument(argumento)
+
+        if eventos:
+            # Canal BiDi para os eventos; o confirm() fica aberto até ser tratado (e não é descartado sozinho).
+            # NucleoEventosNavegador aceita a confirmação do encerramento e descarta qualquer outro alerta
+            chrome_options.set_capability("webSocketUrl", True)
+            chrome_options.set_capability("unhandledPromptBehavior", "ignore")
+
+        try:
+            driver = webdriver.Chrome(options=chrome_options)
+            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+
+            if enxuto:
+                driver.execute_cdp_cmd("Network.enable", {})
+                driver.execute_cdp_cmd("Network.setBlockedURLs",
+                                       {"urls": WebDriverManager.URLS_BLOQUEADAS_PERFIL_ENXUTO})
+
+            return driver
+        except WebDriverException as e:
+            logging.error(f"Erro ao criar driver: {e}")
+            raise
+
+    @staticmethod
+    def restaurar_sessao(driver: webdriver.Chrome, cookies: List[dict], url: str):
+        """Abre a URL em outro driver reaproveitando os cookies da sessão autenticada"""
+        partes = urlsplit(url)
+        origem = f"{partes.scheme}://{partes.netloc}/"
+
+        try:
+            # Via CDP os cookies entram antes da primeira navegação (sem carregar a página duas vezes)
+            driver.execute_cdp_cmd("Network.enable", {})
+            for cookie in cookies:
+                parametros = {campo: cookie[campo] for campo in
+                              ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite") if campo in cookie}
+                if "expiry" in cookie:
+                    parametros["expires"] = cookie["expiry"]
+                parametros["url"] = origem
+                driver.execute_cdp_cmd("Network.setCookie", parametros)
+        except (AttributeError, WebDriverException):
+            driver.get(origem)
+            for cookie in cookies:
+                driver.add_cookie(cookie)
+
+        driver.get(url)
+
+
+class BackendNavegador:
+    """Operações de navegador usadas pelo SistemaInss: criar, navegar, sondar, preencher, clicar, alerta e fechar"""
+
+    NOME = ""
+    PERMITE_OUTRA_THREAD = True  # pode ser criado numa thread e usado em outra (pool e partida em paralelo)
+
+    # WebDriver do Selenium por baixo, quando houver (CDP, BiDi e a instrumentação de comandos dependem dele)
+    driver = None
+
+    @classmethod
+    def disponivel(cls) -> bool:
+        """Indica se o navegador deste backend está instalado"""
+        return True
+
+    @classmethod
+    def iniciar(cls, config: Config, enxuto: bool = False) -> BackendNavegador:
+        """Abre o navegador (enxuto: perfil headless sem recursos pesados, usado após o login)"""
+        raise NotImplementedError
+
+    def navegar(self, url: str):
+        raise NotImplementedError
+
+    @property
+    def url_atual(self) -> str:
+        raise NotImplementedError
+
+    def sondar(self, seletores: List[str], padrao: Optional[str] = None,
+               exigir_clicavel: bool = False) -> Optional[dict]:
+        """Resultado da SondaDOM: primeiro elemento encontrado, com índice, seletor, texto e valor"""
+        raise NotImplementedError
+
+    def preencher(self, seletor: str, texto: str):
+        raise NotImplementedError
+
+    def clicar(self, elemento):
+        """Clica por JavaScript num elemento devolvido por sondar()"""
+        raise NotImplementedError
+
+    def aguardar_alerta(self, timeout: float) -> Optional[str]:
+        """Aceita o alerta/confirmação que abrir em até timeout segundos e devolve o texto (None se não abrir)"""
+        raise NotImplementedError
+
+    def executar_script(self, script: str, *argumentos):
+        """Executa o corpo de uma função JavaScript que recebe os argumentos em 'arguments'"""
+        raise NotImplementedError
+
+    def cookies(self) -> List[dict]:
+        """Cookies da sessão no formato do Selenium"""
+        raise NotImplementedError
+
+    def restaurar_sessao(self, cookies: List[dict], url: str):
+        """Abre a URL reaproveitando os cookies de uma sessão autenticada"""
+        raise NotImplementedError
+
+    def recarregar(self):
+        raise NotImplementedError
+
+    def pid(self) -> Optional[int]:
+        """Processo raiz do navegador (para medir memória); None se o backend não expõe"""
+        return None
+
+    def capturar_tela(self) -> bytes:
+        raise NotImplementedError
+
+    def html(self) -> str:
+        raise NotImplementedError
+
+    def encerrar(self):
+        raise NotImplementedError
+
+    @staticmethod
+    def classe(nome: str) -> type:
+        """Classe do backend pelo nome usado em BACKEND_NAVEGADOR"""
+        for backend in (BackendChrome, BackendChromeHeadlessShell, BackendFirefox, BackendPlaywright):
+            if backend.NOME == nome:
+                return backend
+        raise ValueError(f"Backend de navegador desconhecido: {nome}")
+
+    @staticmethod
+    def criar(config: Config, enxuto: bool = False) -> BackendNavegador:
+        """Abre o navegador do backend configurado"""
+        return BackendNavegador.classe(config.BACKEND_NAVEGADOR).iniciar(config, enxuto)
+
+    @staticmethod
+    def criar_em_paralelo(config: Config, enxuto: bool = False) -> Future:
+        """Começa a abrir o navegador em outra thread; o chamador segue com o resto da inicialização"""
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="driver-antecipado")
+        futuro = executor.submit(BackendNavegador.criar, config, enxuto)
+        executor.shutdown(wait=False)
+        return futuro
+
+    @staticmethod
+    def descartar_em_paralelo(futuro: Future):
+        """Fecha (quando ficar pronto) um navegador aberto em paralelo que não chegou a ser usado"""
+        def fechar(concluido: Future):
+            if not concluido.cancelled() and not concluido.exception():
+                concluido.result().encerrar()
+
+        futuro.add_done_callback(fechar)
+
+
+class BackendSelenium(BackendNavegador):
+    """Backend sobre um WebDriver do Selenium"""
+
+    def __init__(self, driver: webdriver.Remote):
+        self.driver = driver
+
+    def navegar(self, url: str):
+        self.driver.get(url)
+
+    @property
+    def url_atual(self) -> str:
+        return self.driver.current_url
+
+    def sondar(self, seletores: List[str], padrao: Optional[str] = None,
+               exigir_clicavel: bool = False) -> Optional[dict]:
+        return SondaDOM.sondar(self.driver, seletores, padrao, exigir_clicavel)
+
+    def preencher(self, seletor: str, texto: str):
+        campo = self.driver.find_element(*localizador(seletor))
+        campo.clear()
+        campo.send_keys(texto)
+
+    def clicar(self, elemento):
+        self.driver.execute_script("arguments[0].click();", elemento)
+
+    def aguardar_alerta(self, timeout: float) -> Optional[str]:
+        try:
+            if timeout > 0:
+                WebDriverWait(self.driver, timeout).until(EC.alert_is_present())
+            # Sem timeout, uma consulta só: o WebDriverWait dormiria o intervalo dele antes de desistir
+            alerta = self.driver.switch_to.alert
+        except (TimeoutException, NoAlertPresentException):
+            return None
+
+        texto = alerta.text
+        alerta.accept()
+        return texto
+
+    def executar_script(self, script: str, *argumentos):
+        return self.driver.execute_script(script, *argumentos)
+
+    def cookies(self) -> List[dict]:
+        return self.driver.get_cookies()
+
+    def restaurar_sessao(self, cookies: List[dict], url: str):
+        WebDriverManager.restaurar_sessao(self.driver, cookies, url)
+
+    def recarregar(self):
+        self.driver.refresh()
+
+    def pid(self) -> Optional[int]:
+        # chromedriver/geckodriver: o navegador inteiro fica abaixo dele
+        return self.driver.service.process.pid
+
+    def capturar_tela(self) -> bytes:
+        return self.driver.get_screenshot_as_png()
+
+    def html(self) -> str:
+        return self.driver.page_source
+
+    def encerrar(self):
+        self.driver.quit()
+
+
+class BackendChrome(BackendSelenium):
+    """Google Chrome completo pelo chromedriver (padrão)"""
+
+    NOME = "chrome"
+
+    @classmethod
+    def iniciar(cls, config: Config, enxuto: bool = False) -> BackendChrome:
+        return cls(WebDriverManager.criar_driver(enxuto, config.NAVEGADOR_HEADLESS, config.PERFIL_ECONOMIA_MEMORIA,
+                                                 config.USAR_EVENTOS_NAVEGADOR))
+
+
+class BackendChromeHeadlessShell(BackendChrome):
+    """chrome-headless-shell: o Chrome sem interface, menor e mais rápido para subir (não serve para o CAPTCHA)"""
+
+    NOME = "chrome-headless-shell"
+
+    @staticmethod
+    def binario(config: Optional[Config] = None) -> Optional[str]:
+        """Caminho configurado ou o executável encontrado no PATH"""
+        if config and config.CAMINHO_CHROME_HEADLESS_SHELL:
+            return config.CAMINHO_CHROME_HEADLESS_SHELL
+        return shutil.which("chrome-headless-shell")
+
+    @classmethod
+    def disponivel(cls) -> bool:
+        return cls.binario(Config()) is not None
+
+    @classmethod
+    def iniciar(cls, config: Config, enxuto: bool = False) -> BackendChromeHeadlessShell:
+        binario = cls.binario(config)
+        if not binario:
+            raise WebDriverException("chrome-headless-shell não encontrado (configure CAMINHO_CHROME_HEADLESS_SHELL)")
+        return cls(WebDriverManager.criar_driver(enxuto, True, config.PERFIL_ECONOMIA_MEMORIA,
+                                                 config.USAR_EVENTOS_NAVEGADOR, binario))
+
+
+class BackendFirefox(BackendSelenium):
+    """Firefox pelo geckodriver (sem CDP: o perfil enxuto só troca a estratégia de carregamento)"""
+
+    NOME = "firefox"
+
+    @classmethod
+    def disponivel(cls) -> bool:
+        return shutil.which("firefox") is not None
+
+    @classmethod
+    def iniciar(cls, config: Config, enxuto: bool = False) -> BackendFirefox:
+        opcoes = FirefoxOptions()
+        if enxuto or config.NAVEGADOR_HEADLESS:
+            opcoes.add_argument("-headless")
+        if enxuto:
+            opcoes.page_load_strategy = "eager"
+            opcoes.set_preference("permissions.default.image", 2)
+        if config.USAR_EVENTOS_NAVEGADOR:
+            opcoes.set_capability("webSocketUrl", True)
+            opcoes.set_capability("unhandledPromptBehavior", "ignore")
+
+        try:
+            return cls(webdriver.Firefox(options=opcoes))
+        except WebDriverException as e:
+            logging.error(f"Erro ao criar driver do Firefox: {e}")
+            raise
+
+
+class BackendPlaywright(BackendNavegador):
+    """Chromium controlado pelo Playwright (opcional: pip install playwright && playwright install chromium)"""
+
+    NOME = "playwright"
+    PERMITE_OUTRA_THREAD = False  # a API síncrona do Playwright fica presa à thread que a iniciou
+
+    # Tipos de recurso bloqueados no perfil enxuto (equivalente às URLs bloqueadas por CDP no Chrome)
+    RECURSOS_BLOQUEADOS_PERFIL_ENXUTO = ("image", "font", "media")
+
+    def __init__(self, playwright, navegador, contexto, pagina):
+        self._playwright = playwright
+        self._navegador = navegador
+        self._contexto = contexto
+        self.pagina = pagina
+        self._alertas: List[str] = []
+        pagina.on("dialog", self._ao_dialogo)
+
+    @classmethod
+    def disponivel(cls) -> bool:
+        return importlib.util.find_spec("playwright") is not None
+
+    @classmethod
+    def iniciar(cls, config: Config, enxuto: bool = False) -> BackendPlaywright:
+        argumentos = list(WebDriverManager.ARGUMENTOS_ECONOMIA_MEMORIA) if config.PERFIL_ECONOMIA_MEMORIA else []
+        playwright = sync_playwright().start()
+        try:
+            navegador = playwright.chromium.launch(headless=enxuto or config.NAVEGADOR_HEADLESS, args=argumentos)
+            contexto = navegador.new_context()
+            if enxuto:
+                contexto.route("**/*", lambda rota: rota.abort()
+                               if rota.request.resource_type in cls.RECURSOS_BLOQUEADOS_PERFIL_ENXUTO
+                               else rota.continue_())
+            return cls(playwright, navegador, contexto, contexto.new_page())
+        except Exception:
+            playwright.stop()
+            raise
+
+    def _ao_dialogo(self, dialogo):
+        # Sem resposta o Playwright trava a página: aceita na hora e guarda o texto para aguardar_alerta()
+        self._alertas.append(dialogo.message)
+        dialogo.accept()
+
+    @staticmethod
+    def _funcao(script: str) -> str:
+        """Embrulha um script no formato do Selenium (corpo com 'arguments') numa função do Playwright"""
+        return f"(argumentos) => (function () {{ {script} }}).apply(null, argumentos)"
+
+    @staticmethod
+    def _seletor(seletor: str) -> str:
+        return f"xpath={seletor}" if seletor.startswith("//") else seletor
+
+    def navegar(self, url: str):
+        self.pagina.goto(url)
+
+    @property
+    def url_atual(self) -> str:
+        # Como no Selenium: um alerta que ninguém esperava interrompe quem consulta a página
+        if self._alertas:
+            raise UnexpectedAlertPresentException(alert_text=self._alertas[0])
+        try:
+            return self.pagina.evaluate("() => location.href")
+        except Exception:
+            return self.pagina.url  # navegação em andamento
+
+    def sondar(self, seletores: List[str], padrao: Optional[str] = None,
+               exigir_clicavel: bool = False) -> Optional[dict]:
+        candidatos = [[seletor, "xpath" if seletor.startswith('//') else "css"] for seletor in seletores]
+        resultado = self.pagina.evaluate_handle(self._funcao(SondaDOM.SCRIPT), [candidatos, padrao, exigir_clicavel])
+        try:
+            dados = resultado.evaluate(
+                "r => r && {indice: r.indice, seletor: r.seletor, texto: r.texto, valor: r.valor}")
+            if dados is None:
+                return None
+            dados["elemento"] = resultado.get_property("elemento").as_element()
+            return dados
+        finally:
+            resultado.dispose()
+
+    def preencher(self, seletor: str, texto: str):
+        self.pagina.fill(self._seletor(seletor), texto)
+
+    def clicar(self, elemento):
+        elemento.evaluate("elemento => elemento.click()")
+
+    def aguardar_alerta(self, timeout: float) -> Optional[str]:
+        limite = time.monotonic() + timeout
+        while not self._alertas and time.monotonic() < limite:
+            self.pagina.wait_for_timeout(100)  # processa os eventos da página enquanto espera
+        return self._alertas.pop(0) if self._alertas else None
+
+    def executar_script(self, script: str, *argumentos):
+        return self.pagina.evaluate(self._funcao(script), list(argumentos))
+
+    def cookies(self) -> List[dict]:
+        cookies = []
+        for cookie in self._contexto.cookies():
+            convertido = {campo: cookie[campo] for campo in
+                          ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite") if campo in cookie}
+            if cookie.get("expires", -1) > 0:
+                convertido["expiry"] = int(cookie["expires"])
+            cookies.append(convertido)
+        return cookies
+
+    def restaurar_sessao(self, cookies: List[dict], url: str):
+        partes = urlsplit(url)
+        convertidos = []
+        for cookie in cookies:
+            convertido = {"name": cookie["name"], "value": cookie["value"],
+                          "domain": cookie.get("domain") or partes.hostname, "path": cookie.get("path") or "/"}
+            for campo in ("secure", "httpOnly", "sameSite"):
+                if campo in cookie:
+                    convertido[campo] = cookie[campo]
+            if "expiry" in cookie:
+                convertido["expires"] = cookie["expiry"]
+            convertidos.append(convertido)
+
+        self._contexto.add_cookies(convertidos)
+        self.pagina.goto(url)
+
+    def recarregar(self):
+        self.pagina.reload()
+
+    def capturar_tela(self) -> bytes:
+        return self.pagina.screenshot()
+
+    def html(self) -> str:
+        return self.pagina.content()
+
+    def encerrar(self):
+        try:
+            self._navegador.close()
+        finally:
+            self._playwright.stop()
+
+
+class VigiaMemoria:
+    """Acompanha o RSS do driver (chromedriver/geckodriver) somado ao de todos os processos do navegador abaixo dele"""
+
+    def __init__(self, intervalo: float = 60, teto_bytes: int = 0, relogio: Optional[Relogio] = None):
+        self.intervalo = intervalo
+        self.teto_bytes = teto_bytes
+        self.relogio = relogio or Relogio()
+        self.amostras: List[Tuple[float, int]] = []  # (instante monotônico, bytes)
+        self.pico = 0
+        self.recargas = 0
+        self.reciclagens = 0
+        self._ultima: Optional[float] = None
+        self._recarregou = False
+        self._desativado = False
+
+    @staticmethod
+    def _filhos_proc() -> Dict[int, List[int]]:
+        """Mapa pai → filhos lido de /proc/<pid>/stat"""
+        filhos: Dict[int, List[int]] = {}
+        for nome in os.listdir("/proc"):
+            if not nome.isdigit():
+                continue
+            try:
+                with open(f"/proc/{nome}/stat", "rb") as f:
+                    dados = f.read()
+            except OSError:
+                continue
+            # O nome do processo vem entre parênteses e pode ter espaços: os campos seguintes são estado e ppid
+            campos = dados[dados.rfind(b")") + 2:].split()
+            filhos.setdefault(int(campos[1]), []).append(int(nome))
+        return filhos
+
+    @staticmethod
+    def rss_arvore(pid: int) -> Tuple[int, int]:
+        """(RSS total em bytes, número de processos) do processo e de todos os descendentes"""
+        if psutil:
+            raiz = psutil.Process(pid)
+            total = contados = 0
+            for processo in [raiz] + raiz.children(recursive=True):
+                try:
+                    total += processo.memory_info().rss
+                    contados += 1
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+            return total, contados
+
+        if not os.path.isdir("/proc"):
+            raise OSError("instale o psutil para medir a memória neste sistema")
+
+        filhos = VigiaMemoria._filhos_proc()
+        tamanho_pagina = os.sysconf("SC_PAGE_SIZE")
+        total = contados = 0
+        pendentes = [pid]
+        while pendentes:
+            atual = pendentes.pop()
+            try:
+                with open(f"/proc/{atual}/statm", "r") as f:
+                    total += int(f.read().split()[1]) * tamanho_pagina
+                contados += 1
+            except OSError:
+                continue
+            pendentes.extend(filhos.get(atual, []))
+        return total, contados
+
+    def tendencia_mb_hora(self) -> float:
+        """Inclinação (mínimos quadrados) das amostras, em MB por hora"""
+        if len(self.amostras) < 2:
+            return 0.0
+
+        media_t = sum(t for t, _ in self.amostras) / len(self.amostras)
+        media_rss = sum(rss for _, rss in self.amostras) / len(self.amostras)
+        variancia = sum((t - media_t) ** 2 for t, _ in self.amostras)
+        if not variancia:
+            return 0.0
+        covariancia = sum((t - media_t) * (rss - media_rss) for t, rss in self.amostras)
+        return covariancia / variancia * 3600 / (1024 * 1024)
+
+    def amostrar(self, navegador: BackendNavegador) -> Optional[str]:
+        """Mede no máximo uma vez por intervalo; devolve a ação para o teto: None, 'recarregar' ou 'reciclar'"""
+        agora = self.relogio.monotonico()
+        if self._desativado or (self._ultima is not None and agora - self._ultima < self.intervalo):
+            return None
+        self._ultima = agora
+
+        try:
+            pid = navegador.pid()
+            if pid is None:
+                raise LookupError(f"o backend '{navegador.NOME}' não expõe o processo do navegador")
+            rss, processos = self.rss_arvore(pid)
+        except Exception as e:
+            self._desativado = True
+            logging.warning(f"⚠️ Vigia de memória desativado: {e}")
+            return None
+
+        self.amostras.append((agora, rss))
+        self.pico = max(self.pico, rss)
+        mb = rss / (1024 * 1024)
+
+        if len(self.amostras) % 10 == 1:
+            logging.info(f"🧠 Navegador: {mb:.0f} MB em {processos} processos "
+                         f"(tendência {self.tendencia_mb_hora():+.0f} MB/h, pico {self.pico / (1024 * 1024):.0f} MB)")
+
+        if not self.teto_bytes or rss <= self.teto_bytes:
+            self._recarregou = False
+            return None
+
+        logging.warning(f"🧠 Navegador acima do teto: {mb:.0f} MB > {self.teto_bytes / (1024 * 1024):.0f} MB")
+        # Primeiro tenta recarregar a página; se na amostra seguinte continuar acima, troca o driver
+        if self._recarregou:
+            self._recarregou = False
+            self.reciclagens += 1
+            return "reciclar"
+
+        self._recarregou = True
+        self.recargas += 1
+        return "recarregar"
+
+    def registrar_resumo(self):
+        """Registra pico, tendência e ações tomadas"""
+        if not self.amostras:
+            return
+
+        logging.info(f"🧠 Memória do navegador: pico {self.pico / (1024 * 1024):.0f} MB, "
+                     f"tendência {self.tendencia_mb_hora():+.0f} MB/h em {len(self.amostras)} amostras, "
+                     f"{self.recargas} recargas, {self.reciclagens} trocas de driver")
+
+
+class PoolDrivers:
+    """Mantém um driver pronto em segundo plano para esconder o tempo de inicialização do Chrome"""
+
+    def __init__(self, nome: str, fabrica: Callable[[], BackendNavegador], repor: bool = True,
+                 idade_maxima: float = 900, intervalo_verificacao: float = 30):
+        self.nome = nome
+        self.fabrica = fabrica
+        self.repor = repor
+        self.idade_maxima = idade_maxima
+        self.intervalo_verificacao = intervalo_verificacao
+
+        self._pronto: Optional[Tuple[BackendNavegador, float, float]] = None  # (driver, criado_em, duração)
+        self._condicao = threading.Condition()
+        self._parar = threading.Event()
+        self._acordar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._entregues = 0
+
+        self.partidas_quentes: List[float] = []
+        self.partidas_frias: List[float] = []
+
+    def iniciar(self):
+        """Começa a preparar o driver ocioso em segundo plano"""
+        if self._thread:
+            return
+
+        self._thread = threading.Thread(target=self._manter, name=f"pool-{self.nome}", daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _saudavel(navegador: BackendNavegador) -> bool:
+        """Verifica se o driver ainda responde"""
+        try:
+            return navegador.executar_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _descartar(self, item: Tuple[BackendNavegador, float, float], motivo: str):
+        """Retira o driver ocioso do pool e encerra o navegador"""
+        with self._condicao:
+            if self._pronto is not item:
+                return  # já foi entregue
+            self._pronto = None
+
+        logging.info(f"♻️ Pool '{self.nome}': descartando driver ocioso ({motivo})")
+        try:
+            item[0].encerrar()
+        except Exception:
+            pass
+
+    def _manter(self):
+        """Laço em segundo plano: garante um driver pronto, saudável e dentro da idade máxima"""
+        while not self._parar.is_set():
+            with self._condicao:
+                item = self._pronto
+                precisa_criar = item is None and (self.repor or self._entregues == 0)
+
+            if precisa_criar:
+                try:
+                    inicio = time.monotonic()
+                    driver = self.fabrica()
+                    duracao = time.monotonic() - inicio
+                    logging.info(f"🔥 Pool '{self.nome}': driver pronto em segundo plano ({duracao:.1f}s)")
+
+                    with self._condicao:
+                        if self._parar.is_set():
+                            driver.encerrar()
+                            return
+                        self._pronto = (driver, time.monotonic(), duracao)
+                        self._condicao.notify_all()
+                except Exception as e:
+                    logging.error(f"Erro ao preparar driver do pool '{self.nome}': {e}")
+
+            elif item is not None:
+                if time.monotonic() - item[1] > self.idade_maxima:
+                    self._descartar(item, "idade máxima atingida")
+                    continue
+                if not self._saudavel(item[0]):
+                    self._descartar(item, "não responde")
+                    continue
+
+            self._acordar.wait(self.intervalo_verificacao)
+            self._acordar.clear()
+
+    def obter(self, timeout: float = 60) -> BackendNavegador:
+        """Entrega o driver ocioso (partida a quente) ou cria um na hora (partida a frio)
+
+        Esperar um driver que ainda está sendo criado conta como partida a frio: o Chrome não estava pronto.
+        """
+        inicio = time.monotonic()
+        aguardou_criacao = False
+
+        with self._condicao:
+            criacao_pendente = self.repor or self._entregues == 0
+            if self._pronto is None and self._thread and criacao_pendente and not self._parar.is_set():
+                # Um driver já está sendo criado: esperar sai mais barato que começar outro do zero
+                aguardou_criacao = True
+                self._condicao.wait_for(lambda: self._pronto is not None, timeout)
+            item = self._pronto
+            self._pronto = None
+            self._entregues += 1
+
+        if self.repor:
+            self._acordar.set()  # dispara a reposição
+
+        if item and time.monotonic() - item[1] <= self.idade_maxima and self._saudavel(item[0]):
+            espera = time.monotonic() - inicio
+            if aguardou_criacao:
+                self.partidas_frias.append(espera)
+                logging.info(f"🧊 Pool '{self.nome}': partida a frio em {espera:.1f}s "
+                             f"(aguardou o driver que ainda estava sendo criado)")
+            else:
+                self.partidas_quentes.append(espera)
+                logging.info(f"🔥 Pool '{self.nome}': partida a quente em {espera:.2f}s "
+                             f"(driver criado em segundo plano em {item[2]:.1f}s)")
+            return item[0]
+
+        if item:
+            try:
+                item[0].encerrar()
+            except Exception:
+                pass
+
+        driver = self.fabrica()
+        duracao = time.monotonic() - inicio
+        self.partidas_frias.append(duracao)
+        logging.info(f"🧊 Pool '{self.nome}': partida a frio em {duracao:.1f}s")
+        return driver
+
+    def encerrar(self):
+        """Para a manutenção, fecha o driver ocioso e registra os tempos de partida"""
+        if self._parar.is_set():
+            return
+        self._parar.set()
+        self._acordar.set()
+        with self._condicao:
+            self._condicao.notify_all()
+
+        if self._thread:
+            self._thread.join(timeout=5)
+
+        with self._condicao:
+            item = self._pronto
+            self._pronto = None
+
+        if item:
+            try:
+                item[0].encerrar()
+            except Exception:
+                pass
+
+        for rotulo, tempos in (("a quente", self.partidas_quentes), ("a frio", self.partidas_frias)):
+            if tempos:
+                logging.info(f"📊 Pool '{self.nome}': {len(tempos)} partida(s) {rotulo}, "
+                             f"média {sum(tempos) / len(tempos):.2f}s, máx {max(tempos):.2f}s")
+
+
+class Relogio:
+    """Fonte de tempo do programa: horário local, relógio monotônico e espera (a simulação troca por um virtual)"""
+
+    def agora(self) -> datetime:
+        return datetime.now()
+
+    def monotonico(self) -> float:
+        return time.monotonic()
+
+    def dormir(self, segundos: float):
+        time.sleep(segundos)
+
+
+class RelógioPontoManager:
+    """Gerencia o relógio do ponto e cálculos de tempo"""
+
+    # Quanto o campo de entrada pode estar à frente do relógio local (desvio) antes de ser lido como de ontem
+    TOLERANCIA_ENTRADA_FUTURA = timedelta(hours=1)
+
+    def __init__(self, ao_mudar: Optional[Callable[[], None]] = None, relogio: Optional[Relogio] = None):
+        self.horario_entrada = None
+        self.horario_saida_calculado = None
+        self.ao_mudar = ao_mudar  # chamado sempre que entrada/saída calculada mudam
+        self.relogio = relogio or Relogio()
+
+    def notificar_mudanca(self):
+        """Avisa o interessado (checkpoint) que o estado mudou"""
+        if self.ao_mudar:
+            try:
+                self.ao_mudar()
+            except Exception as e:
+                logging.warning(f"⚠️ Erro ao notificar mudança de estado: {e}")
+
+    def restaurar(self, horario_entrada: datetime, horario_saida_calculado: datetime):
+        """Restaura o estado salvo de uma execução anterior"""
+        self.horario_entrada = horario_entrada
+        self.horario_saida_calculado = horario_saida_calculado
+
+    def extrair_horario_relogio(self, texto: str) -> Optional[datetime]:
+        """Extrai horário do relógio no formato HH:MM:SS"""
+        try:
+            # Extrai apenas a parte do horário (HH:MM:SS)
+            match = re.search(PADRAO_HORARIO_RELOGIO, texto)
+            if match:
+                horas = int(match.group(1))
+                minutos = int(match.group(2))
+                segundos = int(match.group(3))
+
+                # Cria um datetime com a data de hoje
+                agora = self.relogio.agora()
+                horario = datetime.combine(agora.date(), datetime.min.time().replace(
+                    hour=horas, minute=minutos, second=segundos
+                ))
+
+                # Perto da meia-noite o relógio do servidor pode estar em outro dia que o local (desvio):
+                # fica com ontem, hoje ou amanhã, o que estiver mais perto do horário local
+                return min((horario + timedelta(days=dias) for dias in (-1, 0, 1)),
+                           key=lambda candidato: abs(candidato - agora))
+        except Exception as e:
+            logging.error(f"Erro ao extrair horário do relógio: {e}")
+
+        return None
+
+    def extrair_horario_campo(self, valor: str, data: Optional[date] = None) -> Optional[datetime]:
+        """Extrai horário do campo de entrada no formato HH:MM:SS (no dia informado, ou hoje)"""
+        try:
+            if not valor or valor.strip() == "":
+                return None
+
+            # Remove espaços e verifica se está no formato correto
+            valor_limpo = valor.strip()
+
+            # Tenta diferentes formatos
+            formatos = ["%H:%M:%S", "%H:%M"]
+
+            for formato in formatos:
+                try:
+                    hora_obj = datetime.strptime(valor_limpo, formato).time()
+                    if data:
+                        return datetime.combine(data, hora_obj)
+
+                    # Sem data: a entrada mais recente que não esteja no futuro. É ontem se foi antes da meia-noite,
+                    # ou amanhã se o servidor (adiantado) já virou o dia e o relógio local ainda não
+                    agora = self.relogio.agora()
+                    horario = datetime.combine(agora.date(), hora_obj)
+                    return max(horario + timedelta(days=dias) for dias in (-1, 0, 1)
+                               if horario + timedelta(days=dias) <= agora + self.TOLERANCIA_ENTRADA_FUTURA)
+                except ValueError:
+                    continue
+
+            logging.warning(f"Formato de horário não reconhecido: {valor}")
+            return None
+
+        except Exception as e:
+            logging.error(f"Erro ao extrair horário do campo: {e}")
+            return None
+
+    def calcular_horario_saida(self, horario_entrada: datetime, horas_trabalho: int = 6) -> datetime:
+        """Calcula o horário de saída baseado no horário de entrada"""
+        return horario_entrada + timedelta(hours=horas_trabalho)
+
+    def definir_horario_entrada(self, horario_atual: datetime):
+        """Define o horário de entrada e calcula o horário de saída"""
+        if not self.horario_entrada:
+            self.horario_entrada = horario_atual
+            self.horario_saida_calculado = self.calcular_horario_saida(self.horario_entrada)
+
+            logging.info(f"🕐 Horário de entrada detectado: {self.horario_entrada.strftime('%H:%M:%S')}")
+            logging.info(f"🕕 Horário de saída calculado: {self.horario_saida_calculado.strftime('%H:%M:%S')}")
+            self.notificar_mudanca()
+
+    def verificar_se_pode_sair(self, horario_atual: datetime) -> bool:
+        """Verifica se já pode sair (completou 6 horas)"""
+        if not self.horario_saida_calculado:
+            return False
+
+        return horario_atual >= self.horario_saida_calculado
+
+    def tempo_restante(self, horario_atual: datetime) -> Optional[timedelta]:
+        """Calcula o tempo restante para completar 6 horas"""
+        if not self.horario_saida_calculado:
+            return None
+
+        if horario_atual >= self.horario_saida_calculado:
+            return timedelta(0)
+
+        return self.horario_saida_calculado - horario_atual
+
+    def formatar_tempo_restante(self, tempo: timedelta) -> str:
+        """Formata o tempo restante de forma legível"""
+        if tempo.total_seconds() <= 0:
+            return "00:00:00"
+
+        horas = int(tempo.total_seconds() // 3600)
+        minutos = int((tempo.total_seconds() % 3600) // 60)
+        segundos = int(tempo.total_seconds() % 60)
+
+        return f"{horas:02d}:{minutos:02d}:{segundos:02d}"
+
+
+class SondaDOM:
+    """Resolve vários seletores candidatos com uma única ida ao chromedriver"""
+
+    # Recebe [[seletor, tipo], ...] e devolve o primeiro elemento que atende aos filtros,
+    # com o índice do seletor que o encontrou, o texto e o valor (campos de formulário)
+    SCRIPT = """
+        const candidatos = arguments[0];
+        const padrao = arguments[1] ? new RegExp(arguments[1]) : null;
+        const exigirClicavel = arguments[2];
+
+        for (let i = 0; i < candidatos.length; i++) {
+            const [seletor, tipo] = candidatos[i];
+            let elementos = [];
+            try {
+                if (tipo === 'xpath') {
+                    const resultado = document.evaluate(
+                        seletor, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+                    for (let j = 0; j < resultado.snapshotLength; j++) {
+                        elementos.push(resultado.snapshotItem(j));
+                    }
+                } else {
+                    elementos = Array.from(document.querySelectorAll(seletor));
+                }
+            } catch (e) {
+                continue;
+            }
+
+            for (const elemento of elementos) {
+                const valor = elemento.value !== undefined && elemento.value !== null ? String(elemento.value) : null;
+                let texto = (elemento.innerText || elemento.textContent || '').trim();
+
+                if (padrao) {
+                    if (!padrao.test(texto)) {
+                        if (valor === null || !padrao.test(valor)) {
+                            continue;
+                        }
+                        texto = valor;
+                    }
+                }
+
+                if (exigirClicavel) {
+                    // Imagem bloqueada pelo perfil enxuto pode ficar sem tamanho: basta estar no layout
+                    const visivel = elemento.tagName === 'IMG'
+                        ? elemento.getClientRects().length || elemento.offsetParent !== null
+                        : elemento.offsetWidth || elemento.offsetHeight || elemento.getClientRects().length;
+                    if (!visivel || elemento.disabled) {
+                        continue;
+                    }
+                }
+
+                return {indice: i, seletor: seletor, texto: texto, valor: valor, elemento: elemento};
+            }
+        }
+        return null;
+    """
+
+    @staticmethod
+    def sondar(driver, seletores: List[str], padrao: Optional[str] = None,
+               exigir_clicavel: bool = False) -> Optional[dict]:
+        """Procura todos os seletores de uma vez; devolve None se nenhum encontrar o elemento"""
+        candidatos = [[seletor, "xpath" if seletor.startswith('//') else "css"] for seletor in seletores]
+        return driver.execute_script(SondaDOM.SCRIPT, candidatos, padrao, exigir_clicavel)
+
+    @staticmethod
+    def condicao(seletores: List[str], padrao: Optional[str] = None,
+                 exigir_clicavel: bool = False) -> Callable[[BackendNavegador], Optional[dict]]:
+        """Condição para SistemaInss.aguardar: verdadeira quando a sonda encontra o elemento"""
+        return lambda navegador: navegador.sondar(seletores, padrao, exigir_clicavel)
+
+
+def condicao_webdriver(condicao: Callable) -> Callable[[BackendNavegador], object]:
+    """Adapta uma expected_condition do Selenium para SistemaInss.aguardar sobre o backend"""
+    return lambda navegador: condicao(navegador.driver)
+
+
+class CacheSeletores:
+    """Memoriza, entre execuções, qual seletor funcionou por último para cada elemento da página"""
+
+    def __init__(self, caminho: Optional[str] = None):
+        self.caminho = caminho
+        self.dados: Dict[str, dict] = {}
+        self.carregar()
+
+    def carregar(self):
+        """Carrega o cache do disco (se existir)"""
+        if not self.caminho or not os.path.exists(self.caminho):
+            return
+
+        try:
+            with open(self.caminho, "r", encoding="utf-8") as f:
+                self.dados = json.load(f)
+        except Exception as e:
+            logging.warning(f"⚠️ Cache de seletores ignorado ({e})")
+            self.dados = {}
+
+    def salvar(self):
+        """Grava o cache no disco"""
+        if not self.caminho:
+            return
+
+        try:
+            with open(self.caminho, "w", encoding="utf-8") as f:
+                json.dump(self.dados, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            logging.warning(f"⚠️ Não foi possível salvar o cache de seletores: {e}")
+
+    def _entrada(self, elemento: str) -> dict:
+        return self.dados.setdefault(elemento, {"ordem": [], "acertos": 0, "falhas": 0})
+
+    def ordenar(self, elemento: str, seletores: List[str]) -> List[str]:
+        """Ordena os seletores colocando primeiro os que funcionaram mais recentemente"""
+        ordem = [seletor for seletor in self._entrada(elemento)["ordem"] if seletor in seletores]
+        return ordem + [seletor for seletor in seletores if seletor not in ordem]
+
+    def registrar_sucesso(self, elemento: str, seletor: str, posicao: int, duracao: float):
+        """Registra o seletor que funcionou; fora da primeira posição conta como falha do cache"""
+        entrada = self._entrada(elemento)
+
+        if posicao == 0:
+            entrada["acertos"] += 1
+            return
+
+        entrada["falhas"] += 1
+        entrada["ordem"] = [seletor] + [s for s in entrada["ordem"] if s != seletor]
+        logging.warning(f"🐢 Seletor de '{elemento}' resolvido no fallback (posição {posicao + 1}, "
+                        f"{duracao:.1f}s): {seletor}")
+        self.salvar()
+
+    def registrar_falha(self, elemento: str, duracao: float):
+        """Registra que nenhum seletor encontrou o elemento"""
+        self._entrada(elemento)["falhas"] += 1
+        logging.warning(f"🐢 Nenhum seletor encontrou '{elemento}' ({duracao:.1f}s)")
+
+    def registrar_resumo(self):
+        """Registra no log os acertos e falhas do cache e grava o estado final"""
+        for elemento, entrada in self.dados.items():
+            total = entrada["acertos"] + entrada["falhas"]
+            if total:
+                logging.info(f"📊 Cache de seletores '{elemento}': {entrada['acertos']}/{total} acertos, "
+                             f"{entrada['falhas']} fallbacks")
+        self.salvar()
+
+
+class CheckpointPonto:
+    """Estado do expediente gravado em disco a cada mudança, para retomar rápido após uma queda"""
+
+    def __init__(self, caminho: Optional[str] = None, relogio: Optional[Relogio] = None):
+        self.caminho = caminho
+        self.relogio = relogio or Relogio()
+        self.gravacoes = 0
+
+    def salvar(self, estado: dict):
+        """Grava o estado de forma atômica (arquivo temporário + os.replace)"""
+        if not self.caminho:
+            return
+
+        temporario = f"{self.caminho}.tmp"
+        try:
+            # Contém cookies de sessão: só o próprio usuário pode ler
+            descritor = os.open(temporario, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(descritor, "w", encoding="utf-8") as f:
+                json.dump(estado, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporario, self.caminho)
+            self.gravacoes += 1
+        except Exception as e:
+            logging.warning(f"⚠️ Não foi possível gravar o checkpoint: {e}")
+
+    def carregar(self) -> Optional[dict]:
+        """Devolve o estado salvo se ainda for do expediente atual"""
+        if not self.caminho or not os.path.exists(self.caminho):
+            return None
+
+        try:
+            with open(self.caminho, "r", encoding="utf-8") as f:
+                estado = json.load(f)
+
+            entrada = datetime.fromisoformat(estado["horario_entrada"])
+            saida = datetime.fromisoformat(estado["horario_saida_calculado"])
+        except Exception as e:
+            logging.warning(f"⚠️ Checkpoint ignorado ({e})")
+            return None
+
+        # Mesmo dia, ou expediente que atravessou a meia-noite e ainda não terminou
+        agora = self.relogio.agora()
+        if entrada.date() != agora.date() and saida <= agora:
+            logging.info("🗂️ Checkpoint de outro expediente ignorado")
+            self.limpar()
+            return None
+
+        estado["horario_entrada"] = entrada
+        estado["horario_saida_calculado"] = saida
+        return estado
+
+    def limpar(self):
+        """Remove o checkpoint (expediente encerrado)"""
+        if self.caminho and os.path.exists(self.caminho):
+            try:
+                os.remove(self.caminho)
+            except OSError as e:
+                logging.warning(f"⚠️ Não foi possível remover o checkpoint: {e}")
+
+
+class DisjuntorAbertoError(Exception):
+    """O disjuntor está aberto: novas tentativas suspensas até o fim do tempo de abertura"""
+
+
+class PoliticaRetentativa:
+    """Backoff exponencial com jitter, disjuntor e classificação de erros retentáveis ou fatais"""
+
+    # Erros que não se resolvem tentando de novo (verificados antes dos retentáveis)
+    ERROS_FATAIS = (InvalidSessionIdException, NoSuchWindowException, ValueError)
+    ERROS_RETENTAVEIS = (TimeoutException, UnexpectedAlertPresentException, WebDriverException,
+                         ConnectionError, urllib3.exceptions.HTTPError, OSError)
+
+    def __init__(self, nome: str, base: float = 2.0, maximo: float = 120.0, limite_falhas: int = 5,
+                 tempo_abertura: float = 300.0, desconhecidos_retentaveis: bool = False,
+                 relogio: Optional[Relogio] = None, erros_fatais: Optional[tuple] = None):
+        self.nome = nome
+        self.base = base
+        self.maximo = maximo
+        self.limite_falhas = limite_falhas
+        self.tempo_abertura = tempo_abertura
+        self.desconhecidos_retentaveis = desconhecidos_retentaveis
+        self.relogio = relogio or Relogio()
+        self.erros_fatais = self.ERROS_FATAIS if erros_fatais is None else erros_fatais
+
+        self.falhas_consecutivas = 0
+        self.aberto_ate: Optional[float] = None
+
+        # Contadores
+        self.tentativas = 0
+        self.falhas = 0
+        self.disparos_disjuntor = 0
+        self.tempo_backoff = 0.0
+
+    def classificar(self, erro: BaseException) -> bool:
+        """True se vale a pena tentar de novo"""
+        if isinstance(erro, self.erros_fatais):
+            return False
+        if isinstance(erro, self.ERROS_RETENTAVEIS):
+            return True
+        return self.desconhecidos_retentaveis
+
+    def espera(self, falhas: int) -> float:
+        """Backoff exponencial com jitter completo: sorteio entre 0 e base * 2^(falhas - 1)"""
+        return random.uniform(0, min(self.maximo, self.base * 2 ** max(0, falhas - 1)))
+
+    def disjuntor_aberto(self) -> bool:
+        """True enquanto o disjuntor estiver aberto (depois disso ele fica semiaberto: uma tentativa)"""
+        return self.aberto_ate is not None and self.relogio.monotonico() < self.aberto_ate
+
+    def antes_de_tentar(self):
+        """Chamado antes de cada tentativa; lança DisjuntorAbertoError se o disjuntor estiver aberto"""
+        if self.disjuntor_aberto():
+            raise DisjuntorAbertoError(f"Disjuntor '{self.nome}' aberto por mais "
+                                       f"{self.aberto_ate - self.relogio.monotonico():.0f}s")
+        self.tentativas += 1
+
+    def registrar_sucesso(self):
+        """Fecha o disjuntor e zera as falhas seguidas"""
+        if self.aberto_ate is not None:
+            logging.info(f"🔌 Disjuntor '{self.nome}' fechado")
+        self.falhas_consecutivas = 0
+        self.aberto_ate = None
+
+    def registrar_falha(self, erro: BaseException) -> bool:
+        """Conta a falha e abre o disjuntor se necessário; devolve True se o erro for retentável"""
+        self.falhas += 1
+        if not self.classificar(erro):
+            return False
+
+        self.falhas_consecutivas += 1
+        semiaberto = self.aberto_ate is not None
+        if semiaberto or self.falhas_consecutivas >= self.limite_falhas:
+            self.aberto_ate = self.relogio.monotonico() + self.tempo_abertura
+            self.disparos_disjuntor += 1
+            logging.warning(f"🔌 Disjuntor '{self.nome}' aberto após {self.falhas_consecutivas} falhas seguidas "
+                            f"(pausa de {self.tempo_abertura:.0f}s)")
+        return True
+
+    def aguardar(self, limite: Optional[float] = None):
+        """Dorme o backoff da falha atual, ou até o disjuntor ficar semiaberto, sem passar de 'limite' segundos"""
+        if self.disjuntor_aberto():
+            espera = self.aberto_ate - self.relogio.monotonico()
+        else:
+            espera = self.espera(self.falhas_consecutivas)
+
+        if limite is not None and espera > limite:
+            espera = max(limite, 1.0)  # depois do limite, tenta a cada segundo em vez de girar em falso
+
+        if espera > 0:
+            logging.info(f"⏳ Nova tentativa ({self.nome}) em {espera:.1f}s")
+            self.relogio.dormir(espera)
+            self.tempo_backoff += espera
+
+    def registrar_resumo(self):
+        """Registra os contadores no log"""
+        if self.tentativas or self.falhas:
+            logging.info(f"🔁 Política '{self.nome}': {self.tentativas} tentativas, {self.falhas} falhas, "
+                         f"{self.disparos_disjuntor} disparos do disjuntor, {self.tempo_backoff:.1f}s em backoff")
+
+
+class GerenciadorTimeouts:
+    """Define o timeout de cada ponto de espera a partir do histograma de latências observadas"""
+
+    # Limites superiores (segundos) das faixas do histograma
+    FAIXAS = [0.1, 0.2, 0.35, 0.5, 0.75, 1, 1.5, 2, 3, 4, 5, 7, 10, 15, 20, 30, 45, 60, 90, 120, 180]
+    MAXIMO_AMOSTRAS = 500  # acima disso as contagens antigas perdem peso
+
+    def __init__(self, caminho: Optional[str] = None, percentil: float = 0.99, fator: float = 1.5,
+                 margem: float = 1.0, minimo: float = 3.0, maximo: float = 60.0, amostras_minimas: int = 10):
+        self.caminho = caminho
+        self.percentil = percentil
+        self.fator = fator
+        self.margem = margem
+        self.minimo = minimo
+        self.maximo = maximo
+        self.amostras_minimas = amostras_minimas
+        self.locais: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self.carregar()
+
+    def carregar(self):
+        """Carrega os histogramas de execuções anteriores"""
+        if not self.caminho or not os.path.exists(self.caminho):
+            return
+
+        try:
+            with open(self.caminho, "r", encoding="utf-8") as f:
+                dados = json.load(f)
+            if dados.get("faixas") == self.FAIXAS:
+                self.locais = dados.get("locais", {})
+        except Exception as e:
+            logging.warning(f"⚠️ Histórico de timeouts ignorado ({e})")
+
+    def salvar(self):
+        """Grava os histogramas para as próximas execuções"""
+        if not self.caminho:
+            return
+
+        try:
+            with self._lock:
+                dados = {"faixas": self.FAIXAS, "locais": self.locais}
+                with open(self.caminho, "w", encoding="utf-8") as f:
+                    json.dump(dados, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            logging.warning(f"⚠️ Não foi possível salvar o histórico de timeouts: {e}")
+
+    def _local(self, local: str) -> dict:
+        return self.locais.setdefault(local, {"contagens": [0.0] * (len(self.FAIXAS) + 1), "estouros": 0})
+
+    def _adicionar(self, local: str, segundos: float):
+        dados = self._local(local)
+        contagens = dados["contagens"]
+
+        total = sum(contagens)
+        if total >= self.MAXIMO_AMOSTRAS:
+            # Reduz o peso do histórico para acompanhar mudanças no comportamento do SISREF
+            dados["contagens"] = contagens = [contagem / 2 for contagem in contagens]
+
+        faixa = next((indice for indice, limite in enumerate(self.FAIXAS) if segundos <= limite), len(self.FAIXAS))
+        contagens[faixa] += 1
+
+    def registrar(self, local: str, segundos: float):
+        """Registra a latência de uma espera bem-sucedida"""
+        with self._lock:
+            self._adicionar(local, segundos)
+
+    def registrar_estouro(self, local: str, timeout: float):
+        """Registra uma espera que estourou: a latência real foi maior que o timeout usado"""
+        with self._lock:
+            self._local(local)["estouros"] += 1
+            self._adicionar(local, timeout * 2)
+
+    def timeout(self, local: str, padrao: float) -> float:
+        """Timeout para o local: percentil alto + margem, ou o valor fixo enquanto houver poucas amostras"""
+        with self._lock:
+            dados = self.locais.get(local)
+            if not dados:
+                return padrao
+
+            contagens = dados["contagens"]
+            total = sum(contagens)
+            if total < self.amostras_minimas:
+                return padrao
+
+            acumulado = 0.0
+            limite = self.FAIXAS[-1] * 2
+            for indice, contagem in enumerate(contagens):
+                acumulado += contagem
+                if acumulado >= total * self.percentil:
+                    limite = self.FAIXAS[indice] if indice < len(self.FAIXAS) else self.FAIXAS[-1] * 2
+                    break
+
+        return min(self.maximo, max(self.minimo, limite * self.fator + self.margem))
+
+    def registrar_resumo(self):
+        """Registra no log os timeouts em uso e grava o histórico"""
+        for local in sorted(self.locais):
+            dados = self.locais[local]
+            total = sum(dados["contagens"])
+            timeout = self.timeout(local, -1.0)
+            descricao = f"{timeout:.1f}s" if timeout >= 0 else "fixo (poucas amostras)"
+            logging.info(f"⏱️ Timeout '{local}': {descricao} ({total:.0f} amostras, {dados['estouros']} estouros)")
+        self.salvar()
+
+
+# Fase atual da execução (início do driver, login, entrada, monitoramento, encerramento)
+FASE_ATUAL: contextvars.ContextVar = contextvars.ContextVar("fase_atual", default="geral")
+
+
+def percentil(valores: List[float], fracao: float) -> float:
+    """Percentil por interpolação linear (valores não precisam estar ordenados)"""
+    if not valores:
+        return 0.0
+
+    ordenados = sorted(valores)
+    posicao = (len(ordenados) - 1) * fracao
+    inferior = int(posicao)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicao - inferior)
+
+
+class InstrumentacaoWebDriver:
+    """Registra contagem, tempo e resultado de cada comando WebDriver, separados por fase"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.comandos: Dict[str, Dict[str, List[float]]] = {}  # fase -> comando -> durações
+        self.erros: Dict[str, Dict[str, int]] = {}  # fase -> resultado -> quantidade
+        self.duracoes_fases: Dict[str, List[float]] = {}  # fase -> duração de cada ocorrência
+
+    def instrumentar(self, driver: webdriver.Chrome) -> webdriver.Chrome:
+        """Envolve o command executor do driver para medir cada comando"""
+        executor = driver.command_executor
+        execute_original = executor.execute
+
+        def execute_medido(comando, parametros):
+            inicio = time.perf_counter()
+            resultado = "ok"
+            try:
+                resposta = execute_original(comando, parametros)
+                valor = resposta.get("value") if isinstance(resposta, dict) else None
+                if isinstance(valor, dict) and valor.get("error"):
+                    resultado = valor["error"]
+                return resposta
+            except Exception as e:
+                resultado = type(e).__name__
+                raise
+            finally:
+                self.registrar_comando(comando, time.perf_counter() - inicio, resultado)
+
+        executor.execute = execute_medido
+        return driver
+
+    def registrar_comando(self, comando: str, duracao: float, resultado: str):
+        """Registra um comando na fase atual"""
+        fase = FASE_ATUAL.get()
+        with self._lock:
+            self.comandos.setdefault(fase, {}).setdefault(comando, []).append(duracao)
+            if resultado != "ok":
+                erros = self.erros.setdefault(fase, {})
+                erros[resultado] = erros.get(resultado, 0) + 1
+
+    def registrar_fase(self, fase: str, duracao: float):
+        """Registra a duração de uma ocorrência de fase"""
+        with self._lock:
+            self.duracoes_fases.setdefault(fase, []).append(duracao)
+
+    def resumo(self) -> Dict[str, dict]:
+        """Resumo por fase: quantidade, tempo total e p50/p95/máx dos comandos"""
+        with self._lock:
+            resumo = {}
+            for fase in sorted(set(self.comandos) | set(self.duracoes_fases)):
+                por_comando = self.comandos.get(fase, {})
+                duracoes = [duracao for lista in por_comando.values() for duracao in lista]
+                ocorrencias = self.duracoes_fases.get(fase, [])
+
+                resumo[fase] = {
+                    "comandos": len(duracoes),
+                    "tempo_comandos": sum(duracoes),
+                    "p50": percentil(duracoes, 0.50),
+                    "p95": percentil(duracoes, 0.95),
+                    "max": max(duracoes, default=0.0),
+                    "erros": dict(self.erros.get(fase, {})),
+                    "por_comando": {comando: {"quantidade": len(lista), "tempo": sum(lista),
+                                              "p95": percentil(lista, 0.95)}
+                                    for comando, lista in por_comando.items()},
+                    "ocorrencias": len(ocorrencias),
+                    "duracao_p50": percentil(ocorrencias, 0.50),
+                    "duracao_p95": percentil(ocorrencias, 0.95),
+                    "duracao_max": max(ocorrencias, default=0.0),
+                }
+            return resumo
+
+    def registrar_resumo(self, caminho: Optional[str]):
+        """Registra o resumo no log e grava a versão completa em JSON"""
+        resumo = self.resumo()
+
+        for fase, dados in resumo.items():
+            logging.info(f"📊 Fase '{fase}': {dados['comandos']} comandos em {dados['tempo_comandos']:.2f}s "
+                         f"(p50 {dados['p50'] * 1000:.0f}ms, p95 {dados['p95'] * 1000:.0f}ms, "
+                         f"máx {dados['max'] * 1000:.0f}ms), {sum(dados['erros'].values())} erros, "
+                         f"{dados['ocorrencias']} ocorrências (p95 {dados['duracao_p95']:.2f}s)")
+
+        if not caminho:
+            return
+
+        try:
+            with open(caminho, "w", encoding="utf-8") as f:
+                json.dump({"gerado_em": datetime.now().isoformat(timespec="seconds"), "fases": resumo},
+                          f, ensure_ascii=False, indent=2)
+            logging.info(f"📊 Métricas WebDriver salvas em {caminho}")
+        except Exception as e:
+            logging.warning(f"⚠️ Não foi possível salvar as métricas: {e}")
+
+
+class PerfiladorPython:
+    """Perfil do lado Python: cProfile determinístico ou amostragem periódica da pilha"""
+
+    def __init__(self, modo: str, caminho: str = "perfil_python.prof", intervalo: float = 0.01):
+        self.modo = modo
+        self.caminho = caminho
+        self.intervalo = intervalo
+        self._perfil = None
+        self._thread: Optional[threading.Thread] = None
+        self._parar = threading.Event()
+        self._amostras: Dict[str, int] = {}
+        self._total_amostras = 0
+
+    def iniciar(self):
+        """Começa a perfilar a thread atual"""
+        if self.modo == "cprofile":
+            import cProfile
+            self._perfil = cProfile.Profile()
+            self._perfil.enable()
+        elif self.modo == "amostragem":
+            alvo = threading.get_ident()
+            self._thread = threading.Thread(target=self._amostrar, args=(alvo,), name="perfilador", daemon=True)
+            self._thread.start()
+        else:
+            logging.warning(f"⚠️ Perfilador desconhecido: {self.modo}")
+
+    def _amostrar(self, alvo: int):
+        """Coleta periodicamente a função em execução (e quem a chamou) na thread alvo"""
+        while not self._parar.wait(self.intervalo):
+            quadro = sys._current_frames().get(alvo)
+            if quadro is None:
+                continue
+
+            codigo = quadro.f_code
+            chave = f"{os.path.basename(codigo.co_filename)}:{quadro.f_lineno} {codigo.co_name}"
+            if quadro.f_back is not None:
+                chave += f" ← {quadro.f_back.f_code.co_name}"
+
+            self._amostras[chave] = self._amostras.get(chave, 0) + 1
+            self._total_amostras += 1
+
+    def parar(self):
+        """Para o perfilador e registra as funções mais caras"""
+        if self._perfil:
+            import io
+            import pstats
+
+            self._perfil.disable()
+            self._perfil.dump_stats(self.caminho)
+
+            saida = io.StringIO()
+            pstats.Stats(self._perfil, stream=saida).sort_stats("cumulative").print_stats(15)
+            logging.info(f"🔬 Perfil cProfile salvo em {self.caminho}\n{saida.getvalue()}")
+
+        if self._thread:
+            self._parar.set()
+            self._thread.join(timeout=2)
+
+            mais_frequentes = sorted(self._amostras.items(), key=lambda item: item[1], reverse=True)[:15]
+            linhas = "\n".join(f"   {quantidade / self._total_amostras:6.1%}  {chave}"
+                                for chave, quantidade in mais_frequentes)
+            logging.info(f"🔬 Perfil por amostragem ({self._total_amostras} amostras):\n{linhas}")
+
+
+class SessaoExpiradaError(Exception):
+    """A sessão do SISREF expirou (a página redirecionou para o login)"""
+
+
+class ExtratorPaginaSisref(HTMLParser):
+    """Extrai do HTML do SISREF os campos usados pelo script, sem navegador"""
+
+    IDS_CAMPOS = ("relogio", "ent", "sai")
+    ELEMENTOS_VAZIOS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source",
+                        "track", "wbr"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.campos: Dict[str, str] = {}
+        self.destinos_encerrar: List[str] = []
+        self._capturando: Optional[str] = None
+        self._profundidade = 0
+        self._link_atual: Optional[str] = None
+        self._texto_link: List[str] = []
+
+    @staticmethod
+    def destino_onclick(onclick: str) -> Optional[str]:
+        """URL aberta por um onclick simples (location.href = '...' / window.location = '...')"""
+        match = re.search(r"location(?:\.href)?\s*=\s*['\"]([^'\"]+)['\"]", onclick or "")
+        return match.group(1) if match else None
+
+    def handle_starttag(self, tag, attrs):
+        atributos = {nome: valor or "" for nome, valor in attrs}
+        id_elemento = atributos.get("id")
+
+        if self._capturando and tag not in self.ELEMENTOS_VAZIOS:
+            self._profundidade += 1
+
+        if id_elemento in self.IDS_CAMPOS:
+            if tag in ("input", "textarea", "select"):
+                self.campos[id_elemento] = atributos.get("value", "")
+            elif tag not in self.ELEMENTOS_VAZIOS and not self._capturando:
+                self._capturando = id_elemento
+                self._profundidade = 1
+                self.campos[id_elemento] = ""
+
+        # Candidatos ao botão 'Encerrar Expediente' que apontam para uma URL
+        descricao = " ".join(atributos.get(nome, "") for nome in ("alt", "title", "value", "class"))
+        onclick = atributos.get("onclick", "")
+        if "encerrar" in descricao.lower() or "encerrar" in onclick.lower():
+            destino = self.destino_onclick(onclick)
+            href = atributos.get("href", "")
+            if not destino and href and not href.lower().startswith("javascript:"):
+                destino = href
+            if destino:
+                self.destinos_encerrar.append(destino)
+
+        if tag == "a":
+            self._link_atual = atributos.get("href") or self.destino_onclick(onclick)
+            self._texto_link = []
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if self._capturando and tag not in self.ELEMENTOS_VAZIOS:
+            self._profundidade -= 1
+
+    def handle_endtag(self, tag):
+        if tag == "a":
+            texto = "".join(self._texto_link)
+            if (self._link_atual and "encerrar" in texto.lower()
+                    and not self._link_atual.lower().startswith("javascript:")):
+                self.destinos_encerrar.append(self._link_atual)
+            self._link_atual = None
+
+        if self._capturando and tag not in self.ELEMENTOS_VAZIOS:
+            self._profundidade -= 1
+            if self._profundidade <= 0:
+                self.campos[self._capturando] = self.campos[self._capturando].strip()
+                self._capturando = None
+
+    def handle_data(self, data):
+        if self._capturando:
+            self.campos[self._capturando] += data
+        if self._link_atual is not None:
+            self._texto_link.append(data)
+
+
+@dataclass
+class RegistroDia:
+    data: date
+    entrada: Optional[datetime]
+    saida: Optional[datetime]
+
+
+class ExtratorTabelaFrequencia(HTMLParser):
+    """Lê as tabelas da página de frequência (histórico) como linhas de texto das células"""
+
+    PADRAO_DATA = r'(\d{1,2})/(\d{1,2})(?:/(\d{2,4}))?'
+    PADRAO_HORARIO = r'\d{1,2}:\d{2}(?::\d{2})?'
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.linhas: List[List[str]] = []
+        self._linha: Optional[List[str]] = None
+        self._celula: Optional[List[str]] = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "tr":
+            self._linha = []
+        elif tag in ("td", "th") and self._linha is not None:
+            self._celula = []
+
+    def handle_endtag(self, tag):
+        if tag in ("td", "th") and self._celula is not None:
+            self._linha.append(" ".join("".join(self._celula).split()))
+            self._celula = None
+        elif tag == "tr" and self._linha is not None:
+            if self._linha:
+                self.linhas.append(self._linha)
+            self._linha = None
+
+    def handle_data(self, data):
+        if self._celula is not None:
+            self._celula.append(data)
+
+    def registros(self, relogio_manager: RelógioPontoManager, ano: int) -> List[RegistroDia]:
+        """Converte as linhas em registros por dia (entrada e saída pelas colunas do cabeçalho, se houver)"""
+        coluna_entrada = coluna_saida = None
+        registros = []
+
+        for linha in self.linhas:
+            titulos = [celula.lower() for celula in linha]
+            if any("entrada" in titulo for titulo in titulos) and not re.search(self.PADRAO_HORARIO, " ".join(linha)):
+                coluna_entrada = next(i for i, titulo in enumerate(titulos) if "entrada" in titulo)
+                coluna_saida = next((i for i, titulo in enumerate(titulos)
+                                     if "saída" in titulo or "saida" in titulo), None)
+                continue
+
+            dia = self._data_da_linha(linha, ano)
+            if not dia:
+                continue
+
+            if coluna_entrada is not None:
+                valores = [linha[i] if i is not None and i < len(linha) else "" for i in (coluna_entrada, coluna_saida)]
+            else:
+                # Sem cabeçalho: os dois primeiros horários da linha são entrada e saída
+                valores = [celula for celula in linha if re.fullmatch(self.PADRAO_HORARIO, celula)][:2]
+                valores += [""] * (2 - len(valores))
+
+            entrada, saida = (
+                relogio_manager.extrair_horario_campo(valor, dia)
+                if re.fullmatch(self.PADRAO_HORARIO, valor) else None
+                for valor in valores
+            )
+            if entrada or saida:
+                registros.append(RegistroDia(dia, entrada, saida))
+
+        return registros
+
+    def _data_da_linha(self, linha: List[str], ano: int) -> Optional[date]:
+        for celula in linha:
+            match = re.fullmatch(self.PADRAO_DATA, celula.split(" ")[0])
+            if not match:
+                continue
+            dia, mes, ano_celula = match.groups()
+            if ano_celula:
+                ano = int(ano_celula) + (2000 if len(ano_celula) == 2 else 0)
+            try:
+                return date(ano, int(mes), int(dia))
+            except ValueError:
+                return None
+        return None
+
+
+class HistoricoPonto:
+    """Histórico de entradas e saídas em SQLite, indexado por data, para relatórios sem acessar o SISREF"""
+
+    def __init__(self, caminho: str, relogio: Optional[Relogio] = None):
+        self.relogio = relogio or Relogio()
+        self.conexao = sqlite3.connect(caminho)
+        self.conexao.execute("""
+            CREATE TABLE IF NOT EXISTS registros (
+                data TEXT PRIMARY KEY,
+                entrada TEXT,
+                saida TEXT,
+                minutos INTEGER,
+                sincronizado_em TEXT NOT NULL
+            )
+        """)
+        self.conexao.commit()
+
+    def ultima_data_completa(self) -> Optional[date]:
+        """Último dia com entrada e saída; dias seguintes ainda precisam ser sincronizados"""
+        (ultima,) = self.conexao.execute("SELECT MAX(data) FROM registros WHERE minutos IS NOT NULL").fetchone()
+        return date.fromisoformat(ultima) if ultima else None
+
+    def gravar(self, registros: List[RegistroDia]) -> int:
+        """Insere ou atualiza os dias recebidos"""
+        sincronizado_em = self.relogio.agora().isoformat(timespec="seconds")
+        linhas = [
+            (
+                registro.data.isoformat(),
+                registro.entrada.strftime("%H:%M:%S") if registro.entrada else None,
+                registro.saida.strftime("%H:%M:%S") if registro.saida else None,
+                int((registro.saida - registro.entrada).total_seconds() // 60)
+                if registro.entrada and registro.saida and registro.saida > registro.entrada else None,
+                sincronizado_em
+            )
+            for registro in registros
+        ]
+        with self.conexao:
+            self.conexao.executemany("INSERT OR REPLACE INTO registros VALUES (?, ?, ?, ?, ?)", linhas)
+        return len(linhas)
+
+    def relatorio(self, inicio: date, fim: date, jornada_minutos: int) -> List[Tuple]:
+        """Por mês: (mês, dias, minutos trabalhados, saldo, horas extras, faltas), agregado pelo SQLite"""
+        return self.conexao.execute("""
+            SELECT substr(data, 1, 7) AS mes,
+                   COUNT(*),
+                   SUM(minutos),
+                   SUM(minutos - :jornada),
+                   SUM(MAX(minutos - :jornada, 0)),
+                   SUM(MAX(:jornada - minutos, 0))
+            FROM registros
+            WHERE data BETWEEN :inicio AND :fim AND minutos IS NOT NULL
+            GROUP BY mes
+            ORDER BY mes
+        """, {"inicio": inicio.isoformat(), "fim": fim.isoformat(), "jornada": jornada_minutos}).fetchall()
+
+    def fechar(self):
+        self.conexao.close()
+
+
+class ClienteSisrefHttp:
+    """Cliente HTTP com conexões reaproveitadas (keep-alive) que usa os cookies da sessão do navegador"""
+
+    def __init__(self, cookies: List[dict], user_agent: Optional[str] = None, timeout: float = 15,
+                 caminho_login: str = urlsplit(Config.URL_LOGIN).path):
+        self.caminho_login = caminho_login  # redirecionar para cá significa sessão expirada
+        self.pool = urllib3.PoolManager(
+            num_pools=2,
+            maxsize=2,
+            timeout=urllib3.Timeout(total=timeout),
+            retries=urllib3.Retry(total=2, connect=2, read=1, redirect=5, backoff_factor=0.5)
+        )
+        self.cookies: Dict[str, dict] = {cookie["name"]: dict(cookie) for cookie in cookies}
+        self.user_agent = user_agent
+        self.requisicoes = 0
+        self._lock = threading.Lock()  # cookies e contador são compartilhados pelas threads da sincronização
+
+    def cookies_selenium(self) -> List[dict]:
+        """Cookies atuais no formato aceito pelo Selenium (para reabrir um navegador na mesma sessão)"""
+        with self._lock:
+            return [dict(cookie) for cookie in self.cookies.values()]
+
+    def _atualizar_cookies(self, resposta: urllib3.BaseHTTPResponse):
+        """Incorpora cookies renovados pelo servidor (Set-Cookie); chamar com o lock"""
+        for cabecalho in resposta.headers.getlist("Set-Cookie"):
+            recebidos = SimpleCookie()
+            recebidos.load(cabecalho)
+            for nome, morsel in recebidos.items():
+                cookie = self.cookies.setdefault(nome, {"name": nome, "path": morsel["path"] or "/"})
+                cookie["value"] = morsel.value
+
+    def obter(self, url: str) -> Tuple[str, Optional[datetime], str]:
+        """Baixa uma página; devolve (html, horário do servidor pelo cabeçalho Date, URL final)"""
+        with self._lock:
+            cabecalhos = {"Cookie": "; ".join(f"{c['name']}={c['value']}" for c in self.cookies.values())}
+        if self.user_agent:
+            cabecalhos["User-Agent"] = self.user_agent
+
+        resposta = self.pool.request("GET", url, headers=cabecalhos, redirect=True)
+        with self._lock:
+            self.requisicoes += 1
+            self._atualizar_cookies(resposta)
+
+        url_final = resposta.geturl() or url
+        if resposta.status >= 400:
+            raise ConnectionError(f"HTTP {resposta.status} ao acessar {url_final}")
+
+        if urlsplit(url_final).path == self.caminho_login and urlsplit(url).path != self.caminho_login:
+            raise SessaoExpiradaError(f"Sessão expirada: redirecionado para {url_final}")
+
+        horario_servidor = None
+        if resposta.headers.get("Date"):
+            horario_servidor = parsedate_to_datetime(resposta.headers["Date"]).astimezone().replace(tzinfo=None)
+
+        return resposta.data.decode("utf-8", errors="replace"), horario_servidor, url_final
+
+    def ler_pagina(self, url: str) -> Tuple[ExtratorPaginaSisref, Optional[datetime]]:
+        """Baixa e interpreta uma página do SISREF"""
+        html, horario_servidor, _ = self.obter(url)
+        extrator = ExtratorPaginaSisref()
+        extrator.feed(html)
+        extrator.close()
+        return extrator, horario_servidor
+
+    def ler_texto_relogio(self, url: str) -> Optional[str]:
+        """Texto do relógio da página ou, se ele for montado só por JavaScript, o cabeçalho Date"""
+        extrator, horario_servidor = self.ler_pagina(url)
+        texto = extrator.campos.get("relogio")
+        if texto and re.search(PADRAO_HORARIO_RELOGIO, texto):
+            return texto
+
+        return horario_servidor.strftime("%H:%M:%S") if horario_servidor else None
+
+    def encerrar(self) -> None:
+        """Fecha as conexões"""
+        self.pool.clear()
+
+
+class CapturaDebugAssincrona:
+    """Grava screenshots e HTML de debug em segundo plano, com compressão, deduplicação e retenção"""
+
+    def __init__(self, diretorio: str = "debug", max_arquivos: int = 40, max_bytes: int = 50 * 1024 * 1024):
+        self.diretorio = diretorio
+        self.max_arquivos = max_arquivos
+        self.max_bytes = max_bytes
+        self._fila: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._hashes: Optional[set] = None
+
+    def capturar(self, navegador: BackendNavegador):
+        """Copia screenshot e HTML da página (rápido) e deixa a gravação para a thread de fundo"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
+        screenshot = navegador.capturar_tela()
+        html = navegador.html()
+
+        if not self._thread:
+            self._thread = threading.Thread(target=self._gravar, name="captura-debug", daemon=True)
+            self._thread.start()
+
+        self._fila.put((timestamp, screenshot, html))
+
+    def _hashes_existentes(self) -> set:
+        """Hashes dos arquivos já gravados (fazem parte do nome do arquivo)"""
+        hashes = set()
+        if os.path.isdir(self.diretorio):
+            for nome in os.listdir(self.diretorio):
+                match = re.match(r"debug_\w+?_\d{8}_\d{6}_\d{3}_([0-9a-f]{12})\.", nome)
+                if match:
+                    hashes.add(match.group(1))
+        return hashes
+
+    def _gravar(self):
+        """Thread de fundo: comprime, deduplica, grava e aplica a retenção"""
+        while True:
+            item = self._fila.get()
+            try:
+                if item is None:
+                    return
+                self._gravar_item(*item)
+            except Exception as e:
+                logging.error(f"Erro ao salvar debug: {e}")
+            finally:
+                self._fila.task_done()
+
+    @staticmethod
+    def resumo_pagina(dados_html: bytes) -> str:
+        """Hash do HTML sem os horários (o relógio ao vivo mudaria o hash de toda captura da mesma página)"""
+        return hashlib.sha256(re.sub(rb"\b\d{1,2}:\d{2}:\d{2}\b", b"--:--:--", dados_html)).hexdigest()[:12]
+
+    def _gravar_item(self, timestamp: str, screenshot: bytes, html: str):
+        os.makedirs(self.diretorio, exist_ok=True)
+        if self._hashes is None:
+            self._hashes = self._hashes_existentes()
+
+        # Screenshot e HTML formam uma captura: mesmo hash (o da página), gravados e removidos juntos.
+        # O screenshot mostra o relógio, então só o HTML normalizado diz se a página é a mesma.
+        dados_html = html.encode("utf-8")
+        resumo = self.resumo_pagina(dados_html) if dados_html else hashlib.sha256(screenshot).hexdigest()[:12]
+        if resumo in self._hashes:
+            logging.info(f"📷 Debug: página igual a uma captura anterior ({resumo}), não gravada")
+            return
+
+        salvos = []
+        arquivos = [
+            ("screenshot", screenshot, "png", False),  # PNG já é comprimido
+            ("pagina", dados_html, "html.gz", True),
+        ]
+        for tipo, dados, extensao, comprimir in arquivos:
+            caminho = os.path.join(self.diretorio, f"debug_{tipo}_{timestamp}_{resumo}.{extensao}")
+            with open(caminho, "wb") as f:
+                f.write(gzip.compress(dados, compresslevel=6) if comprimir else dados)
+            salvos.append(caminho)
+        self._hashes.add(resumo)
+
+        logging.info(f"📷 Debug salvos: {', '.join(salvos)}")
+        self._aplicar_retencao()
+
+    def _aplicar_retencao(self):
+        """Remove as capturas mais antigas (screenshot e HTML juntos) além do limite de quantidade ou tamanho"""
+        capturas: Dict[str, List[Tuple[float, int, str]]] = {}
+        for nome in os.listdir(self.diretorio):
+            if nome.startswith("debug_"):
+                caminho = os.path.join(self.diretorio, nome)
+                estado = os.stat(caminho)
+                # Arquivos da mesma captura diferem só no tipo e na extensão
+                match = re.match(r"debug_\w+?_(\d{8}_\d{6}_\d{3}_[0-9a-f]{12})\.", nome)
+                capturas.setdefault(match.group(1) if match else nome, []).append(
+                    (estado.st_mtime, estado.st_size, caminho))
+
+        ordenadas = sorted(capturas.items(), key=lambda item: max(mtime for mtime, _, _ in item[1]))
+        quantidade = sum(len(arquivos) for arquivos in capturas.values())
+        total = sum(tamanho for arquivos in capturas.values() for _, tamanho, _ in arquivos)
+        while ordenadas and (quantidade > self.max_arquivos or total > self.max_bytes):
+            chave, arquivos = ordenadas.pop(0)
+            for _, tamanho, caminho in arquivos:
+                os.remove(caminho)
+                total -= tamanho
+                quantidade -= 1
+            self._hashes.discard(chave.rsplit("_", 1)[-1])
+
+    def finalizar(self, timeout: float = 10):
+        """Espera as gravações pendentes terminarem"""
+        if not self._thread:
+            return
+
+        self._fila.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+
+class AgendadorSaida:
+    """Decide quanto dormir entre verificações conforme a proximidade do horário de saída"""
+
+    def __init__(self, antecedencia: int, intervalo_minimo: int, intervalo_maximo: int, max_despertares: int):
+        self.antecedencia = antecedencia
+        self.intervalo_minimo = intervalo_minimo
+        self.intervalo_maximo = intervalo_maximo
+        self.max_despertares = max_despertares
+        self.despertares = 0
+
+    def proximo_intervalo(self, tempo_restante: timedelta) -> float:
+        """Calcula o próximo sono (em segundos) a partir do tempo restante"""
+        self.despertares += 1
+        restante = tempo_restante.total_seconds()
+
+        if restante <= 0:
+            return 0
+
+        # Esgotou o limite de despertares: dorme direto até o horário de saída
+        if self.despertares >= self.max_despertares:
+            return restante
+
+        # Longe da saída: dorme até a janela de antecedência (em blocos de no máximo intervalo_maximo)
+        if restante > self.antecedencia:
+            return min(restante - self.antecedencia, self.intervalo_maximo)
+
+        # Dentro da janela: reduz o passo pela metade a cada verificação
+        return max(self.intervalo_minimo, restante / 2)
+
+
+class EstimadorRelogioServidor:
+    """Estima o horário do servidor a partir de poucas leituras do relógio da página"""
+
+    def __init__(self, relogio_manager: RelógioPontoManager, ler_texto_relogio: Callable[[], Optional[str]],
+                 amostras: int = 3, intervalo_amostras: float = 1.3, erro_maximo: float = 2.0,
+                 deriva_maxima: float = 0.001, relogio: Optional[Relogio] = None):
+        self.relogio_manager = relogio_manager
+        self.relogio = relogio or Relogio()
+        self.ler_texto_relogio = ler_texto_relogio
+        self.amostras = amostras
+        self.intervalo_amostras = intervalo_amostras
+        self.erro_maximo = erro_maximo
+        self.deriva_maxima = deriva_maxima
+
+        self.offset: Optional[float] = None  # horário do servidor (timestamp) - relógio monotônico
+        self.deriva = 0.0
+        self.incerteza = 0.5
+        self.instante_sincronizacao = 0.0
+        self.sincronizacoes = 0
+
+    def _coletar_amostra(self) -> Optional[Tuple[float, float, float]]:
+        """Lê o relógio uma vez e devolve (instante monotônico, timestamp do servidor, meia latência)"""
+        antes = self.relogio.monotonico()
+        texto = self.ler_texto_relogio()
+        depois = self.relogio.monotonico()
+
+        if not texto:
+            return None
+
+        horario = self.relogio_manager.extrair_horario_relogio(texto)
+        if not horario:
+            return None
+
+        return (antes + depois) / 2, horario.timestamp(), (depois - antes) / 2
+
+    def sincronizar(self) -> bool:
+        """Amostra o relógio da página e recalcula offset, incerteza e deriva"""
+        amostras = []
+        for indice in range(self.amostras):
+            if indice:
+                self.relogio.dormir(self.intervalo_amostras)
+            amostra = self._coletar_amostra()
+            if amostra:
+                amostras.append(amostra)
+
+        if not amostras:
+            logging.warning("⚠️ Estimador: nenhuma leitura válida do relógio da página")
+            return False
+
+        # O relógio mostra segundos inteiros: cada leitura limita o offset a um intervalo de 1 segundo.
+        # A interseção dos intervalos de todas as leituras reduz a incerteza abaixo de meio segundo.
+        limite_inferior = max(servidor - instante - meia_latencia for instante, servidor, meia_latencia in amostras)
+        limite_superior = min(servidor + 1 - instante + meia_latencia for instante, servidor, meia_latencia in amostras)
+
+        if limite_inferior <= limite_superior:
+            offset = (limite_inferior + limite_superior) / 2
+            incerteza = (limite_superior - limite_inferior) / 2
+        else:
+            # Leituras inconsistentes (página lenta ou relógio ajustado): usa a média
+            offset = sum(servidor + 0.5 - instante for instante, servidor, _ in amostras) / len(amostras)
+            incerteza = 0.5 + max(meia_latencia for _, _, meia_latencia in amostras)
+
+        instante = amostras[-1][0]
+
+        # A partir da segunda sincronização, mede a deriva entre o relógio da página e o local
+        if self.offset is not None and instante > self.instante_sincronizacao:
+            deriva = (offset - self.offset) / (instante - self.instante_sincronizacao)
+            if abs(deriva) <= self.deriva_maxima * 10:
+                self.deriva = deriva
+
+        self.offset = offset
+        self.incerteza = incerteza
+        self.instante_sincronizacao = instante
+        self.sincronizacoes += 1
+
+        logging.info(f"🔄 Relógio do servidor sincronizado ({len(amostras)} leituras, "
+                     f"incerteza ±{incerteza:.2f}s, deriva {self.deriva * 1e6:.0f} ppm)")
+        return True
+
+    def erro_estimado(self) -> float:
+        """Erro estimado (segundos) do horário calculado localmente"""
+        if self.offset is None:
+            return float("inf")
+
+        return self.incerteza + self.deriva_maxima * (self.relogio.monotonico() - self.instante_sincronizacao)
+
+    def agora(self) -> Optional[datetime]:
+        """Horário atual do servidor, ressincronizando apenas quando o erro passa do limite"""
+        if self.erro_estimado() > self.erro_maximo and not self.sincronizar():
+            return None
+
+        instante = self.relogio.monotonico()
+        decorrido = instante - self.instante_sincronizacao
+        return datetime.fromtimestamp(instante + self.offset + self.deriva * decorrido)
+
+
+class NucleoEventosNavegador:
+    """Núcleo asyncio que reage a eventos empurrados pelo navegador (WebDriver BiDi) em vez de consultar"""
+
+    PREFIXO = "sisref-evento:"
+
+    # Observador injetado em cada documento: avisa pelo console quando 'ent'/'sai' mudam e quando o relógio
+    # da página deixa de andar junto com o relógio local (então, com o relógio estável, não há eventos)
+    SCRIPT_OBSERVADOR = """
+        (function () {
+            if (window.__observadorSisref) return;
+            window.__observadorSisref = true;
+
+            const enviar = (tipo, dados) =>
+                console.debug('sisref-evento:' + JSON.stringify(Object.assign({tipo: tipo}, dados)));
+            const ultimo = {};
+            let baseRelogio = null;
+
+            function ler(id) {
+                const el = document.getElementById(id);
+                if (!el) return null;
+                return (el.matches('input, textarea, select') ? el.value : el.textContent).trim();
+            }
+
+            function segundos(texto) {
+                const m = /(\\d{1,2}):(\\d{2}):(\\d{2})/.exec(texto || '');
+                return m ? (+m[1]) * 3600 + (+m[2]) * 60 + (+m[3]) : null;
+            }
+
+            function verificar() {
+                for (const id of ['ent', 'sai']) {
+                    const valor = ler(id);
+                    if (valor !== null && valor !== ultimo[id]) {
+                        ultimo[id] = valor;
+                        enviar('campo', {id: id, valor: valor});
+                    }
+                }
+
+                const texto = ler('relogio');
+                const s = segundos(texto);
+                if (s === null) return;
+                const agora = Date.now();
+                if (baseRelogio) {
+                    const esperado = baseRelogio[0] + Math.round((agora - baseRelogio[1]) / 1000);
+                    const diferenca = (((s - esperado) % 86400) + 86400) % 86400;
+                    if (diferenca < 2 || diferenca > 86398) return;
+                }
+                baseRelogio = [s, agora];
+                enviar('relogio', {texto: texto});
+            }
+
+            function iniciar() {
+                enviar('pagina', {caminho: location.pathname});
+                verificar();
+                new MutationObserver(verificar).observe(document.documentElement, {
+                    subtree: true, childList: true, characterData: true, attributes: true, attributeFilter: ['value']
+                });
+            }
+
+            if (document.readyState === 'loading') {
+                document.addEventListener('DOMContentLoaded', iniciar);
+            } else {
+                iniciar();
+            }
+        })();
+    """
+
+    def __init__(self, driver: webdriver.Chrome, relogio_manager: RelógioPontoManager, caminho_login: str,
+                 relogio: Optional[Relogio] = None):
+        self.driver = driver
+        self.relogio_manager = relogio_manager
+        self.relogio = relogio or Relogio()
+        self.caminho_login = caminho_login
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.campos: Dict[str, str] = {}
+        self.caminho: Optional[str] = None
+        self.ultima_leitura: Optional[Tuple[datetime, float]] = None  # (horário da página, instante monotônico)
+        self.encerrando = False
+        self.eventos = 0
+        self.alertas_aceitos = 0
+        self.alertas_descartados = 0
+        self._aceite: Optional[asyncio.Future] = None  # resposta ao confirm() do encerramento
+        self._mudanca: Optional[asyncio.Event] = None
+        self._id_console: Optional[int] = None
+        self._id_alerta: Optional[int] = None
+
+    # Lado do navegador: callbacks chamados na thread do WebSocket do BiDi
+
+    def _ao_console(self, entrada):
+        texto = getattr(entrada, "text", None) or ""
+        if not texto.startswith(self.PREFIXO):
+            return
+        try:
+            evento = json.loads(texto[len(self.PREFIXO):])
+            self.loop.call_soon_threadsafe(self._despachar, evento, self.relogio.monotonico())
+        except (ValueError, RuntimeError):
+            pass  # mensagem malformada ou loop já encerrado
+
+    def _ao_alerta(self, parametros):
+        try:
+            self.loop.call_soon_threadsafe(self._alerta_aberto, parametros)
+        except RuntimeError:
+            pass
+
+    # Lado do asyncio: tudo abaixo roda na thread do loop
+
+    def _notificar(self):
+        self._mudanca.set()
+        self._mudanca = asyncio.Event()
+
+    def _despachar(self, evento: dict, instante: float):
+        self.eventos += 1
+        tipo = evento.get("tipo")
+
+        if tipo == "pagina":
+            self.caminho = evento.get("caminho")
+        elif tipo == "campo":
+            self.campos[evento["id"]] = evento.get("valor") or ""
+        elif tipo == "relogio":
+            horario = self.relogio_manager.extrair_horario_relogio(evento.get("texto", ""))
+            if horario:
+                self.ultima_leitura = (horario, instante)
+
+        self._notificar()
+
+    def _responder_alerta(self, contexto, aceitar: bool) -> asyncio.Future:
+        """Responde ao alerta em outra thread (o callback do WebSocket não pode esperar o próprio WebSocket)"""
+        return self.loop.run_in_executor(
+            None, lambda: self.driver.browsing_context.handle_user_prompt(context=contexto, accept=aceitar))
+
+    def _alerta_aberto(self, parametros):
+        campo = (lambda nome: parametros.get(nome)) if isinstance(parametros, dict) else \
+            (lambda nome: getattr(parametros, nome, None))
+        mensagem = campo("message") or ""
+        contexto = campo("context")
+
+        if not self.encerrando:
+            # Com unhandledPromptBehavior "ignore" um alerta aberto trava todos os comandos: qualquer outro
+            # (erro de login, aviso do SISREF) é descartado na hora
+            logging.warning(f"⚠️ Alerta inesperado descartado: {mensagem}")
+            self.alertas_descartados += 1
+
+            def registrar_falha(futuro: asyncio.Future):
+                if not futuro.cancelled() and futuro.exception():
+                    logging.warning(f"⚠️ Não foi possível descartar o alerta: {futuro.exception()}")
+
+            self._responder_alerta(contexto, False).add_done_callback(registrar_falha)
+            return
+
+        # Aceita no mesmo instante em que o confirm() abre; o resultado é conferido em encerrar()
+        logging.info(f"Confirmação: {mensagem}")
+        self.alertas_aceitos += 1
+        self._aceite = self._responder_alerta(contexto, True)
+
+    def conectar(self) -> bool:
+        """Assina console e alertas e injeta o observador; False se o driver não tiver BiDi"""
+        try:
+            self._id_console = self.driver.script.add_console_message_handler(self._ao_console)
+            self._id_alerta = self.driver.browsing_context.add_event_handler("user_prompt_opened", self._ao_alerta)
+            self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": self.SCRIPT_OBSERVADOR})
+            self.driver.execute_script(self.SCRIPT_OBSERVADOR)
+            return True
+        except Exception as e:
+            logging.warning(f"⚠️ Eventos do navegador indisponíveis: {e}")
+            self.desconectar()
+            return False
+
+    def desconectar(self):
+        """Remove as assinaturas de eventos"""
+        try:
+            if self._id_console is not None:
+                self.driver.script.remove_console_message_handler(self._id_console)
+            if self._id_alerta is not None:
+                self.driver.browsing_context.remove_event_handler("user_prompt_opened", self._id_alerta)
+        except Exception:
+            pass
+        self._id_console = self._id_alerta = None
+
+    def horario_atual(self) -> Optional[datetime]:
+        """Último horário empurrado pela página, avançado pelo relógio monotônico local"""
+        if not self.ultima_leitura:
+            return None
+        horario, instante = self.ultima_leitura
+        return horario + timedelta(seconds=self.relogio.monotonico() - instante)
+
+    async def aguardar(self, condicao: Callable[[], bool], timeout: float):
+        """Espera sem consultar o navegador: só reavalia a condição quando chega um evento"""
+        limite = self.loop.time() + timeout
+        while not condicao():
+            restante = limite - self.loop.time()
+            if restante <= 0:
+                raise asyncio.TimeoutError()
+            try:
+                await asyncio.wait_for(self._mudanca.wait(), restante)
+            except asyncio.TimeoutError:
+                continue
+
+    async def executar(self, sistema: "SistemaInss") -> Optional[bool]:
+        """Dorme até o horário de saída e encerra; None quando for preciso voltar às consultas"""
+        self.loop = asyncio.get_running_loop()
+        self._mudanca = asyncio.Event()
+        if not self.conectar():
+            return None
+
+        try:
+            await self.aguardar(lambda: self.ultima_leitura is not None, sistema.config.TIMEOUT_PADRAO)
+            logging.info("📡 Monitoramento por eventos do navegador ativo (sem consultas periódicas)")
+
+            while True:
+                if self.caminho == self.caminho_login:
+                    raise SessaoExpiradaError("a página voltou para o login")
+
+                horario_atual = self.horario_atual()
+                if self.relogio_manager.verificar_se_pode_sair(horario_atual):
+                    break
+
+                tempo_restante = self.relogio_manager.tempo_restante(horario_atual)
+                logging.info(f"🕐 Horário atual: {horario_atual.strftime('%H:%M:%S')} | "
+                             f"Tempo restante: {self.relogio_manager.formatar_tempo_restante(tempo_restante)}")
+
+                # Acorda no horário de saída, ou antes se a página empurrar alguma mudança
+                try:
+                    await asyncio.wait_for(self._mudanca.wait(), min(tempo_restante.total_seconds(), 3600))
+                except asyncio.TimeoutError:
+                    pass
+
+            logging.info("🎉 Completou 6 horas de trabalho!")
+            return await self.encerrar(sistema)
+        finally:
+            self.desconectar()
+            logging.info(f"📡 {self.eventos} eventos recebidos, {self.alertas_aceitos} confirmações aceitas, "
+                         f"{self.alertas_descartados} alertas descartados")
+
+    async def erro_aceite(self) -> Optional[BaseException]:
+        """Erro ao aceitar o confirm() do encerramento (None se foi aceito ou ainda não abriu)"""
+        if not self._aceite:
+            return None
+        try:
+            await asyncio.wait_for(asyncio.shield(self._aceite), 5)
+            return None
+        except Exception as e:
+            return e
+
+    async def encerrar(self, sistema: "SistemaInss") -> Optional[bool]:
+        """Clica em 'Encerrar Expediente'; o confirm() é aceito pelo evento e a saída chega pelo observador
+
+        Devolve True só com o campo 'sai' preenchido; None (volta às consultas) se a saída não aparecer.
+        Se o clique cair na página de login, a sessão expirou (SessaoExpiradaError).
+        """
+        botao = await asyncio.to_thread(sistema.localizar_botao_encerrar)
+        if not botao:
+            return None
+
+        self.encerrando = True
+        inicio = self.relogio.monotonico()
+        try:
+            await asyncio.to_thread(self.driver.execute_script, "arguments[0].click();", botao)
+        except UnexpectedAlertPresentException:
+            pass  # o confirm() abriu durante o clique; quem responde é o evento do alerta
+        logging.info("\U0001F518 Botão 'Encerrar Expediente' clicado")
+
+        try:
+            await self.aguardar(lambda: bool(self.campos.get("sai")) or self.caminho == self.caminho_login, 10)
+        except asyncio.TimeoutError:
+            pass
+
+        erro = await self.erro_aceite()
+        if erro:
+            logging.error(f"❌ Falha ao aceitar a confirmação do encerramento: {erro}")
+
+        if self.caminho == self.caminho_login:
+            raise SessaoExpiradaError("o clique em 'Encerrar Expediente' caiu na página de login")
+        if not self.campos.get("sai"):
+            logging.warning("⚠️ Campo de saída não apareceu após o encerramento")
+            return None
+
+        logging.info(f"🕔 Horário de saída registrado: {self.campos['sai']} "
+                     f"({self.relogio.monotonico() - inicio:.2f}s após o clique)")
+        return True
+
+
+class SistemaInss:
+    """Classe principal para gerenciar o sistema INSS"""
+
+    def __init__(self, config: Config, driver_antecipado: Optional[Future] = None,
+                 relogio: Optional[Relogio] = None):
+        self.config = config
+        self.navegador: Optional[BackendNavegador] = None
+        self.driver_antecipado = driver_antecipado  # navegador do login já sendo aberto em paralelo
+        self.credenciais_manager = CredenciaisManager()
+        self.relogio = relogio or Relogio()
+        self.relogio_manager = RelógioPontoManager(self.salvar_checkpoint, self.relogio)
+        # Com SAIR_APOS_CALCULAR_HORARIO não há monitoramento a retomar
+        self.checkpoint = CheckpointPonto(
+            config.ARQUIVO_CHECKPOINT if config.USAR_CHECKPOINT and not config.SAIR_APOS_CALCULAR_HORARIO else None,
+            self.relogio)
+        self.sessao_checkpoint: Tuple[List[dict], Optional[str]] = ([], None)
+        self.cache_seletores = CacheSeletores(config.ARQUIVO_CACHE_SELETORES if config.USAR_CACHE_SELETORES else None)
+        self.estimador_relogio: Optional[EstimadorRelogioServidor] = None
+        if config.USAR_ESTIMADOR_RELOGIO:
+            self.estimador_relogio = EstimadorRelogioServidor(
+                self.relogio_manager,
+                self.ler_texto_relogio,
+                config.AMOSTRAS_RELOGIO,
+                config.INTERVALO_AMOSTRAS_RELOGIO,
+                config.ERRO_MAXIMO_RELOGIO,
+                config.DERIVA_MAXIMA_RELOGIO,
+                self.relogio
+            )
+
+        self.timeouts = GerenciadorTimeouts(
+            config.ARQUIVO_TIMEOUTS if config.USAR_TIMEOUTS_ADAPTATIVOS else None,
+            config.PERCENTIL_TIMEOUT,
+            config.FATOR_TIMEOUT,
+            config.MARGEM_TIMEOUT,
+            config.TIMEOUT_MINIMO,
+            config.TIMEOUT_MAXIMO,
+            config.AMOSTRAS_MINIMAS_TIMEOUT if config.USAR_TIMEOUTS_ADAPTATIVOS else sys.maxsize
+        )
+        # O disjuntor do login abre antes da última tentativa (que vira o teste após a pausa); com o limite
+        # geral acima de MAX_TENTATIVAS_LOGIN ele nunca dispararia
+        self.politica_login = PoliticaRetentativa(
+            "login", config.BACKOFF_BASE, config.BACKOFF_MAXIMO,
+            max(1, min(config.LIMITE_FALHAS_DISJUNTOR, config.MAX_TENTATIVAS_LOGIN - 1)),
+            config.TEMPO_ABERTURA_DISJUNTOR, relogio=self.relogio
+        )
+        self.politica_monitoramento = PoliticaRetentativa(
+            "monitoramento", config.BACKOFF_BASE, config.BACKOFF_MAXIMO,
+            config.LIMITE_FALHAS_DISJUNTOR, config.TEMPO_ABERTURA_DISJUNTOR, desconhecidos_retentaveis=True,
+            relogio=self.relogio,
+            # No monitoramento um texto mal formatado no relógio não justifica abandonar o dia
+            erros_fatais=(InvalidSessionIdException, NoSuchWindowException)
+        )
+        self.captura_debug = CapturaDebugAssincrona(
+            config.DIRETORIO_DEBUG, config.MAX_ARQUIVOS_DEBUG, config.MAX_MB_DEBUG * 1024 * 1024)
+        self.cliente_http: Optional[ClienteSisrefHttp] = None
+        self.url_monitorada: Optional[str] = None
+        self.ultima_leitura_relogio: Optional[Tuple[datetime, float]] = None  # (horário lido, relogio.monotonico())
+        self.instrumentacao: Optional[InstrumentacaoWebDriver] = None
+        if config.INSTRUMENTAR_WEBDRIVER:
+            self.instrumentacao = InstrumentacaoWebDriver()
+
+        self.vigia_memoria: Optional[VigiaMemoria] = None
+        if config.VIGIAR_MEMORIA:
+            self.vigia_memoria = VigiaMemoria(config.INTERVALO_VIGIA_MEMORIA, config.TETO_MEMORIA_MB * 1024 * 1024,
+                                              self.relogio)
+
+        self.pools_drivers: Dict[bool, PoolDrivers] = {}
+        if config.USAR_POOL_DRIVERS and BackendNavegador.classe(config.BACKEND_NAVEGADOR).PERMITE_OUTRA_THREAD:
+            perfis = [False, True] if config.PERFIL_ENXUTO else [False]
+            for enxuto in perfis:
+                self.pools_drivers[enxuto] = PoolDrivers(
+                    "enxuto" if enxuto else "login",
+                    lambda enxuto=enxuto: BackendNavegador.criar(config, enxuto),
+                    # Há um único login por execução: repor o Chrome do login deixaria outro ocioso o dia todo
+                    config.REPOR_DRIVER_POOL and enxuto,
+                    config.IDADE_MAXIMA_DRIVER_OCIOSO,
+                    config.INTERVALO_VERIFICACAO_POOL
+                )
+
+    @property
+    def driver(self) -> Optional[webdriver.Remote]:
+        """WebDriver do Selenium do navegador atual (None sem navegador ou num backend sem Selenium)"""
+        return self.navegador.driver if self.navegador else None
+
+    def aguardar(self, local: Optional[str], condicao, padrao: float, registrar_estouro: bool = True,
+                 intervalo: float = 0.5):
+        """Espera como o WebDriverWait (sobre o backend e o relógio do sistema) com o timeout adaptativo do local
+
+        Sem local, usa o timeout padrão e não alimenta o histórico de timeouts.
+        """
+        timeout = self.timeouts.timeout(local, padrao) if local else padrao
+        inicio = self.relogio.monotonico()
+
+        while True:
+            try:
+                resultado = condicao(self.navegador)
+                if resultado:
+                    break
+            except NoSuchElementException:
+                pass
+
+            if self.relogio.monotonico() - inicio >= timeout:
+                if registrar_estouro and local:
+                    self.timeouts.registrar_estouro(local, timeout)
+                raise TimeoutException(f"espera '{local}' esgotada em {timeout:.1f}s")
+            self.relogio.dormir(intervalo)  # padrão: mesmo intervalo de consulta do WebDriverWait
+
+        if local:
+            self.timeouts.registrar(local, self.relogio.monotonico() - inicio)
+        return resultado
+
+    @contextmanager
+    def fase(self, nome: str):
+        """Marca a fase atual da execução (usada para separar as métricas)"""
+        token = FASE_ATUAL.set(nome)
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.instrumentacao:
+                self.instrumentacao.registrar_fase(nome, time.perf_counter() - inicio)
+            FASE_ATUAL.reset(token)
+
+    def criar_driver(self, enxuto: bool = False) -> BackendNavegador:
+        """Obtém um navegador do pool (se ativado) ou abre um novo no backend configurado"""
+        with self.fase("inicio_driver"):
+            pool = self.pools_drivers.get(enxuto)
+            if pool:
+                navegador = pool.obter()
+            elif not enxuto and self.driver_antecipado:
+                futuro, self.driver_antecipado = self.driver_antecipado, None
+                inicio = time.monotonic()
+                navegador = futuro.result()
+                logging.info(f"🚀 Navegador iniciado em paralelo com a inicialização "
+                             f"(espera restante: {time.monotonic() - inicio:.1f}s)")
+            else:
+                navegador = BackendNavegador.criar(self.config, enxuto)
+
+        if self.instrumentacao and navegador.driver:
+            self.instrumentacao.instrumentar(navegador.driver)
+
+        return navegador
+
+    def preaquecer_drivers(self):
+        """Começa a preparar os drivers dos pools antes de serem pedidos (o Chrome sobe durante o banner)"""
+        for pool in self.pools_drivers.values():
+            pool.iniciar()
+
+    @contextmanager
+    def gerenciar_driver(self):
+        """Context manager para gerenciar o driver"""
+        try:
+            self.preaquecer_drivers()  # sem efeito se main() já tiver iniciado os pools
+            self.navegador = self.criar_driver()
+            yield self.navegador
+        finally:
+            if self.navegador:
+                self.navegador.encerrar()
+
+            if self.driver_antecipado:
+                BackendNavegador.descartar_em_paralelo(self.driver_antecipado)
+                self.driver_antecipado = None
 
-    @staticmethod
-    def criar_driver() -> webdriver.Chrome:
-        """Cria e configura o driver do Chrome"""
-        chrome_options = Options()
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        chrome_options.add_argument("--disable-extensions")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-web-security")
-        chrome_options.add_argument("--allow-running-insecure-content")
+            for pool in self.pools_drivers.values():
+                pool.encerrar()
 
+    def migrar_para_driver_enxuto(self) -> bool:
+        """Troca o Chrome do login pelo perfil enxuto, mantendo a sessão autenticada"""
         try:
-            driver = webdriver.Chrome(options=chrome_options)
-            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            return driver
-        except WebDriverException as e:
-            logging.error(f"Erro ao criar driver: {e}")
-            raise
+            inicio = time.monotonic()
+            url = self.navegador.url_atual
+            cookies = self.navegador.cookies()
 
+            novo_navegador = self.criar_driver(enxuto=True)
+            try:
+                novo_navegador.restaurar_sessao(cookies, url)
+            except Exception:
+                novo_navegador.encerrar()
+                raise
+
+            self.navegador.encerrar()
+            self.navegador = novo_navegador
+            logging.info(f"🪶 Sessão transferida para o perfil enxuto em {time.monotonic() - inicio:.1f}s")
+            return True
 
-class RelógioPontoManager:
-    """Gerencia o relógio do ponto e cálculos de tempo"""
-
-    def __init__(self):
-        self.horario_entrada = None
-        self.horario_saida_calculado = None
+        except Exception as e:
+            logging.warning(f"⚠️ Não foi possível usar o perfil enxuto, mantendo o navegador atual: {e}")
+            return False
 
-    def extrair_horario_relogio(self, texto: str) -> Optional[datetime]:
-        """Extrai horário do relógio no formato HH:MM:SS"""
+    def transferir_para_http(self) -> bool:
+        """Passa os cookies do navegador para um cliente HTTP e fecha o Chrome"""
         try:
-            # Extrai apenas a parte do horário (HH:MM:SS)
-            match = re.search(r'(\d{1,2}):(\d{2}):(\d{2})', texto)
-            if match:
-                horas = int(match.group(1))
-                minutos = int(match.group(2))
-                segundos = int(match.group(3))
+            url = self.navegador.url_atual
+            cookies = self.navegador.cookies()
+            user_agent = self.navegador.executar_script("return navigator.userAgent")
+
+            cliente = ClienteSisrefHttp(cookies, user_agent, self.config.TIMEOUT_HTTP,
+                                        urlsplit(self.config.URL_LOGIN).path)
+            extrator, _ = cliente.ler_pagina(url)
+            if "ent" not in extrator.campos and "relogio" not in extrator.campos:
+                raise ValueError("página lida por HTTP não contém os campos do ponto")
+
+            self.navegador.encerrar()
+            self.navegador = None
+            self.cliente_http = cliente
+            self.url_monitorada = url
+            logging.info("🌐 Sessão transferida para HTTP; navegador fechado até o encerramento")
+            return True
 
-                # Cria um datetime com a data de hoje
-                hoje = datetime.now().date()
-                horario = datetime.combine(hoje, datetime.min.time().replace(
-                    hour=horas, minute=minutos, second=segundos
-                ))
+        except Exception as e:
+            logging.warning(f"⚠️ Não foi possível acompanhar por HTTP, mantendo o navegador: {e}")
+            return False
 
-                return horario
+    def reabrir_navegador(self) -> bool:
+        """Abre um navegador novo na sessão que estava sendo acompanhada por HTTP"""
+        try:
+            inicio = time.monotonic()
+            self.navegador = self.criar_driver(enxuto=self.config.PERFIL_ENXUTO)
+            self.navegador.restaurar_sessao(self.cliente_http.cookies_selenium(), self.url_monitorada)
+            logging.info(f"🌐 Navegador reaberto na sessão em {time.monotonic() - inicio:.1f}s")
+            return True
         except Exception as e:
-            logging.error(f"Erro ao extrair horário do relógio: {e}")
+            logging.error(f"Erro ao reabrir o navegador: {e}")
+            return False
 
-        return None
+    def sessao_autenticada(self) -> bool:
+        """Verifica se o navegador está na página do ponto (e não de volta no login)"""
+        try:
+            if urlsplit(self.navegador.url_atual).path == urlsplit(self.config.URL_LOGIN).path:
+                return False
+
+            self.aguardar("sessao_restaurada", SondaDOM.condicao(["#ent", "#relogio"]), self.config.TIMEOUT_PADRAO)
+            return True
+        except Exception:
+            return False
+
+    def retomar_sessao(self, cookies: List[dict], url: str) -> bool:
+        """Abre um navegador na sessão salva; se ela tiver expirado, faz o login completo"""
+        inicio = time.monotonic()
 
-    def extrair_horario_campo(self, valor: str) -> Optional[datetime]:
-        """Extrai horário do campo de entrada no formato HH:MM:SS"""
         try:
-            if not valor or valor.strip() == "":
-                return None
+            if not self.navegador:
+                self.navegador = self.criar_driver(enxuto=self.config.PERFIL_ENXUTO)
 
-            # Remove espaços e verifica se está no formato correto
-            valor_limpo = valor.strip()
+            self.navegador.restaurar_sessao(cookies, url)
+            if self.sessao_autenticada():
+                logging.info(f"♻️ Sessão restaurada em {time.monotonic() - inicio:.1f}s")
+                return True
+        except Exception as e:
+            logging.warning(f"⚠️ Erro ao restaurar a sessão: {e}")
 
-            # Tenta diferentes formatos
-            formatos = ["%H:%M:%S", "%H:%M"]
+        logging.warning("⚠️ Sessão salva não é mais válida; fazendo login completo")
+        if self.config.PERFIL_ENXUTO and self.navegador:
+            # O login precisa do navegador completo (CAPTCHA)
+            self.navegador.encerrar()
+            self.navegador = None
+        if not self.navegador:
+            self.navegador = self.criar_driver()
 
-            for formato in formatos:
-                try:
-                    hora_obj = datetime.strptime(valor_limpo, formato).time()
-                    hoje = datetime.now().date()
-                    horario = datetime.combine(hoje, hora_obj)
-                    return horario
-                except ValueError:
-                    continue
+        if not self.realizar_login():
+            return False
 
-            logging.warning(f"Formato de horário não reconhecido: {valor}")
-            return None
+        if self.config.PERFIL_ENXUTO:
+            self.migrar_para_driver_enxuto()
+        return True
 
+    def salvar_checkpoint(self):
+        """Grava entrada, saída calculada e a sessão atual (cookies e URL) no checkpoint"""
+        if not self.checkpoint.caminho or not self.relogio_manager.horario_entrada:
+            return
+
+        try:
+            if self.navegador:
+                self.sessao_checkpoint = (self.navegador.cookies(), self.navegador.url_atual)
+            elif self.cliente_http:
+                self.sessao_checkpoint = (self.cliente_http.cookies_selenium(), self.url_monitorada)
         except Exception as e:
-            logging.error(f"Erro ao extrair horário do campo: {e}")
-            return None
+            # Mantém a última sessão conhecida
+            logging.warning(f"⚠️ Sessão não lida para o checkpoint: {e}")
+
+        cookies, url = self.sessao_checkpoint
+        self.checkpoint.salvar({
+            "horario_entrada": self.relogio_manager.horario_entrada.isoformat(),
+            "horario_saida_calculado": self.relogio_manager.horario_saida_calculado.isoformat(),
+            "url": url,
+            "cookies": cookies,
+            "salvo_em": self.relogio.agora().isoformat(timespec="seconds")
+        })
+
+    def retomar_expediente(self, estado: dict) -> bool:
+        """Restaura o estado do checkpoint e volta para a sessão salva (login completo só se ela expirou)"""
+        inicio = time.monotonic()
+        self.relogio_manager.restaurar(estado["horario_entrada"], estado["horario_saida_calculado"])
+        logging.info(f"🗂️ Checkpoint encontrado: entrada {estado['horario_entrada'].strftime('%H:%M:%S')}, "
+                     f"saída calculada {estado['horario_saida_calculado'].strftime('%H:%M:%S')}")
+
+        if not self.retomar_sessao(estado.get("cookies") or [], estado.get("url") or self.config.URL_LOGIN):
+            return False
 
-    def calcular_horario_saida(self, horario_entrada: datetime, horas_trabalho: int = 6) -> datetime:
-        """Calcula o horário de saída baseado no horário de entrada"""
-        return horario_entrada + timedelta(hours=horas_trabalho)
+        self.salvar_checkpoint()
+        logging.info(f"♻️ Expediente retomado em {time.monotonic() - inicio:.1f}s")
+        return True
 
-    def definir_horario_entrada(self, horario_atual: datetime):
-        """Define o horário de entrada e calcula o horário de saída"""
-        if not self.horario_entrada:
-            self.horario_entrada = horario_atual
-            self.horario_saida_calculado = self.calcular_horario_saida(self.horario_entrada)
+    def reciclar_driver(self) -> bool:
+        """Troca o Chrome por um novo na mesma sessão (entrada e saída calculada não mudam)
 
-            logging.info(f"🕐 Horário de entrada detectado: {self.horario_entrada.strftime('%H:%M:%S')}")
-            logging.info(f"🕕 Horário de saída calculado: {self.horario_saida_calculado.strftime('%H:%M:%S')}")
+        O navegador antigo só é fechado depois que o novo estiver na página do ponto; se algo falhar,
+        o monitoramento continua no antigo.
+        """
+        inicio = time.monotonic()
+        antigo = self.navegador
+        try:
+            cookies = antigo.cookies()
+            url = antigo.url_atual
+            novo = self.criar_driver(enxuto=self.config.PERFIL_ENXUTO)
+        except Exception as e:
+            logging.error(f"❌ Navegador novo não abriu, mantendo o atual: {e}")
+            return False
 
-    def verificar_se_pode_sair(self, horario_atual: datetime) -> bool:
-        """Verifica se já pode sair (completou 6 horas)"""
-        if not self.horario_saida_calculado:
+        self.navegador = novo
+        try:
+            novo.restaurar_sessao(cookies, url)
+            autenticado = self.sessao_autenticada()
+        except Exception as e:
+            logging.warning(f"⚠️ Erro ao restaurar a sessão no navegador novo: {e}")
+            autenticado = False
+
+        if not autenticado:
+            logging.error("❌ A sessão não passou para o navegador novo, mantendo o atual")
+            self.navegador = antigo
+            novo.encerrar()
             return False
 
-        return horario_atual >= self.horario_saida_calculado
+        antigo.encerrar()
+        self.salvar_checkpoint()
+        logging.info(f"🧠 Navegador trocado em {time.monotonic() - inicio:.1f}s")
+        return True
+
+    def vigiar_memoria(self):
+        """Amostra a memória do navegador e aplica o teto: recarrega a página e, se não bastar, troca o driver"""
+        if not self.vigia_memoria or not self.navegador:
+            return
+
+        acao = self.vigia_memoria.amostrar(self.navegador)
+        if acao == "recarregar":
+            logging.info("🧠 Recarregando a página para liberar memória")
+            self.navegador.recarregar()
+            self.aguardar_pagina_ponto()
+        elif acao == "reciclar" and not self.reciclar_driver():
+            # Segue no navegador atual; a próxima amostra acima do teto tenta de novo (recarga e troca)
+            logging.error("❌ Troca do navegador falhou; monitoramento segue no navegador atual")
+
+    def hibernar_ate_saida(self) -> bool:
+        """Fecha o navegador e dorme até ANTECEDENCIA_DAEMON_MINUTOS antes do horário de saída"""
+        horario_atual = self.obter_horario_servidor()
+        tempo_restante = self.relogio_manager.tempo_restante(horario_atual) if horario_atual else None
+        if not tempo_restante:
+            logging.warning("⚠️ Modo daemon: horário atual desconhecido, mantendo o navegador aberto")
+            return True
 
-    def tempo_restante(self, horario_atual: datetime) -> Optional[timedelta]:
-        """Calcula o tempo restante para completar 6 horas"""
-        if not self.horario_saida_calculado:
-            return None
+        espera = tempo_restante.total_seconds() - self.config.ANTECEDENCIA_DAEMON_MINUTOS * 60
+        if espera <= 0:
+            logging.info("⏰ Modo daemon: saída próxima, mantendo o navegador aberto")
+            return True
 
-        if horario_atual >= self.horario_saida_calculado:
-            return timedelta(0)
+        self.salvar_checkpoint()
+        cookies = self.navegador.cookies()
+        url = self.navegador.url_atual
+        self.navegador.encerrar()
+        self.navegador = None
 
-        return self.horario_saida_calculado - horario_atual
+        despertar = self.relogio.agora() + timedelta(seconds=espera)
+        logging.info(f"💤 Modo daemon: navegador fechado; reabrindo às {despertar.strftime('%H:%M:%S')} "
+                     f"({self.config.ANTECEDENCIA_DAEMON_MINUTOS} min antes da saída)")
 
-    def formatar_tempo_restante(self, tempo: timedelta) -> str:
-        """Formata o tempo restante de forma legível"""
-        if tempo.total_seconds() <= 0:
-            return "00:00:00"
+        # Dorme em blocos para registrar o andamento de hora em hora
+        limite = self.relogio.monotonico() + espera
+        while True:
+            restante = limite - self.relogio.monotonico()
+            if restante <= 0:
+                break
+            self.relogio.dormir(min(restante, 3600))
 
-        horas = int(tempo.total_seconds() // 3600)
-        minutos = int((tempo.total_seconds() % 3600) // 60)
-        segundos = int(tempo.total_seconds() % 60)
+            falta = timedelta(seconds=max(0.0, limite - self.relogio.monotonico()))
+            if falta:
+                logging.info(f"💤 Modo daemon: {self.relogio_manager.formatar_tempo_restante(falta)} "
+                             f"até reabrir o navegador")
 
-        return f"{horas:02d}:{minutos:02d}:{segundos:02d}"
+        logging.info("⏰ Modo daemon: reabrindo o navegador para o encerramento")
+        return self.retomar_sessao(cookies, url)
 
+    def encerrar_expediente_http(self) -> Optional[bool]:
+        """Encerra seguindo o link do botão por HTTP
 
-class SistemaInss:
-    """Classe principal para gerenciar o sistema INSS"""
+        Devolve None (usar o navegador) só antes de enviar o pedido; depois dele o resultado é definitivo,
+        para o encerramento nunca ser enviado duas vezes.
+        """
+        extrator, _ = self.cliente_http.ler_pagina(self.url_monitorada)
+        if not extrator.destinos_encerrar:
+            return None
 
-    def __init__(self, config: Config):
-        self.config = config
-        self.driver: Optional[webdriver.Chrome] = None
-        self.credenciais_manager = CredenciaisManager()
-        self.relogio_manager = RelógioPontoManager()
+        destino = urljoin(self.url_monitorada, extrator.destinos_encerrar[0])
+        logging.info(f"\U0001F518 Encerrando expediente por HTTP: {destino}")
+        try:
+            self.cliente_http.obter(destino)
+            extrator, _ = self.cliente_http.ler_pagina(self.url_monitorada)
+        except Exception as e:
+            logging.error(f"❌ Encerramento por HTTP enviado, mas sem confirmação: {e}")
+            return False
+
+        valor_saida = extrator.campos.get("sai")
+        if not valor_saida:
+            logging.error("❌ Campo de saída vazio após o encerramento por HTTP; confira o ponto manualmente")
+            return False
+
+        logging.info(f"🟢 Expediente encerrado! Horário de saída registrado: {valor_saida}")
+        return True
+
+    def aguardar_captcha(self):
+        """Aguarda o CAPTCHA ser preenchido, no máximo TEMPO_ESPERA_CAPTCHA segundos"""
+        script = """
+            const campo = document.querySelector(arguments[0]);
+            if (!campo) { return null; }
+            return {valor: campo.value || '', tamanho: campo.maxLength > 0 ? campo.maxLength : 0};
+        """
+        inicio = self.relogio.monotonico()
+
+        def captcha_preenchido(navegador: BackendNavegador) -> bool:
+            campo = navegador.executar_script(script, self.config.SELETOR_CAPTCHA)
+            if campo is None:
+                raise LookupError("campo do CAPTCHA não encontrado")
+
+            # Sem tamanho conhecido não há como saber se a digitação terminou (uma pausa enviaria
+            # o CAPTCHA pela metade e gastaria uma tentativa de login): usa a espera fixa
+            tamanho = self.config.TAMANHO_CAPTCHA or campo["tamanho"]
+            if not tamanho:
+                raise LookupError("tamanho do CAPTCHA desconhecido (defina TAMANHO_CAPTCHA)")
+            return len(campo["valor"].strip()) >= tamanho
 
-    @contextmanager
-    def gerenciar_driver(self):
-        """Context manager para gerenciar o driver"""
         try:
-            self.driver = WebDriverManager.criar_driver()
-            yield self.driver
-        finally:
-            if self.driver:
-                self.driver.quit()
+            # Sem local: o tempo de digitação não deve virar timeout adaptativo
+            self.aguardar(None, captcha_preenchido, self.config.TEMPO_ESPERA_CAPTCHA, intervalo=0.2)
+            logging.info(f"✅ CAPTCHA preenchido em {self.relogio.monotonico() - inicio:.1f}s")
+        except TimeoutException:
+            logging.info("⏳ Tempo do CAPTCHA esgotado, tentando entrar assim mesmo")
+        except LookupError as e:
+            # Sem campo reconhecível ou sem tamanho: mantém a espera fixa
+            logging.info(f"⏳ {e}; aguardando os {self.config.TEMPO_ESPERA_CAPTCHA} segundos")
+            self.relogio.dormir(max(0.0, self.config.TEMPO_ESPERA_CAPTCHA - (self.relogio.monotonico() - inicio)))
+
+    def aguardar_pagina_ponto(self):
+        """Aguarda o campo de entrada ou o relógio ter conteúdo, no máximo ESPERA_MAXIMA_PAGINA segundos"""
+        if not self.navegador:
+            return
+
+        inicio = time.monotonic()
+        try:
+            self.aguardar("pagina_ponto", SondaDOM.condicao(["#ent", "#relogio"], padrao=r"\d{1,2}:\d{2}"),
+                          self.config.ESPERA_MAXIMA_PAGINA, registrar_estouro=False)
+            logging.info(f"✅ Página do ponto pronta em {time.monotonic() - inicio:.1f}s")
+        except TimeoutException:
+            logging.info("⏳ Campos do ponto ainda vazios, seguindo com as estratégias de detecção")
 
     def realizar_login(self) -> bool:
         """Realiza login no sistema"""
         siape, senha = self.credenciais_manager.obter_credenciais()
 
         for tentativa in range(1, self.config.MAX_TENTATIVAS_LOGIN + 1):
+            try:
+                if tentativa > 1:
+                    self.politica_login.aguardar()
+                self.politica_login.antes_de_tentar()
+            except DisjuntorAbertoError as e:
+                logging.error(f"❌ {e}; login suspenso")
+                return False
+
             logging.info(f"Tentativa de login {tentativa}/{self.config.MAX_TENTATIVAS_LOGIN}")
 
             try:
-                self.driver.get(self.config.URL_LOGIN)
+                self.navegador.navegar(self.config.URL_LOGIN)
 
                 # Aguarda a página carregar
-                WebDriverWait(self.driver, self.config.TIMEOUT_PADRAO).until(
-                    EC.presence_of_element_located((By.ID, "lSiape"))
-                )
+                self.aguardar("login_formulario", SondaDOM.condicao(["#lSiape"]), self.config.TIMEOUT_PADRAO)
 
                 # Preenche credenciais
-                campo_siape = self.driver.find_element(By.ID, "lSiape")
-                campo_siape.clear()
-                campo_siape.send_keys(siape)
-
-                campo_senha = self.driver.find_element(By.ID, "lSenha")
-                campo_senha.clear()
-                campo_senha.send_keys(senha)
+                self.navegador.preencher("#lSiape", siape)
+                self.navegador.preencher("#lSenha", senha)
 
                 # Aguarda CAPTCHA
                 logging.info(f"⏳ Preencha o CAPTCHA manualmente em até {self.config.TEMPO_ESPERA_CAPTCHA} segundos...")
-                time.sleep(self.config.TEMPO_ESPERA_CAPTCHA)
+                self.aguardar_captcha()
 
                 # Clica em entrar
-                botao_entrar = WebDriverWait(self.driver, 20).until(
-                    EC.element_to_be_clickable((By.XPATH, "//button[@id='btn-enviar']"))
-                )
-                botao_entrar.click()
+                botao_entrar = self.aguardar(
+                    "login_botao", SondaDOM.condicao(["//button[@id='btn-enviar']"], exigir_clicavel=True), 20)
+                self.navegador.clicar(botao_entrar["elemento"])
 
                 # Verifica se login foi bem-sucedido
-                WebDriverWait(self.driver, 15).until(EC.url_changes(self.config.URL_LOGIN))
+                self.aguardar("login_redirecionamento",
+                              lambda navegador: navegador.url_atual != self.config.URL_LOGIN, 15)
 
                 logging.info("✅ Login realizado com sucesso!")
+                self.politica_login.registrar_sucesso()
                 return True
 
-            except UnexpectedAlertPresentException:
+            except UnexpectedAlertPresentException as e:
                 logging.warning("⚠️ CAPTCHA não informado ou incorreto!")
+                self.politica_login.registrar_falha(e)
                 try:
-                    alert = self.driver.switch_to.alert
-                    logging.info(f"Alerta: {alert.text}")
-                    alert.accept()
+                    mensagem = self.navegador.aguardar_alerta(0)
+                    if mensagem is not None:
+                        logging.info(f"Alerta: {mensagem}")
                 except Exception:
                     pass
 
-            except TimeoutException:
+            except TimeoutException as e:
                 logging.error("❌ Tempo esgotado durante login")
+                self.politica_login.registrar_falha(e)
 
             except Exception as e:
-                logging.error(f"❌ Erro inesperado no login: {e}")
-                break
+                if not self.politica_login.registrar_falha(e):
+                    logging.error(f"❌ Erro inesperado no login: {e}")
+                    break
+                logging.error(f"❌ Erro no login (nova tentativa): {e}")
 
         logging.error("❌ Falha no login após todas as tentativas")
         return False
 
+    def ler_valor_campo(self, id_campo: str, timeout: float) -> Optional[str]:
+        """Aguarda um campo de formulário e devolve seu valor; lança TimeoutException se não aparecer"""
+        if self.config.USAR_SONDA_LOTE or not self.driver:
+            return self.aguardar(f"campo_{id_campo}", SondaDOM.condicao([f"#{id_campo}"]), timeout)["valor"]
+
+        campo = self.aguardar(f"campo_{id_campo}",
+                              condicao_webdriver(EC.presence_of_element_located((By.ID, id_campo))), timeout)
+        return campo.get_attribute("value")
+
+    def saida_registrada(self) -> Optional[str]:
+        """Valor do campo de saída da página do ponto (None se vazio ou ausente)"""
+        self.aguardar_pagina_ponto()
+        try:
+            resultado = self.navegador.sondar(["#sai"])
+        except Exception as e:
+            logging.warning(f"⚠️ Campo de saída não lido: {e}")
+            return None
+        return (resultado or {}).get("valor") or None
+
     def obter_horario_ponto_entrada(self) -> Optional[datetime]:
         """Obtém o horário de entrada do ponto (quando bateu o ponto)"""
         try:
             # Procura pelo campo de entrada do ponto
-            campo_entrada = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.ID, "ent"))
-            )
-
-            valor_entrada = campo_entrada.get_attribute("value")
+            valor_entrada = self.ler_valor_campo("ent", 10)
             logging.info(f"🕐 Horário de entrada detectado no campo: {valor_entrada}")
 
             if valor_entrada:
@@ -297,53 +3235,76 @@ class SistemaInss:
 
         return None
 
-    def obter_horario_relogio(self) -> Optional[datetime]:
-        """Obtém o horário atual do relógio do sistema com múltiplas estratégias"""
-        try:
-            # Estratégia 1: Tentar o relógio principal
+    def ler_texto_relogio(self) -> Optional[str]:
+        """Lê o texto do relógio da página com múltiplas estratégias"""
+        if self.cliente_http:
+            return self.cliente_http.ler_texto_relogio(self.url_monitorada)
+
+        inicio = time.monotonic()
+        seletores = self.cache_seletores.ordenar("relogio", SELETORES_RELOGIO)
+
+        if self.config.USAR_SONDA_LOTE or not self.driver:
             try:
-                elemento_relogio = WebDriverWait(self.driver, 5).until(
-                    EC.presence_of_element_located((By.ID, "relogio"))
-                )
-                texto_relogio = elemento_relogio.text
-                horario = self.relogio_manager.extrair_horario_relogio(texto_relogio)
-                if horario:
-                    return horario
+                resultado = self.aguardar("relogio", SondaDOM.condicao(seletores, padrao=PADRAO_HORARIO_RELOGIO), 5)
+                self.cache_seletores.registrar_sucesso(
+                    "relogio", resultado["seletor"], resultado["indice"], time.monotonic() - inicio)
+                return resultado["texto"]
             except TimeoutException:
-                pass
+                self.cache_seletores.registrar_falha("relogio", time.monotonic() - inicio)
+                return None
 
-            # Estratégia 2: Tentar outros seletores de relógio
-            seletores_relogio = [
-                "#relogio",
-                ".relogio",
-                "*[id*='relogio']",
-                "*[class*='relogio']",
-                "*[id*='hora']",
-                "*[class*='hora']",
-                "*[id*='time']",
-                "span[id*='clock']",
-                "div[id*='clock']"
-            ]
-
-            for seletor in seletores_relogio:
-                try:
-                    elemento = self.driver.find_element(By.CSS_SELECTOR, seletor)
-                    texto = elemento.text
-                    if texto:
-                        horario = self.relogio_manager.extrair_horario_relogio(texto)
-                        if horario:
-                            return horario
-                except NoSuchElementException:
-                    continue
+        for posicao, seletor in enumerate(seletores):
+            try:
+                if posicao == 0:
+                    # Estratégia 1: aguarda o seletor preferido (o relógio principal ou o último que funcionou)
+                    elemento = self.aguardar(
+                        "relogio", condicao_webdriver(EC.presence_of_element_located(localizador(seletor))), 5)
+                else:
+                    # Estratégia 2: tenta os outros seletores de relógio
+                    elemento = self.driver.find_element(*localizador(seletor))
+
+                texto = elemento.text
+                if texto and self.relogio_manager.extrair_horario_relogio(texto):
+                    self.cache_seletores.registrar_sucesso("relogio", seletor, posicao, time.monotonic() - inicio)
+                    return texto
+            except (TimeoutException, NoSuchElementException):
+                continue
+
+        self.cache_seletores.registrar_falha("relogio", time.monotonic() - inicio)
+        return None
+
+    def obter_horario_relogio(self) -> Optional[datetime]:
+        """Obtém o horário atual do relógio do sistema com múltiplas estratégias"""
+        try:
+            texto = self.ler_texto_relogio()
+            if texto:
+                return self.relogio_manager.extrair_horario_relogio(texto)
 
             # Estratégia 3: Se não encontrar relógio, usar horário do sistema
             logging.warning("Relógio não encontrado, usando horário do sistema local")
-            return datetime.now()
+            return self.relogio.agora()
 
+        except SessaoExpiradaError:
+            raise  # tratada no monitoramento (novo login)
         except Exception as e:
             logging.error(f"Erro ao obter horário: {e}")
             return None
 
+    def obter_horario_servidor(self) -> Optional[datetime]:
+        """Obtém o horário do servidor pelo estimador (sem WebDriver) ou lendo o relógio da página"""
+        if self.estimador_relogio:
+            try:
+                horario = self.estimador_relogio.agora()
+                if horario:
+                    # Limite inferior da estimativa: com o erro de até meio segundo nunca sai antes das 6 horas
+                    return horario - timedelta(seconds=self.estimador_relogio.erro_estimado())
+            except SessaoExpiradaError:
+                raise
+            except Exception as e:
+                logging.error(f"Erro no estimador do relógio: {e}")
+
+        return self.obter_horario_relogio()
+
     def inicializar_horario_entrada(self) -> bool:
         """Inicializa o horário de entrada de forma mais robusta"""
         try:
@@ -358,12 +3319,14 @@ class SistemaInss:
                 logging.info(f"✅ Horário de entrada (do ponto): {horario_entrada.strftime('%H:%M:%S')}")
                 logging.info(
                     f"🕕 Horário de saída calculado: {self.relogio_manager.horario_saida_calculado.strftime('%H:%M:%S')}")
+                self.relogio_manager.notificar_mudanca()
 
                 # NOVA FUNCIONALIDADE: Sair após calcular horário de saída
                 if self.config.SAIR_APOS_CALCULAR_HORARIO:
                     logging.info("🚪 Configuração ativada: Saindo após calcular horário de saída...")
-                    logging.info("✋ Programa será encerrado em 5 segundos...")
-                    time.sleep(5)
+                    if self.config.PAUSA_ANTES_DE_SAIR:
+                        logging.info(f"✋ Programa será encerrado em {self.config.PAUSA_ANTES_DE_SAIR} segundos...")
+                        self.relogio.dormir(self.config.PAUSA_ANTES_DE_SAIR)
                     return False  # Retorna False para encerrar o programa
 
                 return True
@@ -376,8 +3339,9 @@ class SistemaInss:
                 # NOVA FUNCIONALIDADE: Sair após calcular horário de saída
                 if self.config.SAIR_APOS_CALCULAR_HORARIO:
                     logging.info("🚪 Configuração ativada: Saindo após calcular horário de saída...")
-                    logging.info("✋ Programa será encerrado em 3 segundos...")
-                    time.sleep(3)
+                    if self.config.PAUSA_ANTES_DE_SAIR:
+                        logging.info(f"✋ Programa será encerrado em {self.config.PAUSA_ANTES_DE_SAIR} segundos...")
+                        self.relogio.dormir(self.config.PAUSA_ANTES_DE_SAIR)
                     return False  # Retorna False para encerrar o programa
 
                 return True
@@ -388,38 +3352,58 @@ class SistemaInss:
             logging.error(f"Erro ao inicializar horário de entrada: {e}")
             return False
 
+    def localizar_botao_encerrar(self):
+        """Procura o botão 'Encerrar Expediente' começando pelo seletor que funcionou por último"""
+        inicio = time.monotonic()
+        seletores_botao = self.cache_seletores.ordenar("botao_encerrar", SELETORES_BOTAO_ENCERRAR)
+
+        # No perfil enxuto o <img> do botão não é baixado e o element_to_be_clickable exige tamanho: usa a sonda
+        if self.config.USAR_SONDA_LOTE or self.config.PERFIL_ENXUTO or not self.driver:
+            try:
+                resultado = self.aguardar("botao_encerrar", SondaDOM.condicao(seletores_botao, exigir_clicavel=True),
+                                          self.config.TIMEOUT_PADRAO)
+                logging.info(f"✅ Botão encontrado com seletor: {resultado['seletor']}")
+                self.cache_seletores.registrar_sucesso(
+                    "botao_encerrar", resultado["seletor"], resultado["indice"], time.monotonic() - inicio)
+                return resultado["elemento"]
+            except TimeoutException:
+                self.cache_seletores.registrar_falha("botao_encerrar", time.monotonic() - inicio)
+                return None
+
+        for posicao, seletor in enumerate(seletores_botao):
+            try:
+                botao_encerrar = self.aguardar(
+                    "botao_encerrar_seletor", condicao_webdriver(EC.element_to_be_clickable(localizador(seletor))), 5,
+                    registrar_estouro=False)
+                logging.info(f"✅ Botão encontrado com seletor: {seletor}")
+                self.cache_seletores.registrar_sucesso("botao_encerrar", seletor, posicao, time.monotonic() - inicio)
+                return botao_encerrar
+            except TimeoutException:
+                continue
+
+        self.cache_seletores.registrar_falha("botao_encerrar", time.monotonic() - inicio)
+        return None
+
     def encerrar_expediente(self) -> bool:
         """Encerra o expediente"""
+        if self.cliente_http and not self.navegador:
+            if self.config.ENCERRAR_VIA_HTTP:
+                try:
+                    resultado = self.encerrar_expediente_http()
+                    if resultado is not None:
+                        return resultado
+                except Exception as e:
+                    # Só chega aqui antes de o pedido sair (depois dele o resultado é sempre True ou False)
+                    logging.warning(f"⚠️ Encerramento por HTTP falhou: {e}")
+
+            # O botão depende de JavaScript: volta para o navegador com os mesmos cookies
+            if not self.reabrir_navegador():
+                return False
+
         try:
             logging.info("\U0001F518 Tentando encerrar expediente...")
 
-            seletores_botao = [
-                "//img[@alt='Encerrar Expediente']",
-                "//button[contains(text(), 'Encerrar')]",
-                "//input[@value='Encerrar Expediente']",
-                "//a[contains(text(), 'Encerrar')]",
-                ".btn-encerrar",
-                "*[alt*='Encerrar']",
-                "*[title*='Encerrar']",
-                "*[onclick*='encerrar']",
-                "*[onclick*='Encerrar']"
-            ]
-
-            botao_encerrar = None
-            for seletor in seletores_botao:
-                try:
-                    if seletor.startswith('//'):
-                        botao_encerrar = WebDriverWait(self.driver, 5).until(
-                            EC.element_to_be_clickable((By.XPATH, seletor))
-                        )
-                    else:
-                        botao_encerrar = WebDriverWait(self.driver, 5).until(
-                            EC.element_to_be_clickable((By.CSS_SELECTOR, seletor))
-                        )
-                    logging.info(f"✅ Botão encontrado com seletor: {seletor}")
-                    break
-                except TimeoutException:
-                    continue
+            botao_encerrar = self.localizar_botao_encerrar()
 
             if not botao_encerrar:
                 logging.error("❌ Botão de encerrar expediente não encontrado")
@@ -427,23 +3411,23 @@ class SistemaInss:
                 return False
 
             # Clica no botão
-            self.driver.execute_script("arguments[0].click();", botao_encerrar)
+            self.navegador.clicar(botao_encerrar)
             logging.info("\U0001F518 Botão 'Encerrar Expediente' clicado")
 
+            def alerta_aceito(navegador: BackendNavegador) -> Optional[Tuple[str]]:
+                # Tupla: um alerta sem texto ("") também conta como aceito
+                mensagem = navegador.aguardar_alerta(0)
+                return None if mensagem is None else (mensagem,)
+
             try:
-                WebDriverWait(self.driver, 10).until(EC.alert_is_present())
-                alert = self.driver.switch_to.alert
-                logging.info(f"Confirmação: {alert.text}")
-                alert.accept()
+                (mensagem,) = self.aguardar("alerta_confirmacao", alerta_aceito, 10, registrar_estouro=False)
+                logging.info(f"Confirmação: {mensagem}")
                 logging.info("🟢 Expediente encerrado com sucesso!")
             except TimeoutException:
                 logging.info("🟢 Expediente encerrado (sem confirmação de alerta)")
 
             # Aguarda campo de saída aparecer
-            campo_saida = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.ID, "sai"))
-            )
-            valor_saida = campo_saida.get_attribute("value")
+            valor_saida = self.ler_valor_campo("sai", 10)
             logging.info(f"🕔 Horário de saída registrado: {valor_saida}")
 
             return True
@@ -453,84 +3437,327 @@ class SistemaInss:
             self.salvar_debug_info()
             return False
 
-    def salvar_debug_info(self):
-        """Salva informações de debug"""
+    def monitorar_por_eventos(self) -> Optional[bool]:
+        """Acompanha o relógio pelos eventos do navegador; None quando for preciso voltar às consultas"""
+        nucleo = NucleoEventosNavegador(self.driver, self.relogio_manager, urlsplit(self.config.URL_LOGIN).path,
+                                        self.relogio)
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            screenshot_path = f"debug_screenshot_{timestamp}.png"
-            html_path = f"debug_pagina_{timestamp}.html"
+            with self.fase("monitoramento"):
+                return asyncio.run(nucleo.executar(self))
+        except SessaoExpiradaError as e:
+            logging.warning(f"⚠️ Sessão perdida durante o monitoramento por eventos: {e}")
+        except Exception as e:
+            logging.warning(f"⚠️ Monitoramento por eventos falhou: {e}")
+        return None
 
-            self.driver.save_screenshot(screenshot_path)
-            with open(html_path, "w", encoding="utf-8") as f:
-                f.write(self.driver.page_source)
+    def salvar_debug_info(self):
+        """Salva informações de debug (a gravação em disco acontece em segundo plano)"""
+        if not self.navegador:
+            logging.info("📷 Debug não capturado: nenhum navegador aberto")
+            return
 
-            logging.info(f"📷 Debug salvos: {screenshot_path}, {html_path}")
+        try:
+            self.captura_debug.capturar(self.navegador)
         except Exception as e:
             logging.error(f"Erro ao salvar debug: {e}")
 
-    def monitorar_relogio(self) -> bool:
+    def monitorar_relogio(self, retomado: bool = False) -> bool:
         """Monitora o relógio em tempo real e fecha o ponto automaticamente"""
         logging.info("🕐 Iniciando monitoramento do relógio...")
 
-        # Aguarda um pouco para a página carregar completamente
-        time.sleep(3)
+        if retomado:
+            # Entrada e saída calculada vieram do checkpoint
+            logging.info("♻️ Horário de entrada restaurado do checkpoint")
+        else:
+            # Aguarda a página do ponto ficar pronta (sem espera fixa)
+            self.aguardar_pagina_ponto()
+
+            # Inicializa o horário de entrada de forma mais robusta
+            with self.fase("entrada"):
+                entrada_inicializada = self.inicializar_horario_entrada()
+
+            if not entrada_inicializada:
+                logging.info("🚪 Encerrando programa conforme configuração...")
+                return True  # Retorna True para indicar que foi encerrado propositalmente
 
-        # Inicializa o horário de entrada de forma mais robusta
-        if not self.inicializar_horario_entrada():
-            logging.info("🚪 Encerrando programa conforme configuração...")
-            return True  # Retorna True para indicar que foi encerrado propositalmente
+        if self.config.MODO_DAEMON:
+            if not self.hibernar_ate_saida():
+                return False
+        elif self.config.MODO_SESSAO_HTTP:
+            self.transferir_para_http()
+
+        if self.config.USAR_EVENTOS_NAVEGADOR and self.driver:
+            encerrado = self.monitorar_por_eventos()
+            if encerrado is not None:
+                if encerrado:
+                    self.checkpoint.limpar()
+                return encerrado
+            logging.info("🔁 Voltando às consultas periódicas do relógio")
+
+        agendador = None
+        if self.config.MODO_AGENDADOR:
+            agendador = AgendadorSaida(
+                self.config.ANTECEDENCIA_AGENDADOR,
+                self.config.INTERVALO_MINIMO_AGENDADOR,
+                self.config.INTERVALO_MAXIMO_AGENDADOR,
+                self.config.MAX_DESPERTARES_AGENDADOR
+            )
+            logging.info("⏳ Modo agendador ativado: verificações concentradas perto do horário de saída")
 
         contador_verificacoes = 0
         while True:
             try:
                 contador_verificacoes += 1
 
+                # Disjuntor aberto: adia a leitura, mas nunca para além do horário de saída
+                try:
+                    self.politica_monitoramento.antes_de_tentar()
+                except DisjuntorAbertoError as e:
+                    restante = self.segundos_ate_saida()
+                    if restante is None or restante > 0:
+                        logging.warning(f"🔌 {e}; leitura do relógio adiada", extra={"repetivel": True})
+                        self.politica_monitoramento.aguardar(restante)
+                        continue
+                    self.politica_monitoramento.tentativas += 1
+
                 # Obtém horário atual do relógio
-                horario_atual = self.obter_horario_relogio()
+                inicio_leitura = time.perf_counter()
+                with self.fase("monitoramento"):
+                    horario_atual = self.obter_horario_servidor()
+                latencia = {"latencia_ms": (time.perf_counter() - inicio_leitura) * 1000}
+                periodica = {**latencia, "repetivel": True}  # linhas de todo ciclo: sujeitas ao filtro de repetidas
 
                 if not horario_atual:
-                    logging.warning("⚠️ Não foi possível obter horário do relógio")
-                    time.sleep(self.config.INTERVALO_VERIFICACAO)
+                    logging.warning("⚠️ Não foi possível obter horário do relógio", extra=latencia)
+                    self.politica_monitoramento.registrar_falha(LookupError("relógio não lido"))
+                    self.politica_monitoramento.aguardar(self.segundos_ate_saida())
                     continue
 
+                self.politica_monitoramento.registrar_sucesso()
+                self.ultima_leitura_relogio = (horario_atual, self.relogio.monotonico())
+
                 # Verifica se pode sair
                 if self.relogio_manager.verificar_se_pode_sair(horario_atual):
                     logging.info("🎉 Completou 6 horas de trabalho!")
-                    return self.encerrar_expediente()
+                    if agendador:
+                        logging.info(f"⏳ Agendador: {agendador.despertares} despertares até a saída")
+                    with self.fase("encerramento"):
+                        encerrado = self.encerrar_expediente()
+                    if encerrado:
+                        self.checkpoint.limpar()
+                    return encerrado
 
                 # Calcula tempo restante
+                intervalo = self.config.INTERVALO_VERIFICACAO
                 tempo_restante = self.relogio_manager.tempo_restante(horario_atual)
                 if tempo_restante:
                     tempo_formatado = self.relogio_manager.formatar_tempo_restante(tempo_restante)
 
-                    # Log a cada 10 verificações para não poluir muito
-                    if contador_verificacoes % 10 == 0:
+                    if agendador:
+                        intervalo = agendador.proximo_intervalo(tempo_restante)
+
+                    # Log a cada 10 verificações para não poluir muito (no agendador, a cada despertar)
+                    if agendador or contador_verificacoes % 10 == 0:
                         logging.info(f"🕐 Horário atual: {horario_atual.strftime('%H:%M:%S')} | "
-                                     f"Tempo restante: {tempo_formatado}")
+                                     f"Tempo restante: {tempo_formatado}", extra=periodica)
 
                     # Log quando faltam poucos minutos
                     if tempo_restante.total_seconds() <= 300:  # 5 minutos
-                        logging.info(f"⏰ ATENÇÃO: Faltam apenas {tempo_formatado} para completar 6 horas!")
+                        logging.info(f"⏰ ATENÇÃO: Faltam apenas {tempo_formatado} para completar 6 horas!",
+                                     extra=periodica)
+
+                # Memória do navegador (sem mexer nele quando a saída está a menos de um minuto)
+                if not tempo_restante or tempo_restante.total_seconds() > 60:
+                    self.vigiar_memoria()
 
                 # Aguarda próxima verificação
-                time.sleep(self.config.INTERVALO_VERIFICACAO)
+                self.relogio.dormir(intervalo)
 
             except KeyboardInterrupt:
                 logging.info("🛑 Monitoramento interrompido pelo usuário")
                 return False
+            except SessaoExpiradaError as e:
+                # A sessão HTTP caiu: volta ao navegador com um login completo
+                logging.warning(f"⚠️ {e}; refazendo login no navegador")
+                if self.cliente_http:
+                    self.cliente_http.encerrar()
+                    self.cliente_http = None
+                if not self.navegador:
+                    self.navegador = self.criar_driver()
+                if not self.realizar_login():
+                    return False
+                self.salvar_checkpoint()
+                continue
             except Exception as e:
+                if not self.politica_monitoramento.registrar_falha(e):
+                    logging.error(f"❌ Erro fatal durante monitoramento: {e}")
+                    return False
+
                 logging.error(f"Erro durante monitoramento: {e}")
-                time.sleep(self.config.INTERVALO_VERIFICACAO)
+                self.politica_monitoramento.aguardar(self.segundos_ate_saida())
                 continue
 
+    def segundos_ate_saida(self) -> Optional[float]:
+        """Segundos até a saída calculada, pela última leitura do relógio (ou pelo relógio local, sem leitura)"""
+        saida = self.relogio_manager.horario_saida_calculado
+        if not saida:
+            return None
+
+        if self.ultima_leitura_relogio:
+            horario, instante = self.ultima_leitura_relogio
+            return (saida - horario).total_seconds() - (self.relogio.monotonico() - instante)
+        return (saida - self.relogio.agora()).total_seconds()
+
+    def abrir_sessao_http(self) -> bool:
+        """Sessão HTTP para consultas: reaproveita a do checkpoint ou faz o login no navegador"""
+        estado = self.checkpoint.carregar()
+        if estado and estado.get("cookies") and estado.get("url"):
+            cliente = ClienteSisrefHttp(estado["cookies"], timeout=self.config.TIMEOUT_HTTP,
+                                        caminho_login=urlsplit(self.config.URL_LOGIN).path)
+            try:
+                cliente.ler_pagina(estado["url"])
+                self.cliente_http = cliente
+                self.url_monitorada = estado["url"]
+                logging.info("♻️ Sessão do checkpoint reaproveitada, sem novo login")
+                return True
+            except Exception as e:
+                cliente.encerrar()
+                logging.info(f"Sessão do checkpoint não está mais válida ({e}); fazendo login")
+
+        with self.gerenciar_driver():
+            with self.fase("login"):
+                if not self.realizar_login():
+                    return False
+            return self.transferir_para_http()
+
+    def sincronizar_historico(self, desde: Optional[date] = None) -> bool:
+        """Baixa em lote as páginas de frequência ainda não sincronizadas e grava no histórico local"""
+        historico = HistoricoPonto(self.config.ARQUIVO_HISTORICO, self.relogio)
+
+        try:
+            hoje = self.relogio.agora().date()
+            ultima = historico.ultima_data_completa()
+            if desde:
+                inicio = desde
+            elif ultima:
+                inicio = ultima + timedelta(days=1)
+            else:
+                indice = hoje.year * 12 + hoje.month - self.config.MESES_HISTORICO_INICIAL
+                inicio = date(indice // 12, indice % 12 + 1, 1)
+
+            if inicio > hoje:
+                logging.info("🗃️ Histórico já está atualizado")
+                return True
+
+            # Uma página por mês, do mês de 'inicio' até o atual
+            meses = [(indice // 12, indice % 12 + 1)
+                     for indice in range(inicio.year * 12 + inicio.month - 1, hoje.year * 12 + hoje.month)]
+
+            if not self.abrir_sessao_http():
+                return False
+
+            urls = [urljoin(self.config.URL_LOGIN, self.config.URL_HISTORICO.format(ano=ano, mes=mes))
+                    for ano, mes in meses]
+            inicio_download = time.monotonic()
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                paginas = list(executor.map(self.cliente_http.obter, urls))
+
+            registros = []
+            for (ano, _), (html, _, _) in zip(meses, paginas):
+                extrator = ExtratorTabelaFrequencia()
+                extrator.feed(html)
+                extrator.close()
+                registros += [registro for registro in extrator.registros(self.relogio_manager, ano)
+                              if inicio <= registro.data <= hoje]
+
+            gravados = historico.gravar(registros)
+            logging.info(f"🗃️ Histórico sincronizado: {gravados} dias de {inicio.strftime('%d/%m/%Y')} a "
+                         f"{hoje.strftime('%d/%m/%Y')} ({len(urls)} páginas em "
+                         f"{time.monotonic() - inicio_download:.1f}s)")
+            return True
+
+        except Exception as e:
+            logging.error(f"Erro ao sincronizar o histórico: {e}")
+            return False
+        finally:
+            historico.fechar()
+            if self.cliente_http:
+                self.cliente_http.encerrar()
+                self.cliente_http = None
+
+    def relatorio_historico(self, mes: Optional[str] = None) -> bool:
+        """Saldo de horas e horas extras por mês, calculados do histórico local (sem acessar o SISREF)"""
+        if not os.path.exists(self.config.ARQUIVO_HISTORICO):
+            logging.error("❌ Histórico local vazio: execute antes com --sincronizar-historico")
+            return False
+
+        if mes:
+            ano, numero = (int(parte) for parte in mes.split("-"))
+            inicio = date(ano, numero, 1)
+            fim = date(ano + numero // 12, numero % 12 + 1, 1) - timedelta(days=1)
+        else:
+            inicio, fim = date.min, date.max
+
+        historico = HistoricoPonto(self.config.ARQUIVO_HISTORICO, self.relogio)
+        try:
+            linhas = historico.relatorio(inicio, fim, self.config.HORAS_TRABALHO_MINIMAS * 60)
+        finally:
+            historico.fechar()
+
+        def formatar(minutos: int, sinal: bool = False) -> str:
+            prefixo = ("-" if minutos < 0 else "+") if sinal else ""
+            return f"{prefixo}{abs(minutos) // 60:02d}:{abs(minutos) % 60:02d}"
+
+        print("=" * 60)
+        print(f"📊 SALDO DE HORAS (jornada de {self.config.HORAS_TRABALHO_MINIMAS}h)")
+        print("=" * 60)
+        print(f"   {'Mês':<9}{'Dias':>6}{'Trabalhado':>13}{'Saldo':>10}{'Extras':>10}{'Faltas':>10}")
+        for mes_linha, dias, minutos, saldo, extras, faltas in linhas:
+            print(f"   {mes_linha:<9}{dias:>6}{formatar(minutos):>13}{formatar(saldo, True):>10}"
+                  f"{formatar(extras):>10}{formatar(faltas):>10}")
+        if linhas:
+            total_saldo = sum(linha[3] for linha in linhas)
+            print(f"   {'Total':<9}{sum(linha[1] for linha in linhas):>6}"
+                  f"{formatar(sum(linha[2] for linha in linhas)):>13}{formatar(total_saldo, True):>10}"
+                  f"{formatar(sum(linha[4] for linha in linhas)):>10}{formatar(sum(linha[5] for linha in linhas)):>10}")
+        else:
+            print("   Nenhum dia completo no período")
+        print("=" * 60)
+        return True
+
     def executar(self) -> bool:
         """Executa o processo completo"""
         logging.info("🚀 Iniciando sistema de ponto INSS com monitoramento inteligente...")
 
+        perfilador = None
+        if self.config.PERFILADOR_PYTHON:
+            perfilador = PerfiladorPython(self.config.PERFILADOR_PYTHON, self.config.ARQUIVO_PERFIL_PYTHON,
+                                          self.config.INTERVALO_AMOSTRAGEM_PERFIL)
+            perfilador.iniciar()
+
+        estado = self.checkpoint.carregar()
+
         try:
             with self.gerenciar_driver():
-                if not self.realizar_login():
-                    return False
+                if estado:
+                    with self.fase("login"):
+                        if not self.retomar_expediente(estado):
+                            return False
+
+                    # A saída pode ter sido registrada à mão depois da queda: não clica de novo
+                    saida = self.saida_registrada()
+                    if saida:
+                        logging.info(f"🗂️ Saída já registrada no ponto ({saida}); checkpoint descartado")
+                        self.checkpoint.limpar()
+                        return True
+                    return self.monitorar_relogio(retomado=True)
+
+                with self.fase("login"):
+                    if not self.realizar_login():
+                        return False
+
+                    if self.config.PERFIL_ENXUTO:
+                        self.migrar_para_driver_enxuto()
 
                 return self.monitorar_relogio()
 
@@ -538,12 +3765,108 @@ class SistemaInss:
             logging.error(f"Erro geral na execução: {e}")
             return False
         finally:
+            self.captura_debug.finalizar()
+            self.politica_login.registrar_resumo()
+            self.politica_monitoramento.registrar_resumo()
+            if self.config.USAR_TIMEOUTS_ADAPTATIVOS:
+                self.timeouts.registrar_resumo()
+            if self.cliente_http:
+                logging.info(f"🌐 {self.cliente_http.requisicoes} requisições HTTP durante o acompanhamento")
+                self.cliente_http.encerrar()
+            self.cache_seletores.registrar_resumo()
+            if self.vigia_memoria:
+                self.vigia_memoria.registrar_resumo()
+            if self.instrumentacao:
+                self.instrumentacao.registrar_resumo(self.config.ARQUIVO_METRICAS_WEBDRIVER)
+            if perfilador:
+                perfilador.parar()
             logging.info("📦 Sistema finalizado")
 
 
+def aplicar_sobrescritas(config: Config, sobrescritas: List[str]):
+    """Aplica pares CHAVE=VALOR na Config, convertendo pelo tipo do campo"""
+    tipos = {campo.name: campo.type for campo in fields(Config)}
+
+    for item in sobrescritas:
+        chave, _, valor = item.partition("=")
+        if chave not in tipos:
+            raise SystemExit(f"Campo desconhecido na Config: {chave}")
+
+        tipo = tipos[chave] if isinstance(tipos[chave], str) else getattr(tipos[chave], "__name__", "")
+        try:
+            if tipo == "bool":
+                convertido = valor.strip().lower() in ("1", "true", "sim", "yes")
+            elif tipo == "int":
+                convertido = int(valor)
+            elif tipo == "float":
+                convertido = float(valor)
+            else:
+                convertido = valor
+        except ValueError:
+            raise SystemExit(f"Valor inválido para {chave} ({tipo}): {valor!r}")
+        setattr(config, chave, convertido)
+
+
+def mes_referencia(valor: str) -> str:
+    """Tipo do argparse para --relatorio: mês no formato AAAA-MM (vazio quando a opção vem sem valor)"""
+    if not valor:
+        return valor
+    try:
+        datetime.strptime(valor, "%Y-%m")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"mês inválido: '{valor}' (use AAAA-MM, ex.: 2024-05)")
+    return valor
+
+
 def main():
     """Função principal"""
-    configurar_logging()
+    parser = argparse.ArgumentParser(description="Sistema inteligente de ponto INSS (SISREF)")
+    parser.add_argument("--sincronizar-historico", action="store_true",
+                        help="baixa as páginas de frequência ainda não sincronizadas para o histórico local")
+    parser.add_argument("--desde", type=date.fromisoformat, metavar="AAAA-MM-DD",
+                        help="primeiro dia a sincronizar (padrão: após o último dia completo do histórico)")
+    parser.add_argument("--relatorio", nargs="?", const="", type=mes_referencia, metavar="AAAA-MM",
+                        help="saldo de horas e horas extras a partir do histórico local (todos os meses ou um)")
+    parser.add_argument("--config", action="append", default=[], metavar="CHAVE=VALOR",
+                        help="sobrescreve um campo da Config (pode repetir)")
+    args = parser.parse_args()
+
+    config = Config()
+    aplicar_sobrescritas(config, args.config)
+    modo_historico = args.relatorio is not None or args.sincronizar_historico
+
+    listener_log = configurar_logging(config)
+
+    # O Chrome do login sobe enquanto o banner e o estado salvo são preparados (depois do log, que é
+    # rápido de configurar: o que a criação do driver registra não se perde)
+    driver_antecipado = None
+    if (config.INICIAR_DRIVER_EM_PARALELO and not modo_historico and not config.USAR_POOL_DRIVERS
+            and BackendNavegador.classe(config.BACKEND_NAVEGADOR).PERMITE_OUTRA_THREAD):
+        driver_antecipado = BackendNavegador.criar_em_paralelo(config)
+
+    if modo_historico:
+        try:
+            sistema = SistemaInss(config)
+            if args.sincronizar_historico and not sistema.sincronizar_historico(args.desde):
+                sys.exit(1)
+            if args.relatorio is not None and not sistema.relatorio_historico(args.relatorio or None):
+                sys.exit(1)
+        finally:
+            if listener_log:
+                listener_log.stop()
+        return
+
+    sistema = None
+    try:
+        sistema = SistemaInss(config, driver_antecipado)
+        sistema.preaquecer_drivers()
+    except Exception as e:
+        logging.error(f"Erro fatal: {e}")
+        if driver_antecipado:
+            BackendNavegador.descartar_em_paralelo(driver_antecipado)
+        if listener_log:
+            listener_log.stop()
+        sys.exit(1)
 
     print("=" * 60)
     print("🎯 SISTEMA INTELIGENTE DE PONTO INSS - VERSÃO MELHORADA")
@@ -559,9 +3882,6 @@ def main():
     print("=" * 60)
 
     try:
-        config = Config()
-        sistema = SistemaInss(config)
-
         sucesso = sistema.executar()
 
         if sucesso:
@@ -576,6 +3896,12 @@ def main():
     finally:
         logging.info("👋 Programa encerrado automaticamente")
         # Remove o input() para não aguardar entrada do usuário
+        if sistema.driver_antecipado:
+            BackendNavegador.descartar_em_paralelo(sistema.driver_antecipado)
+        for pool in sistema.pools_drivers.values():
+            pool.encerrar()  # interrompido antes do gerenciar_driver: o Chrome pré-aquecido não fica aberto
+        if listener_log:
+            listener_log.stop()
 
 
 if __name__ == "__main__":
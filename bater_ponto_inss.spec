@@ -0,0 +1,49 @@
+# -*- mode: python ; coding: utf-8 -*-
+# Build em pasta (onedir): o executável não descompacta um arquivo temporário a cada execução,
+# como acontece no --onefile. Uso: pyinstaller bater_ponto_inss.spec
+# Resultado: dist/bater_ponto_inss/bater_ponto_inss.exe (distribua a pasta inteira)
+
+a = Analysis(
+    ['bater_ponto_inss.py'],
+    pathex=[],
+    binaries=[],
+    datas=[],
+    # Importados sob demanda (ImportacaoTardia): a análise estática do PyInstaller não os enxerga
+    hiddenimports=[
+        'selenium.webdriver',
+        'selenium.webdriver.common.by',
+        'selenium.webdriver.support.ui',
+        'selenium.webdriver.support.expected_conditions',
+        'selenium.webdriver.chrome.options',
+        'selenium.webdriver.chrome.service',
+        'selenium.webdriver.firefox.options',
+        'psutil',  # opcional no código; sem ele o vigia de memória não funciona no Windows
+    ],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=['tkinter'],
+    noarchive=False,
+)
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='bater_ponto_inss',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,  # descompactar UPX também custa tempo a cada inicialização
+    console=True,
+)
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    name='bater_ponto_inss',
+)
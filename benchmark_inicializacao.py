@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Benchmark da inicialização: tempo de import e tempo do início do processo até o driver.get do login"""
+
+import os
+import re
+import sys
+import json
+import time
+import shlex
+import logging
+import argparse
+import tempfile
+import statistics
+import subprocess
+from typing import Dict, List, Optional
+
+from servidor_sisref_fake import ConfigServidorFake, ServidorSisrefFake
+
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = os.path.join(DIRETORIO, "bater_ponto_inss.py")
+
+
+def medir_import(repeticoes: int) -> Dict[str, float]:
+    """Tempo de 'import bater_ponto_inss' e do processo Python inteiro, cada um num interpretador novo"""
+    codigo = "import time; t = time.perf_counter(); import bater_ponto_inss; print(time.perf_counter() - t)"
+    tempos_import, tempos_processo = [], []
+
+    for _ in range(repeticoes):
+        inicio = time.monotonic()
+        saida = subprocess.run([sys.executable, "-c", codigo], cwd=DIRETORIO, capture_output=True, text=True,
+                               check=True).stdout
+        tempos_processo.append(time.monotonic() - inicio)
+        tempos_import.append(float(saida.strip().splitlines()[-1]))
+
+    return {
+        "import_mediana": statistics.median(tempos_import),
+        "processo_import_mediana": statistics.median(tempos_processo),
+    }
+
+
+def maiores_imports(quantidade: int) -> List[Dict[str, float]]:
+    """Módulos importados diretamente pelo script que mais pesam (python -X importtime)"""
+    saida = subprocess.run([sys.executable, "-X", "importtime", "-c", "import bater_ponto_inss"],
+                           cwd=DIRETORIO, capture_output=True, text=True, check=True).stderr
+
+    # Linhas: "import time: self [us] | cumulative | <2 espaços por nível>módulo"; nível 1 = import do script
+    modulos = []
+    for linha in saida.splitlines():
+        match = re.match(r"import time:\s+\d+\s+\|\s+(\d+)\s+\|( +)(\S+)", linha)
+        if match and len(match.group(2)) == 3:
+            modulos.append({"modulo": match.group(3), "cumulativo_s": int(match.group(1)) / 1e6})
+
+    return sorted(modulos, key=lambda item: -item["cumulativo_s"])[:quantidade]
+
+
+def medir_ate_driver_get(comando: List[str], sobrescritas: List[str], timeout: float) -> Optional[float]:
+    """Sobe o SISREF fake, executa o programa e mede do início do processo até o GET da página de login"""
+    with tempfile.TemporaryDirectory(prefix="benchmark_inicializacao_") as diretorio, \
+            ServidorSisrefFake(ConfigServidorFake(PORTA=0)) as servidor:
+        argumentos = [
+            f"URL_LOGIN={servidor.url_login}",
+            "NAVEGADOR_HEADLESS=true",
+            "TEMPO_ESPERA_CAPTCHA=0",
+            "SAIR_APOS_CALCULAR_HORARIO=true",
+            "USAR_CHECKPOINT=false",
+        ] + sobrescritas
+        ambiente = dict(os.environ, SIAPE_INSS="0000000", SENHA_INSS="teste")
+
+        inicio = time.monotonic()
+        processo = subprocess.Popen(
+            comando + [opcao for item in argumentos for opcao in ("--config", item)],
+            cwd=diretorio, env=ambiente, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            processo.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            processo.kill()
+            processo.wait()
+            logging.warning("⚠️ Execução interrompida por tempo")
+
+        primeiro_get = servidor.estatisticas.primeiras_requisicoes.get("/entrada.php")
+        return primeiro_get - inicio if primeiro_get else None
+
+
+def main():
+    """Executa o benchmark pela linha de comando"""
+    parser = argparse.ArgumentParser(description="Benchmark da inicialização do script ou do executável")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--comando", default=f"{shlex.quote(sys.executable)} {shlex.quote(SCRIPT)}",
+                        help="comando a medir (ex.: dist/bater_ponto_inss/bater_ponto_inss.exe)")
+    parser.add_argument("--config", action="append", default=[], metavar="CHAVE=VALOR",
+                        help="sobrescreve um campo da Config no programa medido (pode repetir)")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--sem-navegador", action="store_true", help="mede apenas o tempo de import")
+    parser.add_argument("--saida", help="grava o resultado em JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s',
+                        handlers=[logging.StreamHandler(sys.stdout)])
+
+    resultado: Dict[str, object] = medir_import(args.repeticoes)
+    resultado["maiores_imports"] = maiores_imports(8)
+
+    if not args.sem_navegador:
+        comando = shlex.split(args.comando)
+        tempos = []
+        for repeticao in range(1, args.repeticoes + 1):
+            logging.info(f"⏱️ Repetição {repeticao}/{args.repeticoes}")
+            tempo = medir_ate_driver_get(comando, args.config, args.timeout)
+            if tempo is not None:
+                tempos.append(tempo)
+        resultado["inicio_ate_driver_get"] = tempos
+        resultado["inicio_ate_driver_get_mediana"] = statistics.median(tempos) if tempos else None
+
+    print("=" * 60)
+    print("🚀 BENCHMARK DE INICIALIZAÇÃO (mediana das repetições)")
+    print("=" * 60)
+    print(f"   {'import bater_ponto_inss':<38} {resultado['import_mediana']:.3f}")
+    print(f"   {'processo python + import':<38} {resultado['processo_import_mediana']:.3f}")
+    if not args.sem_navegador:
+        mediana = resultado["inicio_ate_driver_get_mediana"]
+        print(f"   {'início do processo → driver.get':<38} {'-' if mediana is None else f'{mediana:.3f}'}")
+    print("   Imports mais pesados:")
+    for item in resultado["maiores_imports"]:
+        print(f"      {item['modulo']:<35} {item['cumulativo_s']:.3f}")
+    print("=" * 60)
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump({"argumentos": vars(args), "resultado": resultado}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
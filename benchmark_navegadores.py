@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Benchmark comparativo dos backends de navegador: partida, latência por comando e pico de memória"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+import threading
+import statistics
+from typing import Callable, Dict, List, Optional
+
+from bater_ponto_inss import (BackendNavegador, Config, VigiaMemoria, aplicar_sobrescritas, percentil,
+                              BackendChrome, BackendChromeHeadlessShell, BackendFirefox, BackendPlaywright)
+from benchmark_sisref import SistemaInssMedido
+from servidor_sisref_fake import ConfigServidorFake, ServidorSisrefFake
+
+try:
+    import psutil
+except ImportError:  # opcional, como no script principal (sem ele, lê /proc)
+    psutil = None
+
+
+BACKENDS = [BackendChrome, BackendChromeHeadlessShell, BackendFirefox, BackendPlaywright]
+
+# Operações da interface medidas em cada backend (url_atual é propriedade e fica de fora)
+COMANDOS = ["navegar", "sondar", "preencher", "clicar", "aguardar_alerta", "executar_script", "cookies", "encerrar"]
+
+
+def rss_navegadores() -> int:
+    """RSS dos processos filhos deste benchmark (drivers e navegadores), sem o próprio Python"""
+    total, _ = VigiaMemoria.rss_arvore(os.getpid())
+    if psutil:
+        proprio = psutil.Process().memory_info().rss
+    else:
+        with open("/proc/self/statm", "r") as f:
+            proprio = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    return max(0, total - proprio)
+
+
+class AmostradorMemoria:
+    """Amostra em segundo plano o RSS dos navegadores e guarda o pico"""
+
+    def __init__(self, intervalo: float = 0.5):
+        self.intervalo = intervalo
+        self.pico = 0
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._amostrar, name="amostrador-memoria", daemon=True)
+
+    def _amostrar(self):
+        while not self._parar.is_set():
+            try:
+                self.pico = max(self.pico, rss_navegadores())
+            except Exception:
+                pass
+            self._parar.wait(self.intervalo)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *excecao):
+        self._parar.set()
+        self._thread.join(timeout=5)
+
+
+class SistemaInssComparado(SistemaInssMedido):
+    """SistemaInss que mede a abertura do navegador e cada operação da interface do backend"""
+
+    def __init__(self, config: Config):
+        super().__init__(config)
+        self.partidas: List[float] = []
+        self.latencias: Dict[str, List[float]] = {}
+
+    def _medir(self, nome: str, operacao: Callable) -> Callable:
+        def medida(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return operacao(*args, **kwargs)
+            finally:
+                self.latencias.setdefault(nome, []).append(time.perf_counter() - inicio)
+        return medida
+
+    def criar_driver(self, enxuto: bool = False) -> BackendNavegador:
+        inicio = time.monotonic()
+        navegador = super().criar_driver(enxuto)
+        self.partidas.append(time.monotonic() - inicio)
+
+        for nome in COMANDOS:
+            setattr(navegador, nome, self._medir(nome, getattr(navegador, nome)))
+        return navegador
+
+
+def executar_cenario(backend: str, args, diretorio: str) -> dict:
+    """Login → monitoramento → encerramento contra um SISREF fake novo, no backend informado"""
+    with ServidorSisrefFake(ConfigServidorFake(PORTA=0, LATENCIA=args.latencia,
+                                               SEGUNDOS_ATE_SAIDA=args.segundos_ate_saida)) as servidor:
+        config = Config(
+            URL_LOGIN=servidor.url_login,
+            BACKEND_NAVEGADOR=backend,
+            TEMPO_ESPERA_CAPTCHA=0,
+            SAIR_APOS_CALCULAR_HORARIO=False,
+            NAVEGADOR_HEADLESS=True,
+            ARQUIVO_CACHE_SELETORES=os.path.join(diretorio, "cache_seletores.json"),
+            ARQUIVO_METRICAS_WEBDRIVER=os.path.join(diretorio, "metricas_webdriver.json"),
+            ARQUIVO_TIMEOUTS=os.path.join(diretorio, f"timeouts_{backend}.json"),
+            USAR_CHECKPOINT=False,
+            VIGIAR_MEMORIA=False  # a memória é medida de fora, igual para todos os backends
+        )
+        aplicar_sobrescritas(config, args.config)
+
+        sistema = SistemaInssComparado(config)
+        with AmostradorMemoria() as memoria:
+            sucesso = sistema.executar()
+
+        return {
+            "sucesso": sucesso,
+            "partida": sistema.partidas[0] if sistema.partidas else None,
+            "latencias": sistema.latencias,
+            "latencia_clique_ate_sai": sistema.metricas()["latencia_clique_ate_sai"],
+            "tempo_total": time.monotonic() - sistema.inicio,
+            "memoria_pico_mb": memoria.pico / (1024 * 1024) if memoria.pico else None,
+        }
+
+
+def resumir(execucoes: List[dict]) -> dict:
+    """Medianas por backend e média/p95 de cada comando somando as repetições"""
+    def mediana(chave: str) -> Optional[float]:
+        valores = [execucao[chave] for execucao in execucoes if execucao.get(chave) is not None]
+        return statistics.median(valores) if valores else None
+
+    comandos = {}
+    for nome in COMANDOS:
+        duracoes = [duracao for execucao in execucoes for duracao in execucao["latencias"].get(nome, [])]
+        if duracoes:
+            comandos[nome] = {"quantidade": len(duracoes), "media_ms": statistics.mean(duracoes) * 1000,
+                              "p95_ms": percentil(duracoes, 0.95) * 1000}
+
+    return {
+        "sucessos": sum(1 for execucao in execucoes if execucao["sucesso"]),
+        "repeticoes": len(execucoes),
+        "partida": mediana("partida"),
+        "latencia_clique_ate_sai": mediana("latencia_clique_ate_sai"),
+        "tempo_total": mediana("tempo_total"),
+        "memoria_pico_mb": mediana("memoria_pico_mb"),
+        "comandos": comandos,
+    }
+
+
+def main():
+    """Executa o benchmark pela linha de comando"""
+    parser = argparse.ArgumentParser(description="Compara os backends de navegador no fluxo completo")
+    parser.add_argument("--backends", nargs="+", choices=[backend.NOME for backend in BACKENDS],
+                        help="backends a medir (padrão: todos os instalados)")
+    parser.add_argument("--repeticoes", type=int, default=1)
+    parser.add_argument("--segundos-ate-saida", type=int, default=60,
+                        help="segundos entre o login e o horário de saída calculado")
+    parser.add_argument("--latencia", type=float, default=0.0)
+    parser.add_argument("--config", action="append", default=[], metavar="CHAVE=VALOR",
+                        help="sobrescreve um campo da Config (pode repetir)")
+    parser.add_argument("--saida", help="grava o resultado em JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s',
+                        handlers=[logging.StreamHandler(sys.stdout)])
+
+    nomes = args.backends or [backend.NOME for backend in BACKENDS]
+    resultado = {}
+    with tempfile.TemporaryDirectory(prefix="benchmark_navegadores_") as diretorio:
+        for nome in nomes:
+            if not BackendNavegador.classe(nome).disponivel():
+                logging.info(f"⏭️ Backend '{nome}' não instalado, pulando")
+                continue
+
+            execucoes = []
+            for repeticao in range(1, args.repeticoes + 1):
+                logging.info(f"⏱️ Backend '{nome}': repetição {repeticao}/{args.repeticoes}")
+                execucoes.append(executar_cenario(nome, args, diretorio))
+            resultado[nome] = {"resumo": resumir(execucoes), "execucoes": execucoes}
+
+    def formatar(valor: Optional[float], casas: int = 2) -> str:
+        return "-" if valor is None else f"{valor:.{casas}f}"
+
+    print("=" * 78)
+    print("🧭 BENCHMARK DOS BACKENDS DE NAVEGADOR (mediana das repetições)")
+    print("=" * 78)
+    print(f"   {'Backend':<24}{'Sucessos':>9}{'Partida (s)':>13}{'Clique→sai (s)':>16}{'Pico (MB)':>11}")
+    for nome, dados in resultado.items():
+        resumo = dados["resumo"]
+        print(f"   {nome:<24}{resumo['sucessos']:>5}/{resumo['repeticoes']:<3}{formatar(resumo['partida']):>13}"
+              f"{formatar(resumo['latencia_clique_ate_sai']):>16}{formatar(resumo['memoria_pico_mb'], 0):>11}")
+    for nome, dados in resultado.items():
+        print(f"   Comandos em '{nome}' (média / p95 em ms):")
+        for comando, medidas in dados["resumo"]["comandos"].items():
+            print(f"      {comando:<20}{medidas['quantidade']:>6}x "
+                  f"{medidas['media_ms']:>9.1f} {medidas['p95_ms']:>9.1f}")
+    print("=" * 78)
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump({"argumentos": vars(args), "backends": resultado}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
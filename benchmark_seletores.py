@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Benchmark offline dos seletores do relógio e do botão 'Encerrar' sobre páginas capturadas (debug_pagina_*)"""
+
+import os
+import re
+import sys
+import glob
+import gzip
+import json
+import time
+import logging
+import argparse
+from html.parser import HTMLParser
+from typing import Callable, Dict, Iterator, List, Optional
+
+from bater_ponto_inss import SELETORES_BOTAO_ENCERRAR, SELETORES_RELOGIO, RelógioPontoManager, percentil
+
+
+class No:
+    """Elemento da árvore HTML (só o necessário para avaliar os seletores)"""
+
+    __slots__ = ("tag", "atributos", "filhos", "textos")
+
+    def __init__(self, tag: str, atributos: Dict[str, str]):
+        self.tag = tag
+        self.atributos = atributos
+        self.filhos: List["No"] = []
+        self.textos: List[str] = []
+
+    def texto(self) -> str:
+        """Texto do elemento e dos descendentes (equivalente ao textContent)"""
+        partes = []
+        pilha = [self]
+        while pilha:
+            no = pilha.pop()
+            partes.extend(no.textos)
+            pilha.extend(reversed(no.filhos))
+        return "".join(partes)
+
+    def texto_proprio(self) -> str:
+        """Apenas os nós de texto filhos diretos (o text() do XPath)"""
+        return "".join(self.textos)
+
+
+class ConstrutorArvore(HTMLParser):
+    """Monta a árvore de elementos com o parser da biblioteca padrão"""
+
+    ELEMENTOS_VAZIOS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source",
+                        "track", "wbr"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.raiz = No("#documento", {})
+        self._pilha = [self.raiz]
+
+    def handle_starttag(self, tag, attrs):
+        no = No(tag, {nome: valor or "" for nome, valor in attrs})
+        self._pilha[-1].filhos.append(no)
+        if tag not in self.ELEMENTOS_VAZIOS:
+            self._pilha.append(no)
+
+    def handle_startendtag(self, tag, attrs):
+        self._pilha[-1].filhos.append(No(tag, {nome: valor or "" for nome, valor in attrs}))
+
+    def handle_endtag(self, tag):
+        # Fecha até a tag correspondente (tolera HTML mal formado)
+        for indice in range(len(self._pilha) - 1, 0, -1):
+            if self._pilha[indice].tag == tag:
+                del self._pilha[indice:]
+                break
+
+    def handle_data(self, data):
+        self._pilha[-1].textos.append(data)
+
+
+def montar_arvore(html: str) -> No:
+    construtor = ConstrutorArvore()
+    construtor.feed(html)
+    construtor.close()
+    return construtor.raiz
+
+
+# Subconjunto de CSS usado nas listas de seletores: tag/*, #id, .classe e [atributo(=|*=|^=|$=)'valor' i]
+PADRAO_CSS = re.compile(r"^(?P<tag>[a-zA-Z][\w-]*|\*)?(?P<resto>(?:#[\w-]+|\.[\w-]+|\[[^\]]+\])*)$")
+PADRAO_CSS_PARTE = re.compile(r"#(?P<id>[\w-]+)|\.(?P<classe>[\w-]+)|\[(?P<atributo>[^\]]+)\]")
+PADRAO_CSS_ATRIBUTO = re.compile(r"^\s*([\w-]+)\s*(?:([*^$]?=)\s*['\"]?(.*?)['\"]?(\s+i)?)?\s*$")
+
+# Subconjunto de XPath: //tag[@atributo='valor'], //tag[contains(text(), 'valor')], //tag[contains(@atributo, 'valor')]
+PADRAO_XPATH = re.compile(
+    r"^//(?P<tag>[\w-]+|\*)\[(?:@(?P<atributo>[\w-]+)\s*=\s*['\"](?P<valor>[^'\"]*)['\"]"
+    r"|contains\(\s*(?P<alvo>text\(\)|@[\w-]+)\s*,\s*['\"](?P<trecho>[^'\"]*)['\"]\s*\))\]$"
+)
+
+
+def comparar_atributo(operador: Optional[str], esperado: str, ignorar_caixa: bool) -> Callable[[Optional[str]], bool]:
+    if ignorar_caixa:
+        esperado = esperado.lower()
+
+    def condicao(valor: Optional[str]) -> bool:
+        if valor is None:
+            return False
+        if ignorar_caixa:
+            valor = valor.lower()
+        if operador is None:
+            return True
+        if operador == "=":
+            return valor == esperado
+        if operador == "*=":
+            return esperado in valor
+        if operador == "^=":
+            return valor.startswith(esperado)
+        return valor.endswith(esperado)
+
+    return condicao
+
+
+def compilar_css(seletor: str) -> Callable[[No], bool]:
+    match = PADRAO_CSS.match(seletor.strip())
+    if not match or not (match.group("tag") or match.group("resto")):
+        raise ValueError(f"CSS fora do subconjunto suportado: {seletor}")
+
+    tag = match.group("tag")
+    condicoes: List[Callable[[No], bool]] = []
+    if tag and tag != "*":
+        condicoes.append(lambda no, tag=tag.lower(): no.tag == tag)
+
+    for parte in PADRAO_CSS_PARTE.finditer(match.group("resto")):
+        if parte.group("id"):
+            condicoes.append(lambda no, id_=parte.group("id"): no.atributos.get("id") == id_)
+        elif parte.group("classe"):
+            condicoes.append(lambda no, classe=parte.group("classe"): classe in no.atributos.get("class", "").split())
+        else:
+            atributo = PADRAO_CSS_ATRIBUTO.match(parte.group("atributo"))
+            if not atributo:
+                raise ValueError(f"Atributo fora do subconjunto suportado: {seletor}")
+            nome, operador, valor, ignorar_caixa = atributo.groups()
+            comparar = comparar_atributo(operador, valor or "", bool(ignorar_caixa))
+            condicoes.append(lambda no, nome=nome, comparar=comparar: comparar(no.atributos.get(nome)))
+
+    return lambda no: all(condicao(no) for condicao in condicoes)
+
+
+def compilar_xpath(seletor: str) -> Callable[[No], bool]:
+    match = PADRAO_XPATH.match(seletor.strip())
+    if not match:
+        raise ValueError(f"XPath fora do subconjunto suportado: {seletor}")
+
+    tag = match.group("tag")
+    casa_tag = (lambda no: True) if tag == "*" else (lambda no: no.tag == tag)
+
+    if match.group("atributo"):
+        nome, valor = match.group("atributo"), match.group("valor")
+        return lambda no: casa_tag(no) and no.atributos.get(nome) == valor
+
+    alvo, trecho = match.group("alvo"), match.group("trecho")
+    if alvo == "text()":
+        return lambda no: casa_tag(no) and trecho in no.texto_proprio()
+    return lambda no: casa_tag(no) and trecho in no.atributos.get(alvo[1:], "")
+
+
+def compilar(seletor: str) -> Callable[[No], bool]:
+    """Mesma regra do localizador() do script: XPath se começar com '//', senão CSS"""
+    return compilar_xpath(seletor) if seletor.startswith("//") else compilar_css(seletor)
+
+
+def encontrar(raiz: No, condicao: Callable[[No], bool]) -> Iterator[No]:
+    """Elementos que atendem à condição, em ordem de documento (sob demanda, como o querySelectorAll da sonda)"""
+    pilha = list(reversed(raiz.filhos))
+    while pilha:
+        no = pilha.pop()
+        if condicao(no):
+            yield no
+        pilha.extend(reversed(no.filhos))
+
+
+class Estrategia:
+    """Lista ordenada de seletores e o teste que decide se o elemento encontrado serve"""
+
+    def __init__(self, nome: str, seletores: List[str], valido: Callable[[No], bool]):
+        self.nome = nome
+        self.seletores = seletores
+        self.valido = valido
+        self.compilados: Dict[str, Optional[Callable[[No], bool]]] = {}
+        for seletor in seletores:
+            try:
+                self.compilados[seletor] = compilar(seletor)
+            except ValueError as e:
+                logging.warning(f"⚠️ {e}")
+                self.compilados[seletor] = None
+
+        self.acertos = {seletor: 0 for seletor in seletores}
+        self.vencedor = {seletor: 0 for seletor in seletores}
+        self.tempos: Dict[str, List[float]] = {seletor: [] for seletor in seletores}
+        self.tempos_resolucao: List[float] = []
+        self.paginas = 0
+        self.sem_acerto: List[str] = []
+
+    def avaliar(self, nome_pagina: str, raiz: No):
+        """Avalia todos os seletores na página e mede a resolução na ordem atual da lista"""
+        self.paginas += 1
+        resolucao = 0.0
+        resolvido = False
+
+        for seletor in self.seletores:
+            condicao = self.compilados[seletor]
+            if condicao is None:
+                continue
+
+            # Como a SondaDOM: um seletor acerta se qualquer um dos elementos encontrados servir
+            inicio = time.perf_counter()
+            acertou = any(self.valido(elemento) for elemento in encontrar(raiz, condicao))
+            duracao = time.perf_counter() - inicio
+            self.tempos[seletor].append(duracao)
+
+            if not resolvido:
+                resolucao += duracao
+            if acertou:
+                self.acertos[seletor] += 1
+                if not resolvido:
+                    self.vencedor[seletor] += 1
+                    resolvido = True
+
+        self.tempos_resolucao.append(resolucao)
+        if not resolvido:
+            self.sem_acerto.append(nome_pagina)
+
+    def resumo(self) -> dict:
+        seletores = []
+        for seletor in self.seletores:
+            tempos = self.tempos[seletor]
+            seletores.append({
+                "seletor": seletor,
+                "suportado": self.compilados[seletor] is not None,
+                "taxa_acerto": self.acertos[seletor] / self.paginas if self.paginas else 0.0,
+                "vencedor": self.vencedor[seletor],
+                "tempo_medio_ms": sum(tempos) / len(tempos) * 1000 if tempos else None,
+                "tempo_p95_ms": percentil(tempos, 0.95) * 1000 if tempos else None,
+            })
+
+        # Ordem sugerida: quem mais acerta primeiro, depois o mais rápido
+        sugerida = sorted(
+            (item for item in seletores if item["suportado"] and item["taxa_acerto"] > 0),
+            key=lambda item: (-item["taxa_acerto"], item["tempo_medio_ms"])
+        )
+        return {
+            "paginas": self.paginas,
+            "resolvidas": self.paginas - len(self.sem_acerto),
+            "resolucao_p50_ms": percentil(self.tempos_resolucao, 0.5) * 1000 if self.tempos_resolucao else None,
+            "resolucao_p95_ms": percentil(self.tempos_resolucao, 0.95) * 1000 if self.tempos_resolucao else None,
+            "seletores": seletores,
+            "ordem_sugerida": [item["seletor"] for item in sugerida],
+            "sem_acerto": self.sem_acerto,
+        }
+
+
+def estrategias() -> List[Estrategia]:
+    relogio_manager = RelógioPontoManager()
+
+    def relogio_valido(no: No) -> bool:
+        # Como a SondaDOM: primeiro o texto do elemento, depois o value (campos sem value não têm horário)
+        return any(relogio_manager.extrair_horario_relogio(texto.strip()) is not None
+                   for texto in (no.texto(), no.atributos.get("value") or ""))
+
+    return [
+        Estrategia("relogio", SELETORES_RELOGIO, relogio_valido),
+        Estrategia("botao_encerrar", SELETORES_BOTAO_ENCERRAR, lambda no: True),
+    ]
+
+
+def carregar_paginas(diretorio: str) -> List[str]:
+    padroes = ("*.html", "*.html.gz", "*.htm")
+    return sorted(caminho for padrao in padroes for caminho in glob.glob(os.path.join(diretorio, "**", padrao),
+                                                                       recursive=True))
+
+
+def ler_pagina(caminho: str) -> str:
+    abrir = gzip.open if caminho.endswith(".gz") else open
+    with abrir(caminho, "rt", encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def formatar_ms(valor: Optional[float], largura: int = 0) -> str:
+    """Tempo em ms com três casas; '-' quando não houve medição"""
+    return f"{valor:>{largura}.3f}" if valor is not None else f"{'-':>{largura}}"
+
+
+def imprimir(resultado: Dict[str, dict]):
+    for nome, resumo in resultado.items():
+        print("=" * 78)
+        print(f"🔎 {nome}: {resumo['resolvidas']}/{resumo['paginas']} páginas resolvidas | resolução "
+              f"p50 {formatar_ms(resumo['resolucao_p50_ms'])} ms, p95 {formatar_ms(resumo['resolucao_p95_ms'])} ms")
+        print("=" * 78)
+        print(f"   {'seletor':<42}{'acerto':>8}{'1º':>6}{'médio ms':>11}{'p95 ms':>10}")
+        for item in resumo["seletores"]:
+            if not item["suportado"]:
+                print(f"   {item['seletor'][:41]:<42}{'não suportado':>35}")
+                continue
+            print(f"   {item['seletor'][:41]:<42}{item['taxa_acerto'] * 100:>7.0f}%{item['vencedor']:>6}"
+                  f"{formatar_ms(item['tempo_medio_ms'], 11)}{formatar_ms(item['tempo_p95_ms'], 10)}")
+        print(f"   Ordem sugerida: {resumo['ordem_sugerida']}")
+        if resumo["sem_acerto"]:
+            print(f"   Sem acerto ({len(resumo['sem_acerto'])}): {', '.join(resumo['sem_acerto'][:5])}"
+                  f"{' ...' if len(resumo['sem_acerto']) > 5 else ''}")
+
+
+def main():
+    """Executa o benchmark pela linha de comando"""
+    parser = argparse.ArgumentParser(description="Benchmark offline dos seletores sobre páginas capturadas")
+    parser.add_argument("diretorio", nargs="?", default="debug",
+                        help="pasta com as páginas (.html ou .html.gz); padrão: debug")
+    parser.add_argument("--saida", help="grava o resultado em JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s',
+                        handlers=[logging.StreamHandler(sys.stdout)])
+
+    caminhos = carregar_paginas(args.diretorio)
+    if not caminhos:
+        logging.error(f"❌ Nenhuma página .html/.html.gz em {args.diretorio}")
+        sys.exit(1)
+
+    lista = estrategias()
+    inicio = time.perf_counter()
+    for caminho in caminhos:
+        try:
+            raiz = montar_arvore(ler_pagina(caminho))
+        except Exception as e:
+            logging.warning(f"⚠️ Página ignorada ({os.path.basename(caminho)}): {e}")
+            continue
+        for estrategia in lista:
+            estrategia.avaliar(os.path.basename(caminho), raiz)
+
+    logging.info(f"📄 {len(caminhos)} páginas avaliadas em {time.perf_counter() - inicio:.2f}s")
+    resultado = {estrategia.nome: estrategia.resumo() for estrategia in lista}
+    imprimir(resultado)
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
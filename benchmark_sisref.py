@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Benchmark de ponta a ponta do SistemaInss contra o SISREF fake (sem acessar o sisref.inss.gov.br)"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+import statistics
+from typing import Dict, List, Optional
+
+from bater_ponto_inss import Config, SistemaInss, aplicar_sobrescritas
+from servidor_sisref_fake import ConfigServidorFake, ServidorSisrefFake
+
+
+# Métricas medidas (todas: quanto menor, melhor)
+METRICAS = [
+    "tempo_ate_login",
+    "tempo_ate_primeira_leitura_relogio",
+    "comandos_por_minuto_monitorado",
+    "latencia_clique_ate_sai",
+    "tempo_total",
+    "memoria_pico_mb",
+]
+
+
+class SistemaInssMedido(SistemaInss):
+    """SistemaInss instrumentado que também marca os instantes de cada etapa"""
+
+    def __init__(self, config: Config):
+        config.INSTRUMENTAR_WEBDRIVER = True
+        super().__init__(config)
+        self.inicio = time.monotonic()
+        self.marcos: Dict[str, float] = {}
+
+    def _marcar(self, nome: str):
+        self.marcos.setdefault(nome, time.monotonic() - self.inicio)
+
+    def realizar_login(self) -> bool:
+        sucesso = super().realizar_login()
+        if sucesso:
+            self._marcar("login")
+        return sucesso
+
+    def monitorar_relogio(self, retomado: bool = False) -> bool:
+        self._marcar("inicio_monitoramento")
+        return super().monitorar_relogio(retomado)
+
+    def obter_horario_servidor(self):
+        horario = super().obter_horario_servidor()
+        if horario:
+            self._marcar("primeira_leitura_relogio")
+        return horario
+
+    def localizar_botao_encerrar(self):
+        self._marcar("fim_monitoramento")
+        botao = super().localizar_botao_encerrar()
+        if botao:
+            self._marcar("clique")
+        return botao
+
+    def ler_valor_campo(self, id_campo: str, timeout: float) -> Optional[str]:
+        valor = super().ler_valor_campo(id_campo, timeout)
+        if id_campo == "sai" and valor:
+            self._marcar("sai")
+        return valor
+
+    def metricas(self) -> Dict[str, Optional[float]]:
+        marcos = self.marcos
+        fases = self.instrumentacao.resumo()
+        resultado = {
+            "tempo_ate_login": marcos.get("login"),
+            "tempo_ate_primeira_leitura_relogio": marcos.get("primeira_leitura_relogio"),
+            "comandos_por_minuto_monitorado": None,
+            "latencia_clique_ate_sai": None,
+            "tempo_total": time.monotonic() - self.inicio,
+            "memoria_pico_mb": None,
+            "comandos_total": sum(dados["comandos"] for dados in fases.values()),
+        }
+
+        if "inicio_monitoramento" in marcos and "fim_monitoramento" in marcos:
+            minutos = (marcos["fim_monitoramento"] - marcos["inicio_monitoramento"]) / 60
+            if minutos > 0:
+                comandos = fases.get("monitoramento", {}).get("comandos", 0)
+                resultado["comandos_por_minuto_monitorado"] = comandos / minutos
+
+        if self.vigia_memoria and self.vigia_memoria.pico:
+            resultado["memoria_pico_mb"] = self.vigia_memoria.pico / (1024 * 1024)
+
+        if "clique" in marcos and "sai" in marcos:
+            resultado["latencia_clique_ate_sai"] = marcos["sai"] - marcos["clique"]
+
+        return resultado
+
+
+def executar_cenario(args, diretorio: str) -> Dict[str, Optional[float]]:
+    """Executa uma vez o fluxo login → monitoramento → encerramento contra um SISREF fake novo"""
+    config_servidor = ConfigServidorFake(
+        PORTA=0,
+        LATENCIA=args.latencia,
+        VARIACAO_LATENCIA=args.variacao_latencia,
+        TAXA_FALHA=args.taxa_falha,
+        SEGUNDOS_ATE_SAIDA=args.segundos_ate_saida,
+        DESVIO_RELOGIO=args.desvio_relogio
+    )
+
+    with ServidorSisrefFake(config_servidor) as servidor:
+        config = Config(
+            URL_LOGIN=servidor.url_login,
+            TEMPO_ESPERA_CAPTCHA=0,
+            SAIR_APOS_CALCULAR_HORARIO=False,
+            NAVEGADOR_HEADLESS=not args.com_janela,
+            ARQUIVO_CACHE_SELETORES=os.path.join(diretorio, "cache_seletores.json"),
+            ARQUIVO_METRICAS_WEBDRIVER=os.path.join(diretorio, "metricas_webdriver.json"),
+            USAR_CHECKPOINT=False,  # cada repetição é um expediente novo no servidor fake
+            INTERVALO_VIGIA_MEMORIA=5
+        )
+        aplicar_sobrescritas(config, args.config)
+
+        sistema = SistemaInssMedido(config)
+        sucesso = sistema.executar()
+
+        metricas = sistema.metricas()
+        metricas["sucesso"] = sucesso
+        metricas["fases"] = sistema.instrumentacao.resumo()
+        metricas["requisicoes_servidor"] = sum(servidor.estatisticas.requisicoes.values())
+        return metricas
+
+
+def resumir(execucoes: List[Dict[str, Optional[float]]]) -> Dict[str, Optional[float]]:
+    """Mediana de cada métrica entre as repetições"""
+    resumo = {}
+    for metrica in METRICAS + ["comandos_total", "requisicoes_servidor"]:
+        valores = [execucao[metrica] for execucao in execucoes if execucao.get(metrica) is not None]
+        resumo[metrica] = statistics.median(valores) if valores else None
+    resumo["sucessos"] = sum(1 for execucao in execucoes if execucao.get("sucesso"))
+    resumo["repeticoes"] = len(execucoes)
+    return resumo
+
+
+def comparar(resumo: Dict[str, Optional[float]], caminho_base: str, tolerancia: float) -> List[str]:
+    """Compara com um resultado anterior; devolve a lista de regressões"""
+    with open(caminho_base, "r", encoding="utf-8") as f:
+        base = json.load(f)["resumo"]
+
+    regressoes = []
+    for metrica in METRICAS:
+        atual, anterior = resumo.get(metrica), base.get(metrica)
+        if atual is None or anterior is None:
+            continue
+        if anterior > 0 and atual > anterior * (1 + tolerancia):
+            regressoes.append(f"{metrica}: {anterior:.3f} → {atual:.3f} (+{(atual / anterior - 1) * 100:.0f}%)")
+
+    if resumo.get("sucessos", 0) < base.get("sucessos", 0):
+        regressoes.append(f"sucessos: {base['sucessos']} → {resumo['sucessos']}")
+
+    return regressoes
+
+
+def main():
+    """Executa o benchmark pela linha de comando"""
+    parser = argparse.ArgumentParser(description="Benchmark do fluxo completo contra o SISREF fake")
+    parser.add_argument("--repeticoes", type=int, default=1)
+    parser.add_argument("--segundos-ate-saida", type=int, default=90,
+                        help="segundos entre o login e o horário de saída calculado")
+    parser.add_argument("--latencia", type=float, default=0.0)
+    parser.add_argument("--variacao-latencia", type=float, default=0.0)
+    parser.add_argument("--taxa-falha", type=float, default=0.0)
+    parser.add_argument("--desvio-relogio", type=float, default=0.0)
+    parser.add_argument("--com-janela", action="store_true", help="abre o Chrome com janela")
+    parser.add_argument("--config", action="append", default=[], metavar="CHAVE=VALOR",
+                        help="sobrescreve um campo da Config (pode repetir)")
+    parser.add_argument("--saida", help="grava o resultado em JSON")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="piora relativa aceita na comparação")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s',
+                        handlers=[logging.StreamHandler(sys.stdout)])
+
+    execucoes = []
+    with tempfile.TemporaryDirectory(prefix="benchmark_sisref_") as diretorio:
+        for repeticao in range(1, args.repeticoes + 1):
+            logging.info(f"⏱️ Repetição {repeticao}/{args.repeticoes}")
+            execucoes.append(executar_cenario(args, diretorio))
+
+    resumo = resumir(execucoes)
+
+    print("=" * 60)
+    print("📊 BENCHMARK SISREF FAKE (mediana das repetições)")
+    print("=" * 60)
+    for metrica, valor in resumo.items():
+        print(f"   {metrica:<38} {'-' if valor is None else f'{valor:.3f}'}")
+    print("=" * 60)
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump({"argumentos": vars(args), "resumo": resumo, "execucoes": execucoes}, f, indent=2)
+
+    if args.comparar:
+        regressoes = comparar(resumo, args.comparar, args.tolerancia)
+        for regressao in regressoes:
+            print(f"❌ Regressão: {regressao}")
+        if regressoes:
+            sys.exit(1)
+        print("✅ Nenhuma regressão em relação à base")
+
+
+if __name__ == "__main__":
+    main()
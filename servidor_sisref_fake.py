@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Servidor local que imita as páginas do SISREF usadas por bater_ponto_inss.py (apenas para testes)"""
+
+import sys
+import time
+import random
+import secrets
+import logging
+import argparse
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from http.cookies import SimpleCookie
+from urllib.parse import parse_qs, urlsplit
+
+
+@dataclass
+class ConfigServidorFake:
+    PORTA: int = 8765  # 0 escolhe uma porta livre
+    LATENCIA: float = 0.0  # segundos adicionados a cada resposta
+    VARIACAO_LATENCIA: float = 0.0  # variação aleatória (+/-) da latência
+    TAXA_FALHA: float = 0.0  # probabilidade (0-1) de responder 503
+    CAPTCHA_ESPERADO: str = "teste"
+    CAPTCHA_AUTOMATICO: bool = True  # já entrega o campo do CAPTCHA preenchido (stub só para testes)
+    HORAS_TRABALHO: int = 6
+    SEGUNDOS_ATE_SAIDA: Optional[int] = None  # define a entrada para que a saída ocorra em N segundos
+    HORARIO_ENTRADA: Optional[str] = None  # "HH:MM:SS"; se vazio usa SEGUNDOS_ATE_SAIDA ou o horário do login
+    DESVIO_RELOGIO: float = 0.0  # segundos que o relógio do "servidor" está adiantado em relação ao local
+    DIMENSOES_BOTAO: bool = True  # False: <img> do 'Encerrar' sem width/height (depende da imagem baixada)
+
+
+@dataclass
+class SessaoFake:
+    entrada: datetime
+    saida: Optional[datetime] = None
+
+
+@dataclass
+class EstatisticasServidorFake:
+    requisicoes: Dict[str, int] = field(default_factory=dict)
+    primeiras_requisicoes: Dict[str, float] = field(default_factory=dict)  # time.monotonic() do 1º acesso
+    falhas_injetadas: int = 0
+    logins: int = 0
+    captchas_incorretos: int = 0
+    encerramentos: int = 0
+
+
+PAGINA_LOGIN = """<!DOCTYPE html>
+<html lang="pt-br">
+<head><meta charset="utf-8"><title>SISREF - Entrada</title></head>
+<body>
+  <form id="form-login" method="post" action="/valida.php">
+    <label for="lSiape">SIAPE</label>
+    <input type="text" id="lSiape" name="siape">
+    <label for="lSenha">Senha</label>
+    <input type="password" id="lSenha" name="senha">
+    <img id="img-captcha" src="/captcha.png" alt="CAPTCHA" width="120" height="40">
+    <input type="text" id="captcha" name="captcha" maxlength="{tamanho_captcha}" value="{valor_captcha}">
+    <button type="submit" id="btn-enviar">Entrar</button>
+  </form>
+</body>
+</html>
+"""
+
+PAGINA_CAPTCHA_INCORRETO = """<!DOCTYPE html>
+<html lang="pt-br">
+<head><meta charset="utf-8"><title>SISREF - Entrada</title></head>
+<body>
+  <script>alert('Código de segurança (CAPTCHA) não informado ou incorreto!'); location.href = '/entrada.php';</script>
+</body>
+</html>
+"""
+
+PAGINA_PRINCIPAL = """<!DOCTYPE html>
+<html lang="pt-br">
+<head><meta charset="utf-8"><title>SISREF - Registro de Frequência</title></head>
+<body>
+  <div class="cabecalho">Hora do servidor: <span id="relogio">{relogio}</span></div>
+  <form id="form-ponto">
+    <label for="ent">Entrada</label>
+    <input type="text" id="ent" name="ent" value="{entrada}" readonly>
+    {campo_saida}
+  </form>
+  {botao_encerrar}
+  <script>
+    (function () {{
+      var inicial = {segundos_dia};
+      var base = Date.now();
+      var relogio = document.getElementById('relogio');
+      function doisDigitos(n) {{ return (n < 10 ? '0' : '') + n; }}
+      setInterval(function () {{
+        var s = (inicial + Math.floor((Date.now() - base) / 1000)) % 86400;
+        relogio.textContent = doisDigitos(Math.floor(s / 3600)) + ':' +
+          doisDigitos(Math.floor(s / 60) % 60) + ':' + doisDigitos(s % 60);
+      }}, 200);
+    }})();
+  </script>
+</body>
+</html>
+"""
+
+BOTAO_ENCERRAR = """<img src="/encerrar.png" alt="Encerrar Expediente" title="Encerrar Expediente"{dimensoes}
+       style="cursor: pointer"
+       onclick="if (confirm('Deseja realmente encerrar o expediente?')) {{ location.href = '/encerrar.php'; }}">"""
+
+CAMPO_SAIDA = """<label for="sai">Saída</label>
+    <input type="text" id="sai" name="sai" value="{saida}" readonly>"""
+
+PAGINA_FREQUENCIA = """<!DOCTYPE html>
+<html lang="pt-br">
+<head><meta charset="utf-8"><title>SISREF - Frequência {mes:02d}/{ano}</title></head>
+<body>
+  <table id="tabela-frequencia">
+    <tr><th>Dia</th><th>Entrada</th><th>Saída</th><th>Horas</th></tr>
+{linhas}
+  </table>
+</body>
+</html>
+"""
+
+LINHA_FREQUENCIA = "    <tr><td>{dia}</td><td>{entrada}</td><td>{saida}</td><td>{horas}</td></tr>"
+
+# PNG 1x1 transparente (usado para o CAPTCHA e para o botão)
+PNG_VAZIO = bytes.fromhex(
+    "89504e470d0a1a0a0000000d49484452000000010000000108060000001f15c489"
+    "0000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082"
+)
+
+
+class ServidorSisrefFake:
+    """Servidor HTTP local com as mesmas IDs de página que o script usa no SISREF"""
+
+    def __init__(self, config: Optional[ConfigServidorFake] = None):
+        self.config = config or ConfigServidorFake()
+        self.sessoes: Dict[str, SessaoFake] = {}
+        self.estatisticas = EstatisticasServidorFake()
+        self._lock = threading.Lock()
+        self._servidor: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url_base(self) -> str:
+        return f"http://127.0.0.1:{self.porta}"
+
+    @property
+    def url_login(self) -> str:
+        return f"{self.url_base}/entrada.php"
+
+    @property
+    def porta(self) -> int:
+        return self._servidor.server_address[1] if self._servidor else self.config.PORTA
+
+    def agora(self) -> datetime:
+        """Horário do 'servidor' (horário local mais o desvio configurado)"""
+        return datetime.now() + timedelta(seconds=self.config.DESVIO_RELOGIO)
+
+    def horario_entrada_inicial(self) -> datetime:
+        """Horário de entrada registrado para uma nova sessão"""
+        agora = self.agora()
+
+        if self.config.HORARIO_ENTRADA:
+            hora = datetime.strptime(self.config.HORARIO_ENTRADA, "%H:%M:%S").time()
+            return datetime.combine(agora.date(), hora)
+
+        if self.config.SEGUNDOS_ATE_SAIDA is not None:
+            return (agora - timedelta(hours=self.config.HORAS_TRABALHO)
+                    + timedelta(seconds=self.config.SEGUNDOS_ATE_SAIDA))
+
+        return agora
+
+    def iniciar(self):
+        """Sobe o servidor em uma thread de fundo"""
+        servidor = self
+
+        class Handler(ManipuladorSisrefFake):
+            sisref = servidor
+
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", self.config.PORTA), Handler)
+        self._servidor.daemon_threads = True
+        self._thread = threading.Thread(target=self._servidor.serve_forever, name="sisref-fake", daemon=True)
+        self._thread.start()
+        logging.info(f"🧪 SISREF fake ouvindo em {self.url_login}")
+
+    def parar(self):
+        """Derruba o servidor"""
+        if self._servidor:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
+
+    def __enter__(self):
+        self.iniciar()
+        return self
+
+    def __exit__(self, *exc):
+        self.parar()
+
+
+class ManipuladorSisrefFake(BaseHTTPRequestHandler):
+    """Responde às rotas do SISREF fake"""
+
+    sisref: ServidorSisrefFake = None
+
+    def log_message(self, formato, *args):
+        logging.debug(f"SISREF fake: {formato % args}")
+
+    # Infraestrutura
+
+    def _simular_rede(self) -> bool:
+        """Aplica latência e falhas injetadas; devolve False se a requisição deve falhar"""
+        config = self.sisref.config
+        caminho = urlsplit(self.path).path
+
+        with self.sisref._lock:
+            self.sisref.estatisticas.requisicoes[caminho] = self.sisref.estatisticas.requisicoes.get(caminho, 0) + 1
+            self.sisref.estatisticas.primeiras_requisicoes.setdefault(caminho, time.monotonic())
+
+        latencia = config.LATENCIA + random.uniform(-config.VARIACAO_LATENCIA, config.VARIACAO_LATENCIA)
+        if latencia > 0:
+            time.sleep(latencia)
+
+        if config.TAXA_FALHA and random.random() < config.TAXA_FALHA:
+            with self.sisref._lock:
+                self.sisref.estatisticas.falhas_injetadas += 1
+            self._responder(503, "<h1>Serviço indisponível</h1>")
+            return False
+
+        return True
+
+    def _responder(self, status: int, corpo, tipo: str = "text/html; charset=utf-8",
+                   cabecalhos: Optional[Dict[str, str]] = None):
+        dados = corpo.encode("utf-8") if isinstance(corpo, str) else corpo
+        self.send_response(status)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(dados)))
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def _redirecionar(self, destino: str, cabecalhos: Optional[Dict[str, str]] = None):
+        cabecalhos = dict(cabecalhos or {})
+        cabecalhos["Location"] = destino
+        self._responder(302, "", cabecalhos=cabecalhos)
+
+    def _sessao(self) -> Optional[SessaoFake]:
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        if "PHPSESSID" not in cookie:
+            return None
+        with self.sisref._lock:
+            return self.sisref.sessoes.get(cookie["PHPSESSID"].value)
+
+    # Rotas
+
+    def do_GET(self):
+        if not self._simular_rede():
+            return
+
+        caminho = urlsplit(self.path).path
+
+        if caminho in ("/", "/entrada.php"):
+            config = self.sisref.config
+            pagina = PAGINA_LOGIN.format(
+                tamanho_captcha=len(config.CAPTCHA_ESPERADO),
+                valor_captcha=config.CAPTCHA_ESPERADO if config.CAPTCHA_AUTOMATICO else ""
+            )
+            self._responder(200, pagina)
+
+        elif caminho in ("/captcha.png", "/encerrar.png"):
+            self._responder(200, PNG_VAZIO, tipo="image/png")
+
+        elif caminho == "/principal.php":
+            sessao = self._sessao()
+            if not sessao:
+                self._redirecionar("/entrada.php")
+                return
+            self._responder(200, self._pagina_principal(sessao))
+
+        elif caminho == "/frequencia.php":
+            sessao = self._sessao()
+            if not sessao:
+                self._redirecionar("/entrada.php")
+                return
+            parametros = parse_qs(urlsplit(self.path).query)
+            hoje = self.sisref.agora().date()
+            try:
+                ano = int(parametros.get("ano", [hoje.year])[0])
+                mes = int(parametros.get("mes", [hoje.month])[0])
+                self._responder(200, self._pagina_frequencia(ano, mes, hoje))
+            except ValueError:
+                self._responder(400, "<h1>Mês inválido</h1>")
+
+        elif caminho == "/encerrar.php":
+            sessao = self._sessao()
+            if not sessao:
+                self._redirecionar("/entrada.php")
+                return
+            with self.sisref._lock:
+                if not sessao.saida:
+                    sessao.saida = self.sisref.agora()
+                    self.sisref.estatisticas.encerramentos += 1
+            self._redirecionar("/principal.php")
+
+        else:
+            self._responder(404, "<h1>Página não encontrada</h1>")
+
+    def do_POST(self):
+        if not self._simular_rede():
+            return
+
+        if urlsplit(self.path).path != "/valida.php":
+            self._responder(404, "<h1>Página não encontrada</h1>")
+            return
+
+        tamanho = int(self.headers.get("Content-Length", 0))
+        dados = parse_qs(self.rfile.read(tamanho).decode("utf-8"))
+        captcha = dados.get("captcha", [""])[0]
+
+        if captcha != self.sisref.config.CAPTCHA_ESPERADO:
+            with self.sisref._lock:
+                self.sisref.estatisticas.captchas_incorretos += 1
+            self._responder(200, PAGINA_CAPTCHA_INCORRETO)
+            return
+
+        id_sessao = secrets.token_hex(16)
+        with self.sisref._lock:
+            self.sisref.sessoes[id_sessao] = SessaoFake(entrada=self.sisref.horario_entrada_inicial())
+            self.sisref.estatisticas.logins += 1
+
+        self._redirecionar("/principal.php", {"Set-Cookie": f"PHPSESSID={id_sessao}; Path=/; HttpOnly"})
+
+    def _pagina_principal(self, sessao: SessaoFake) -> str:
+        agora = self.sisref.agora()
+        campo_saida = ""
+        dimensoes = ' width="48" height="48"' if self.sisref.config.DIMENSOES_BOTAO else ""
+        botao_encerrar = BOTAO_ENCERRAR.format(dimensoes=dimensoes)
+
+        if sessao.saida:
+            campo_saida = CAMPO_SAIDA.format(saida=sessao.saida.strftime("%H:%M:%S"))
+            botao_encerrar = ""
+
+        return PAGINA_PRINCIPAL.format(
+            relogio=agora.strftime("%H:%M:%S"),
+            entrada=sessao.entrada.strftime("%H:%M:%S"),
+            campo_saida=campo_saida,
+            botao_encerrar=botao_encerrar,
+            segundos_dia=agora.hour * 3600 + agora.minute * 60 + agora.second
+        )
+
+    def _pagina_frequencia(self, ano: int, mes: int, hoje: date) -> str:
+        """Dias úteis do mês até ontem, com horários determinísticos por data"""
+        linhas = []
+        dia = date(ano, mes, 1)
+        while dia.month == mes and dia < hoje:
+            if dia.weekday() < 5:
+                sorteio = random.Random(dia.toordinal())
+                entrada = datetime.combine(dia, datetime.min.time()) + timedelta(
+                    hours=7, minutes=sorteio.randint(0, 90), seconds=sorteio.randint(0, 59))
+                saida = entrada + timedelta(hours=self.sisref.config.HORAS_TRABALHO,
+                                            minutes=sorteio.randint(-15, 45))
+                horas = saida - entrada
+                linhas.append(LINHA_FREQUENCIA.format(
+                    dia=dia.strftime("%d/%m/%Y"),
+                    entrada=entrada.strftime("%H:%M:%S"),
+                    saida=saida.strftime("%H:%M:%S"),
+                    horas=f"{int(horas.total_seconds()) // 3600:02d}:{int(horas.total_seconds()) // 60 % 60:02d}"
+                ))
+            dia += timedelta(days=1)
+
+        return PAGINA_FREQUENCIA.format(ano=ano, mes=mes, linhas="\n".join(linhas))
+
+
+def main():
+    """Sobe o SISREF fake pela linha de comando"""
+    parser = argparse.ArgumentParser(description="SISREF fake para testes locais do bater_ponto_inss.py")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--latencia", type=float, default=0.0, help="segundos adicionados a cada resposta")
+    parser.add_argument("--variacao-latencia", type=float, default=0.0)
+    parser.add_argument("--taxa-falha", type=float, default=0.0, help="probabilidade (0-1) de responder 503")
+    parser.add_argument("--captcha", default="teste", help="valor esperado do CAPTCHA")
+    parser.add_argument("--captcha-manual", action="store_true", help="não preenche o CAPTCHA automaticamente")
+    parser.add_argument("--segundos-ate-saida", type=int, help="registra a entrada para a saída ocorrer em N segundos")
+    parser.add_argument("--entrada", help="horário de entrada fixo (HH:MM:SS)")
+    parser.add_argument("--desvio-relogio", type=float, default=0.0, help="adianta o relógio do servidor (segundos)")
+    parser.add_argument("--botao-sem-dimensoes", action="store_true",
+                        help="<img> do 'Encerrar' sem width/height, como no SISREF")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s',
+                        handlers=[logging.StreamHandler(sys.stdout)])
+
+    config = ConfigServidorFake(
+        PORTA=args.porta,
+        LATENCIA=args.latencia,
+        VARIACAO_LATENCIA=args.variacao_latencia,
+        TAXA_FALHA=args.taxa_falha,
+        CAPTCHA_ESPERADO=args.captcha,
+        CAPTCHA_AUTOMATICO=not args.captcha_manual,
+        SEGUNDOS_ATE_SAIDA=args.segundos_ate_saida,
+        HORARIO_ENTRADA=args.entrada,
+        DESVIO_RELOGIO=args.desvio_relogio,
+        DIMENSOES_BOTAO=not args.botao_sem_dimensoes
+    )
+
+    servidor = ServidorSisrefFake(config)
+    servidor.iniciar()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        logging.info("🛑 SISREF fake interrompido")
+    finally:
+        servidor.parar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Simulação de expedientes em tempo virtual: o fluxo completo contra uma página roteirizada, sem navegador"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import tempfile
+import statistics
+from datetime import date, datetime, timedelta
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+from bater_ponto_inss import (BackendNavegador, Config, Relogio, SistemaInss, aplicar_sobrescritas, percentil,
+                              SELETORES_BOTAO_ENCERRAR)
+
+
+class LimiteSimulacaoError(BaseException):
+    """O dia simulado passou do limite de tempo virtual (BaseException: atravessa os 'except Exception')"""
+
+
+class RelogioVirtual(Relogio):
+    """Relógio que só anda quando o programa dorme ou quando a página simulada gasta tempo"""
+
+    def __init__(self, inicio: datetime, limite: float = 36 * 3600):
+        self.inicio = inicio
+        self.limite = limite
+        self.decorrido = 0.0
+        self.despertares = 0
+
+    def agora(self) -> datetime:
+        return self.inicio + timedelta(seconds=self.decorrido)
+
+    def monotonico(self) -> float:
+        return self.decorrido
+
+    def dormir(self, segundos: float):
+        self.despertares += 1
+        self.avancar(segundos)
+
+    def avancar(self, segundos: float):
+        self.decorrido += max(0.0, segundos)
+        if self.decorrido > self.limite:
+            raise LimiteSimulacaoError(f"mais de {self.limite / 3600:.0f}h simuladas sem encerrar o expediente")
+
+
+@dataclass
+class Cenario:
+    """Um dia simulado: horários no relógio do servidor, desvio do relógio local e lentidão da página"""
+    dia: int
+    entrada: datetime  # campo 'ent' (relógio do servidor)
+    inicio_programa: datetime  # relógio local
+    desvio: float  # segundos: relógio do servidor - relógio local
+    atraso_pagina: float  # segundos até os campos aparecerem após cada navegação
+    latencia_comando: float  # segundos gastos em cada operação do navegador
+
+    @property
+    def saida_devida(self) -> datetime:
+        return self.entrada + timedelta(hours=6)
+
+    @property
+    def cruza_meia_noite(self) -> bool:
+        local_entrada = self.entrada - timedelta(seconds=self.desvio)
+        return (self.saida_devida.date() != self.entrada.date()
+                or self.entrada.date() != local_entrada.date()
+                or self.inicio_programa.date() != local_entrada.date())
+
+    @staticmethod
+    def sortear(dia: int, semente: int, desvio_maximo: float, lentidao_maxima: float,
+                taxa_pagina_lenta: float) -> "Cenario":
+        """Entrada em qualquer hora do dia (para cair na meia-noite com frequência) e programa aberto depois dela"""
+        sorteio = random.Random(semente * 1_000_003 + dia)
+        base = datetime.combine(date(2026, 1, 5) + timedelta(days=dia), datetime.min.time())
+        entrada = base + timedelta(seconds=sorteio.randrange(24 * 3600))
+        desvio = sorteio.uniform(-desvio_maximo, desvio_maximo)
+        inicio_programa = entrada - timedelta(seconds=desvio) + timedelta(seconds=sorteio.uniform(30, 5.5 * 3600))
+
+        lenta = sorteio.random() < taxa_pagina_lenta
+        return Cenario(
+            dia=dia,
+            entrada=entrada,
+            inicio_programa=inicio_programa,
+            desvio=desvio,
+            atraso_pagina=sorteio.uniform(0, lentidao_maxima) if lenta else sorteio.uniform(0, 1),
+            latencia_comando=sorteio.uniform(0.5, 3.0) if lenta else sorteio.uniform(0.01, 0.2)
+        )
+
+
+class BackendRoteiro(BackendNavegador):
+    """Modelo roteirizado das páginas do SISREF (login e ponto) que responde no tempo virtual"""
+
+    NOME = "roteiro"
+    MENSAGEM_CONFIRMACAO = "Deseja realmente encerrar o expediente?"
+
+    def __init__(self, cenario: Cenario, relogio: RelogioVirtual, config: Config):
+        self.cenario = cenario
+        self.relogio = relogio
+        self.url_login = config.URL_LOGIN
+        self.seletor_captcha = config.SELETOR_CAPTCHA
+        self.url = "about:blank"
+        self.pronto_em = 0.0
+        self.alerta: Optional[str] = None
+        self.saida: Optional[datetime] = None
+
+    def servidor_agora(self) -> datetime:
+        return self.relogio.agora() + timedelta(seconds=self.cenario.desvio)
+
+    def _gastar(self):
+        self.relogio.avancar(self.cenario.latencia_comando)
+
+    def _carregar(self, url: str):
+        self.url = url
+        self.pronto_em = self.relogio.monotonico() + self.cenario.atraso_pagina
+
+    def _elementos(self) -> Dict[str, str]:
+        if self.relogio.monotonico() < self.pronto_em:
+            return {}
+        if self.url == self.url_login:
+            return {"#lSiape": "", "#lSenha": "", "//button[@id='btn-enviar']": ""}
+        return {
+            "#ent": self.cenario.entrada.strftime("%H:%M:%S"),
+            "#relogio": self.servidor_agora().strftime("%H:%M:%S"),
+            "#sai": self.saida.strftime("%H:%M:%S") if self.saida else "",
+            SELETORES_BOTAO_ENCERRAR[2]: "",
+        }
+
+    def navegar(self, url: str):
+        self._gastar()
+        self._carregar(url)
+
+    @property
+    def url_atual(self) -> str:
+        return self.url
+
+    def sondar(self, seletores: List[str], padrao: Optional[str] = None,
+               exigir_clicavel: bool = False) -> Optional[dict]:
+        self._gastar()
+        elementos = self._elementos()
+        for indice, seletor in enumerate(seletores):
+            if seletor not in elementos:
+                continue
+            texto = elementos[seletor]
+            if padrao and not re.search(padrao, texto):
+                continue
+            return {"indice": indice, "seletor": seletor, "texto": texto, "valor": texto, "elemento": seletor}
+        return None
+
+    def preencher(self, seletor: str, texto: str):
+        self._gastar()
+
+    def clicar(self, elemento):
+        self._gastar()
+        if elemento == "//button[@id='btn-enviar']":
+            self._carregar(urljoin(self.url_login, "principal.php"))
+        elif elemento == SELETORES_BOTAO_ENCERRAR[2]:
+            self.alerta = self.MENSAGEM_CONFIRMACAO
+
+    def aguardar_alerta(self, timeout: float) -> Optional[str]:
+        self._gastar()
+        if not self.alerta:
+            if timeout:
+                self.relogio.dormir(timeout)
+            return None
+
+        mensagem, self.alerta = self.alerta, None
+        self.saida = self.servidor_agora()
+        return mensagem
+
+    def executar_script(self, script: str, *argumentos):
+        self._gastar()
+        if argumentos and argumentos[0] == self.seletor_captcha and self.url == self.url_login:
+            return {"valor": "A1B2", "tamanho": 4}  # CAPTCHA já digitado
+        return None
+
+    def cookies(self) -> List[dict]:
+        return []
+
+    def restaurar_sessao(self, cookies: List[dict], url: str):
+        self.navegar(url)
+
+    def recarregar(self):
+        self.navegar(self.url)
+
+    def capturar_tela(self) -> bytes:
+        return b""
+
+    def html(self) -> str:
+        return ""
+
+    def encerrar(self):
+        pass
+
+
+class SistemaInssSimulado(SistemaInss):
+    """SistemaInss no relógio virtual, com a página roteirizada no lugar do navegador"""
+
+    def __init__(self, config: Config, cenario: Cenario):
+        super().__init__(config, relogio=RelogioVirtual(cenario.inicio_programa))
+        self.pagina = BackendRoteiro(cenario, self.relogio, config)
+        self.decisao: Optional[datetime] = None
+        self.despertares_ate_decisao: Optional[int] = None
+
+    def criar_driver(self, enxuto: bool = False) -> BackendNavegador:
+        return self.pagina
+
+    def encerrar_expediente(self) -> bool:
+        self.decisao = self.pagina.servidor_agora()
+        self.despertares_ate_decisao = self.relogio.despertares
+        return super().encerrar_expediente()
+
+
+def config_simulacao(diretorio: str) -> Config:
+    """Config da simulação: sem CAPTCHA nem vigia de memória, com todos os arquivos dentro de 'diretorio'"""
+    return Config(
+        URL_LOGIN="https://sisref.simulado/entrada.php",
+        TEMPO_ESPERA_CAPTCHA=0,
+        SAIR_APOS_CALCULAR_HORARIO=False,
+        MODO_AGENDADOR=True,  # com consultas a cada 5s são ~4 mil despertares por dia (use --config)
+        USAR_CHECKPOINT=False,
+        VIGIAR_MEMORIA=False,
+        USAR_TIMEOUTS_ADAPTATIVOS=False,
+        ARQUIVO_CHECKPOINT=os.path.join(diretorio, "checkpoint_ponto.json"),
+        ARQUIVO_CACHE_SELETORES=os.path.join(diretorio, "cache_seletores.json"),
+        ARQUIVO_METRICAS_WEBDRIVER=os.path.join(diretorio, "metricas_webdriver.json"),
+        ARQUIVO_TIMEOUTS=os.path.join(diretorio, "timeouts_adaptativos.json"),
+        DIRETORIO_DEBUG=os.path.join(diretorio, "debug")
+    )
+
+
+def simular_dia(cenario: Cenario, config: Config, tolerancia: float) -> dict:
+    """Executa um expediente simulado e mede despertares e latência da decisão de sair"""
+    inicio = time.perf_counter()
+    sistema = SistemaInssSimulado(config, cenario)
+    try:
+        sucesso = sistema.executar()
+        erro = None
+    except LimiteSimulacaoError as e:
+        sucesso, erro = False, str(e)
+
+    saida = sistema.pagina.saida
+    resultado = asdict(cenario)
+    resultado.update({
+        "entrada": cenario.entrada.isoformat(),
+        "inicio_programa": cenario.inicio_programa.isoformat(),
+        "saida_devida": cenario.saida_devida.isoformat(),
+        "cruza_meia_noite": cenario.cruza_meia_noite,
+        "sucesso": bool(sucesso),
+        "erro": erro,
+        "despertares": sistema.relogio.despertares,
+        "despertares_ate_decisao": sistema.despertares_ate_decisao,
+        "latencia_decisao": (sistema.decisao - cenario.saida_devida).total_seconds() if sistema.decisao else None,
+        "latencia_registro": (saida - cenario.saida_devida).total_seconds() if saida else None,
+        "saida_antecipada": bool(saida and saida < cenario.saida_devida),
+        "saida_atrasada": bool(saida and (saida - cenario.saida_devida).total_seconds() > tolerancia),
+        "tempo_real": time.perf_counter() - inicio,
+    })
+    return resultado
+
+
+def resumir(dias: List[dict]) -> dict:
+    """Totais, despertares e latências (média, p95 e máximo) do conjunto de dias"""
+    def estatisticas(chave: str) -> Optional[dict]:
+        valores = [dia[chave] for dia in dias if dia[chave] is not None]
+        if not valores:
+            return None
+        return {"media": statistics.mean(valores), "p95": percentil(valores, 0.95), "maximo": max(valores)}
+
+    meia_noite = [dia for dia in dias if dia["cruza_meia_noite"]]
+    return {
+        "dias": len(dias),
+        "sucessos": sum(1 for dia in dias if dia["sucesso"]),
+        "saidas_antecipadas": sum(1 for dia in dias if dia["saida_antecipada"]),
+        "saidas_atrasadas": sum(1 for dia in dias if dia["saida_atrasada"]),
+        "dias_meia_noite": len(meia_noite),
+        "sucessos_meia_noite": sum(1 for dia in meia_noite
+                                   if dia["sucesso"] and not dia["saida_antecipada"] and not dia["saida_atrasada"]),
+        "despertares": estatisticas("despertares"),
+        "latencia_decisao": estatisticas("latencia_decisao"),
+        "latencia_registro": estatisticas("latencia_registro"),
+        "tempo_real_total": sum(dia["tempo_real"] for dia in dias),
+    }
+
+
+def main():
+    """Executa a simulação pela linha de comando"""
+    parser = argparse.ArgumentParser(description="Simula expedientes completos em tempo virtual")
+    parser.add_argument("--dias", type=int, default=1000)
+    parser.add_argument("--semente", type=int, default=1)
+    parser.add_argument("--desvio-maximo", type=float, default=120,
+                        help="desvio máximo entre o relógio do servidor e o local (segundos)")
+    parser.add_argument("--lentidao-maxima", type=float, default=12,
+                        help="atraso máximo (segundos) até os campos aparecerem numa página lenta")
+    parser.add_argument("--taxa-pagina-lenta", type=float, default=0.1)
+    parser.add_argument("--tolerancia", type=float, default=60,
+                        help="segundos após o horário devido a partir dos quais a saída conta como atrasada")
+    parser.add_argument("--config", action="append", default=[], metavar="CHAVE=VALOR",
+                        help="sobrescreve um campo da Config (ex.: MODO_AGENDADOR=false; pode repetir)")
+    parser.add_argument("--detalhado", action="store_true", help="mostra o log do sistema em cada dia")
+    parser.add_argument("--saida", help="grava o resultado de cada dia em JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.detalhado else logging.CRITICAL,
+                        format='%(asctime)s - %(levelname)s - %(message)s',
+                        handlers=[logging.StreamHandler(sys.stdout)])
+
+    dias = []
+    with tempfile.TemporaryDirectory(prefix="simulacao_expediente_") as diretorio:
+        config = config_simulacao(diretorio)
+        aplicar_sobrescritas(config, args.config)
+
+        for dia in range(args.dias):
+            cenario = Cenario.sortear(dia, args.semente, args.desvio_maximo, args.lentidao_maxima,
+                                      args.taxa_pagina_lenta)
+            dias.append(simular_dia(cenario, config, args.tolerancia))
+
+    resumo = resumir(dias)
+
+    def formatar(dados: Optional[dict], casas: int = 1) -> str:
+        if not dados:
+            return "-"
+        return f"média {dados['media']:.{casas}f} | p95 {dados['p95']:.{casas}f} | máx {dados['maximo']:.{casas}f}"
+
+    print("=" * 78)
+    print(f"🧪 SIMULAÇÃO DE {resumo['dias']} EXPEDIENTES EM TEMPO VIRTUAL "
+          f"({resumo['tempo_real_total']:.1f}s de tempo real)")
+    print("=" * 78)
+    print(f"   Sucessos:                 {resumo['sucessos']}/{resumo['dias']}")
+    print(f"   Saídas antecipadas:       {resumo['saidas_antecipadas']}")
+    print(f"   Saídas atrasadas:         {resumo['saidas_atrasadas']} (mais de {args.tolerancia:.0f}s)")
+    print(f"   Cruzando a meia-noite:    {resumo['sucessos_meia_noite']}/{resumo['dias_meia_noite']} corretos")
+    print(f"   Despertares por dia:      {formatar(resumo['despertares'])}")
+    print(f"   Latência da decisão (s):  {formatar(resumo['latencia_decisao'])}")
+    print(f"   Saída registrada após (s): {formatar(resumo['latencia_registro'])}")
+
+    problemas = [dia for dia in dias if not dia["sucesso"] or dia["saida_antecipada"] or dia["saida_atrasada"]]
+    piores = problemas or sorted((dia for dia in dias if dia["latencia_decisao"] is not None),
+                                 key=lambda dia: -dia["latencia_decisao"])
+    print(f"   Dias com problema ({len(problemas)}):" if problemas else "   Maiores latências de decisão:")
+    for dia in piores[:5]:
+        latencia = "-" if dia["latencia_decisao"] is None else f"{dia['latencia_decisao']:.1f}s"
+        print(f"      dia {dia['dia']:>5}: entrada {dia['entrada']} | desvio {dia['desvio']:+.0f}s | "
+              f"atraso {dia['atraso_pagina']:.1f}s | decisão {latencia} | {dia['despertares']} despertares"
+              f"{' | ' + dia['erro'] if dia['erro'] else ''}")
+    print("=" * 78)
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump({"argumentos": vars(args), "resumo": resumo, "dias": dias}, f, indent=2, default=str)
+
+    if problemas:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+"""Confirmação do 'Encerrar Expediente': consulta única ao alerta e alerta sem texto"""
+
+import logging
+import time
+from datetime import datetime
+
+from selenium.common.exceptions import NoAlertPresentException
+
+from bater_ponto_inss import BackendNavegador, BackendSelenium, Config, SistemaInss
+from simulacao_expediente import RelogioVirtual
+
+
+class TrocaSemAlerta:
+    @property
+    def alert(self):
+        raise NoAlertPresentException("no such alert")
+
+
+class DriverSemAlerta:
+    switch_to = TrocaSemAlerta()
+
+
+def test_consulta_sem_timeout_nao_dorme_o_intervalo_do_webdriverwait():
+    inicio = time.perf_counter()
+    assert BackendSelenium(DriverSemAlerta()).aguardar_alerta(0) is None
+    assert time.perf_counter() - inicio < 0.2
+
+
+class PaginaConfirmacaoVazia(BackendNavegador):
+    """Página do ponto cujo confirm() abre sem texto ao clicar em 'Encerrar'"""
+
+    def __init__(self):
+        self.alerta = None
+        self.saida = ""
+
+    @property
+    def url_atual(self):
+        return "https://sisref.inss.gov.br/principal.php"
+
+    def sondar(self, seletores, padrao=None, exigir_clicavel=False):
+        return {"indice": 0, "seletor": seletores[0], "texto": self.saida, "valor": self.saida,
+                "elemento": seletores[0]}
+
+    def clicar(self, elemento):
+        self.alerta = ""
+
+    def aguardar_alerta(self, timeout):
+        if self.alerta is None:
+            return None
+        mensagem, self.alerta = self.alerta, None
+        self.saida = "17:00:00"
+        return mensagem
+
+    def encerrar(self):
+        pass
+
+
+def test_alerta_sem_texto_conta_como_confirmacao(tmp_path, caplog):
+    config = Config(USAR_CHECKPOINT=False, VIGIAR_MEMORIA=False, USAR_TIMEOUTS_ADAPTATIVOS=False,
+                    ARQUIVO_CACHE_SELETORES=str(tmp_path / "cache_seletores.json"),
+                    DIRETORIO_DEBUG=str(tmp_path / "debug"))
+    relogio = RelogioVirtual(datetime(2026, 3, 2, 17, 0, 0))
+    sistema = SistemaInss(config, relogio=relogio)
+    sistema.navegador = PaginaConfirmacaoVazia()
+
+    with caplog.at_level(logging.INFO):
+        assert sistema.encerrar_expediente() is True
+
+    assert "🟢 Expediente encerrado com sucesso!" in caplog.messages
+    assert not any("sem confirmação" in mensagem for mensagem in caplog.messages)
+    assert relogio.monotonico() < 1
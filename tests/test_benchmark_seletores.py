@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark offline dos seletores: mesma regra de acerto da SondaDOM"""
+
+from benchmark_seletores import Estrategia, estrategias, imprimir, montar_arvore
+
+
+def estrategia_relogio(seletores):
+    valido = next(estrategia for estrategia in estrategias() if estrategia.nome == "relogio").valido
+    return Estrategia("relogio", seletores, valido)
+
+
+def test_input_sem_value_nao_derruba_a_avaliacao():
+    estrategia = estrategia_relogio(["*[id*='hora']"])
+
+    estrategia.avaliar("pagina", montar_arvore('<input id="hora_extra"><span id="hora">10:11:12</span>'))
+
+    assert estrategia.resumo()["resolvidas"] == 1
+
+
+def test_seletor_acerta_em_qualquer_elemento_encontrado():
+    estrategia = estrategia_relogio(["span[class*='hora']"])
+
+    estrategia.avaliar("pagina", montar_arvore(
+        '<span class="hora-label">Hora</span><span class="hora">10:11:12</span>'))
+
+    assert estrategia.resumo()["resolvidas"] == 1
+    assert estrategia.acertos["span[class*='hora']"] == 1
+
+
+def test_nenhuma_pagina_avaliada_nao_calcula_percentil(capsys):
+    estrategia = estrategia_relogio(["#hora"])
+
+    resumo = estrategia.resumo()
+    imprimir({"relogio": resumo})
+
+    assert resumo["paginas"] == 0
+    assert resumo["resolucao_p50_ms"] is None
+    assert resumo["resolucao_p95_ms"] is None
+    assert "p50 - ms, p95 - ms" in capsys.readouterr().out
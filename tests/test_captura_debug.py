@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+"""Capturas de debug: deduplicação com o relógio ao vivo e retenção por captura"""
+
+import os
+
+from bater_ponto_inss import CapturaDebugAssincrona
+
+PAGINA = '<html><body><span id="ent">08:00:00</span><span id="relogio">{}</span></body></html>'
+
+
+def gravar(captura, timestamp, relogio, screenshot=b"png"):
+    captura._gravar_item(timestamp, screenshot + relogio.encode(), PAGINA.format(relogio))
+
+
+def test_relogio_ao_vivo_nao_impede_a_deduplicacao(tmp_path):
+    captura = CapturaDebugAssincrona(str(tmp_path))
+
+    gravar(captura, "20260302_100000_000", "10:00:00")
+    gravar(captura, "20260302_100005_000", "10:00:05")
+
+    assert len(os.listdir(tmp_path)) == 2  # um screenshot e um HTML
+
+
+def test_retencao_remove_screenshot_e_html_juntos(tmp_path):
+    captura = CapturaDebugAssincrona(str(tmp_path), max_arquivos=3)
+
+    for indice in range(3):
+        captura._gravar_item(f"20260302_10000{indice}_000", b"png%d" % indice, f"<p>pagina {indice}</p>")
+        for nome in os.listdir(tmp_path):
+            if f"_10000{indice}_" in nome:
+                os.utime(tmp_path / nome, (1000 + indice, 1000 + indice))
+
+    # Três capturas (seis arquivos) com limite de três arquivos: sobra só a última, inteira
+    nomes = sorted(os.listdir(tmp_path))
+    assert [nome.split("_")[1] for nome in nomes] == ["pagina", "screenshot"]
+    assert all("_100002_" in nome for nome in nomes)
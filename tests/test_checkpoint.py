@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+"""Retomada pelo checkpoint: saída já registrada à mão depois de uma queda"""
+
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from bater_ponto_inss import BackendNavegador, CheckpointPonto, Config, SistemaInss
+from simulacao_expediente import RelogioVirtual
+
+
+class PaginaPonto(BackendNavegador):
+    """Página do ponto com entrada, relógio e, se informada, a saída já preenchida"""
+
+    def __init__(self, saida=""):
+        self.saida = saida
+        self.cliques = 0
+
+    @property
+    def url_atual(self):
+        return "https://sisref.inss.gov.br/principal.php"
+
+    def cookies(self):
+        return []
+
+    def restaurar_sessao(self, cookies, url):
+        pass
+
+    def sondar(self, seletores, padrao=None, exigir_clicavel=False):
+        valor = self.saida if seletores == ["#sai"] else "09:00:00"
+        return {"indice": 0, "seletor": seletores[0], "texto": valor, "valor": valor, "elemento": seletores[0]}
+
+    def clicar(self, elemento):
+        self.cliques += 1
+
+    def encerrar(self):
+        pass
+
+
+class SistemaRetomado(SistemaInss):
+    def __init__(self, config, relogio, pagina):
+        super().__init__(config, relogio=relogio)
+        self.pagina = pagina
+        self.monitoramentos = 0
+
+    def criar_driver(self, enxuto=False):
+        return self.pagina
+
+    def monitorar_relogio(self, retomado=False):
+        self.monitoramentos += 1
+        return True
+
+
+@pytest.fixture
+def config(tmp_path):
+    return Config(USAR_CHECKPOINT=True, SAIR_APOS_CALCULAR_HORARIO=False, VIGIAR_MEMORIA=False,
+                  USAR_TIMEOUTS_ADAPTATIVOS=False, ARQUIVO_CHECKPOINT=str(tmp_path / "checkpoint_ponto.json"),
+                  ARQUIVO_CACHE_SELETORES=str(tmp_path / "cache_seletores.json"),
+                  DIRETORIO_DEBUG=str(tmp_path / "debug"))
+
+
+@pytest.fixture
+def relogio(config):
+    # Programa reaberto depois do horário de saída gravado no checkpoint
+    relogio = RelogioVirtual(datetime(2026, 3, 2, 16, 0, 0))
+    entrada = datetime(2026, 3, 2, 9, 0, 0)
+    CheckpointPonto(config.ARQUIVO_CHECKPOINT, relogio).salvar({
+        "horario_entrada": entrada.isoformat(),
+        "horario_saida_calculado": (entrada + timedelta(hours=6)).isoformat(),
+        "url": "https://sisref.inss.gov.br/principal.php",
+        "cookies": [],
+    })
+    return relogio
+
+
+def test_saida_ja_registrada_descarta_o_checkpoint_sem_clicar(config, relogio):
+    pagina = PaginaPonto(saida="15:02:10")
+    sistema = SistemaRetomado(config, relogio, pagina)
+
+    assert sistema.executar() is True
+    assert pagina.cliques == 0
+    assert sistema.monitoramentos == 0
+    assert not os.path.exists(config.ARQUIVO_CHECKPOINT)
+
+
+def test_saida_vazia_retoma_o_monitoramento(config, relogio):
+    sistema = SistemaRetomado(config, relogio, PaginaPonto())
+
+    assert sistema.executar() is True
+    assert sistema.monitoramentos == 1
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+"""Encerramento pelo núcleo de eventos: só conta como saída se o campo 'sai' chegar"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from bater_ponto_inss import NucleoEventosNavegador, RelógioPontoManager, SessaoExpiradaError
+from simulacao_expediente import RelogioVirtual
+
+CAMINHO_LOGIN = "/sisref/entrada.php"
+
+
+class ContextoNavegacao:
+    """browsing_context do BiDi: guarda as respostas dadas aos alertas"""
+
+    def __init__(self, falhar=False):
+        self.falhar = falhar
+        self.respostas = []
+
+    def handle_user_prompt(self, context=None, accept=True):
+        if self.falhar:
+            raise RuntimeError("no such alert")
+        self.respostas.append(accept)
+
+
+class DriverFalso:
+    """Ao clicar no botão, abre o confirm() e a página reage como indicado"""
+
+    def __init__(self, reacao, falhar_aceite=False):
+        self.reacao = reacao
+        self.browsing_context = ContextoNavegacao(falhar_aceite)
+        self.nucleo = None
+
+    def execute_script(self, script, *argumentos):
+        self.nucleo._ao_alerta({"context": "aba", "message": "Deseja encerrar o expediente?"})
+        self.nucleo.loop.call_soon_threadsafe(self.reacao, self.nucleo)
+
+
+class SistemaFalso:
+    def localizar_botao_encerrar(self):
+        return "botao"
+
+
+def encerrar(reacao, falhar_aceite=False, timeout=None):
+    driver = DriverFalso(reacao, falhar_aceite)
+    nucleo = NucleoEventosNavegador(driver, RelógioPontoManager(), CAMINHO_LOGIN)
+    driver.nucleo = nucleo
+
+    async def rodar():
+        nucleo.loop = asyncio.get_running_loop()
+        nucleo._mudanca = asyncio.Event()
+        if timeout is not None:
+            aguardar = nucleo.aguardar
+            nucleo.aguardar = lambda condicao, _: aguardar(condicao, timeout)
+        return await nucleo.encerrar(SistemaFalso())
+
+    return asyncio.run(rodar()), driver, nucleo
+
+
+def registrar_saida(nucleo):
+    nucleo._despachar({"tipo": "campo", "id": "sai", "valor": "17:30"}, 0.0)
+
+
+def voltar_ao_login(nucleo):
+    nucleo._despachar({"tipo": "pagina", "caminho": CAMINHO_LOGIN}, 0.0)
+
+
+def test_saida_registrada():
+    resultado, driver, nucleo = encerrar(registrar_saida)
+    assert resultado is True
+    assert driver.browsing_context.respostas == [True]
+    assert nucleo.alertas_aceitos == 1
+
+
+def test_clique_na_pagina_de_login_nao_conta_como_saida():
+    with pytest.raises(SessaoExpiradaError):
+        encerrar(voltar_ao_login)
+
+
+def test_aceite_que_falha_nao_conta_como_saida():
+    resultado, _, _ = encerrar(lambda nucleo: None, falhar_aceite=True, timeout=0.2)
+    assert resultado is None
+
+
+def test_alerta_fora_do_encerramento_e_descartado():
+    driver = DriverFalso(None)
+    nucleo = NucleoEventosNavegador(driver, RelógioPontoManager(), CAMINHO_LOGIN)
+
+    async def rodar():
+        nucleo.loop = asyncio.get_running_loop()
+        nucleo._alerta_aberto({"context": "aba", "message": "Usuário ou senha inválidos"})
+        await asyncio.sleep(0.1)
+
+    asyncio.run(rodar())
+    assert driver.browsing_context.respostas == [False]
+    assert nucleo.alertas_descartados == 1
+    assert nucleo.alertas_aceitos == 0
+
+
+def test_horario_atual_anda_com_o_relogio_injetado():
+    relogio = RelogioVirtual(datetime(2026, 3, 2, 14, 0, 0))
+    nucleo = NucleoEventosNavegador(DriverFalso(None), RelógioPontoManager(relogio=relogio), CAMINHO_LOGIN, relogio)
+
+    async def rodar():
+        nucleo.loop = asyncio.get_running_loop()
+        nucleo._mudanca = asyncio.Event()
+        nucleo._despachar({"tipo": "relogio", "texto": "14:00:05"}, relogio.monotonico())
+
+    asyncio.run(rodar())
+    relogio.avancar(90)
+    assert nucleo.horario_atual() == datetime(2026, 3, 2, 14, 1, 35)
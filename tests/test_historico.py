@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+"""Histórico local em SQLite: datas tiradas do relógio injetado"""
+
+from datetime import date, datetime
+
+from bater_ponto_inss import Config, HistoricoPonto, RegistroDia, SistemaInss
+from simulacao_expediente import RelogioVirtual
+
+
+def registro(dia: date) -> RegistroDia:
+    return RegistroDia(dia, datetime.combine(dia, datetime.min.time()).replace(hour=9),
+                       datetime.combine(dia, datetime.min.time()).replace(hour=15, minute=30))
+
+
+def test_gravar_usa_o_relogio_injetado(tmp_path):
+    relogio = RelogioVirtual(datetime(2031, 7, 1, 8, 0, 0))
+    historico = HistoricoPonto(str(tmp_path / "historico.db"), relogio)
+    try:
+        historico.gravar([registro(date(2031, 6, 30))])
+        (sincronizado_em,) = historico.conexao.execute("SELECT sincronizado_em FROM registros").fetchone()
+    finally:
+        historico.fechar()
+
+    assert sincronizado_em == "2031-07-01T08:00:00"
+
+
+def test_sincronizacao_em_dia_pelo_relogio_injetado(tmp_path):
+    config = Config(ARQUIVO_HISTORICO=str(tmp_path / "historico.db"), USAR_CHECKPOINT=False, VIGIAR_MEMORIA=False,
+                    USAR_TIMEOUTS_ADAPTATIVOS=False, ARQUIVO_CACHE_SELETORES=str(tmp_path / "cache_seletores.json"),
+                    DIRETORIO_DEBUG=str(tmp_path / "debug"))
+    relogio = RelogioVirtual(datetime(2020, 1, 10, 20, 0, 0))
+    historico = HistoricoPonto(config.ARQUIVO_HISTORICO, relogio)
+    historico.gravar([registro(date(2020, 1, 10))])
+    historico.fechar()
+
+    # No relógio virtual o último dia completo é hoje: nada a baixar, sem abrir navegador
+    sistema = SistemaInss(config, relogio=relogio)
+    assert sistema.sincronizar_historico() is True
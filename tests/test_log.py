@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+"""Filtro de mensagens repetidas: só as linhas periódicas do monitoramento são suprimidas"""
+
+import logging
+
+from bater_ponto_inss import FiltroMensagensRepetidas
+
+
+def registro(mensagem, **extra):
+    record = logging.LogRecord("teste", logging.INFO, __file__, 1, mensagem, None, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_linhas_periodicas_repetidas_sao_suprimidas():
+    filtro = FiltroMensagensRepetidas(30)
+
+    assert filtro.filter(registro("🕐 Horário atual: 10:00:00 | Tempo restante: 01:00:00", repetivel=True))
+    assert not filtro.filter(registro("🕐 Horário atual: 10:00:05 | Tempo restante: 00:59:55", repetivel=True))
+
+
+def test_mensagens_comuns_nunca_sao_suprimidas():
+    filtro = FiltroMensagensRepetidas(30)
+
+    assert filtro.filter(registro("Tentativa de login 1/3"))
+    assert filtro.filter(registro("Tentativa de login 2/3"))
+    assert filtro.filter(registro("⏳ Preencha o CAPTCHA manualmente em até 6 segundos..."))
+    assert filtro.filter(registro("⏳ Preencha o CAPTCHA manualmente em até 6 segundos..."))
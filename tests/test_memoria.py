@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+
+"""Perfil de economia de memória e vigia de memória do navegador"""
+
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+import bater_ponto_inss
+from bater_ponto_inss import BackendNavegador, Config, SistemaInss, VigiaMemoria, WebDriverManager
+from simulacao_expediente import RelogioVirtual
+
+MB = 1024 * 1024
+
+
+class DriverFalso:
+    def __init__(self, options):
+        self.options = options
+
+    def execute_script(self, script):
+        pass
+
+
+@pytest.fixture
+def chrome_falso(monkeypatch):
+    monkeypatch.setattr(bater_ponto_inss, "webdriver", SimpleNamespace(Chrome=DriverFalso))
+
+
+def test_perfil_economia_memoria_adiciona_todas_as_flags(chrome_falso):
+    argumentos = WebDriverManager.criar_driver(economia_memoria=True).options.arguments
+
+    for flag in WebDriverManager.ARGUMENTOS_ECONOMIA_MEMORIA:
+        assert argumentos.count(flag) == 1
+    # O Chrome só considera o último --disable-features: as funções desativadas precisam estar numa flag só
+    assert len([argumento for argumento in argumentos if argumento.startswith("--disable-features=")]) == 1
+
+
+def test_perfil_padrao_nao_usa_flags_de_economia(chrome_falso):
+    argumentos = WebDriverManager.criar_driver().options.arguments
+
+    assert not set(WebDriverManager.ARGUMENTOS_ECONOMIA_MEMORIA) & set(argumentos)
+
+
+class NavegadorFalso:
+    NOME = "falso"
+
+    def pid(self):
+        return 4242
+
+
+@pytest.fixture
+def rss(monkeypatch):
+    """RSS devolvido pelo rss_arvore: altere medido['bytes'] entre as amostras"""
+    medido = {"bytes": 0}
+    monkeypatch.setattr(VigiaMemoria, "rss_arvore", staticmethod(lambda pid: (medido["bytes"], 3)))
+    return medido
+
+
+def test_amostrar_abaixo_do_teto_nao_age(rss):
+    vigia = VigiaMemoria(intervalo=0, teto_bytes=500 * MB)
+    rss["bytes"] = 400 * MB
+
+    assert vigia.amostrar(NavegadorFalso()) is None
+    assert vigia.pico == 400 * MB
+
+
+def test_amostrar_recarrega_e_depois_recicla(rss):
+    vigia = VigiaMemoria(intervalo=0, teto_bytes=500 * MB)
+    navegador = NavegadorFalso()
+    rss["bytes"] = 600 * MB
+
+    assert vigia.amostrar(navegador) == "recarregar"
+    assert vigia.amostrar(navegador) == "reciclar"  # a recarga não bastou
+    assert vigia.amostrar(navegador) == "recarregar"  # driver novo: começa de novo pela recarga
+    assert (vigia.recargas, vigia.reciclagens) == (2, 1)
+
+
+def test_recarga_que_resolve_nao_leva_a_reciclagem(rss):
+    vigia = VigiaMemoria(intervalo=0, teto_bytes=500 * MB)
+    navegador = NavegadorFalso()
+
+    rss["bytes"] = 600 * MB
+    assert vigia.amostrar(navegador) == "recarregar"
+    rss["bytes"] = 300 * MB
+    assert vigia.amostrar(navegador) is None
+    rss["bytes"] = 600 * MB
+    assert vigia.amostrar(navegador) == "recarregar"
+    assert vigia.reciclagens == 0
+
+
+def test_amostrar_respeita_o_intervalo(rss):
+    vigia = VigiaMemoria(intervalo=3600, teto_bytes=500 * MB)
+    rss["bytes"] = 600 * MB
+
+    assert vigia.amostrar(NavegadorFalso()) == "recarregar"
+    assert vigia.amostrar(NavegadorFalso()) is None
+    assert len(vigia.amostras) == 1
+
+
+def test_amostrar_sem_processo_desativa_o_vigia(rss):
+    class SemProcesso(NavegadorFalso):
+        def pid(self):
+            return None
+
+    vigia = VigiaMemoria(intervalo=0, teto_bytes=500 * MB)
+
+    assert vigia.amostrar(SemProcesso()) is None
+    rss["bytes"] = 600 * MB
+    assert vigia.amostrar(NavegadorFalso()) is None  # continua desativado
+
+
+def test_tendencia_mb_hora():
+    vigia = VigiaMemoria()
+    vigia.amostras = [(0, 100 * MB), (1800, 110 * MB), (3600, 120 * MB)]
+
+    assert vigia.tendencia_mb_hora() == pytest.approx(20)
+
+
+def test_tendencia_sem_amostras_suficientes():
+    vigia = VigiaMemoria()
+    assert vigia.tendencia_mb_hora() == 0.0
+    vigia.amostras = [(0, 100 * MB), (0, 120 * MB)]
+    assert vigia.tendencia_mb_hora() == 0.0
+
+
+def test_intervalo_medido_no_relogio_injetado(rss):
+    relogio = RelogioVirtual(datetime(2026, 3, 2, 9, 0, 0))
+    vigia = VigiaMemoria(intervalo=60, teto_bytes=500 * MB, relogio=relogio)
+    rss["bytes"] = 600 * MB
+
+    assert vigia.amostrar(NavegadorFalso()) == "recarregar"
+    relogio.avancar(30)
+    assert vigia.amostrar(NavegadorFalso()) is None
+    relogio.avancar(31)
+    assert vigia.amostrar(NavegadorFalso()) == "reciclar"
+
+
+class PaginaPonto(BackendNavegador):
+    """Navegador já na página do ponto; 'falhar' faz a restauração da sessão dar erro"""
+
+    def __init__(self, falhar=False):
+        self.falhar = falhar
+        self.encerrado = False
+
+    @property
+    def url_atual(self):
+        return "https://sisref.inss.gov.br/principal.php"
+
+    def cookies(self):
+        return [{"name": "PHPSESSID", "value": "abc", "path": "/"}]
+
+    def restaurar_sessao(self, cookies, url):
+        if self.falhar:
+            raise WebDriverException("chrome not reachable")
+
+    def sondar(self, seletores, padrao=None, exigir_clicavel=False):
+        return {"indice": 0, "seletor": seletores[0], "texto": "09:00:00", "valor": "09:00:00",
+                "elemento": seletores[0]}
+
+    def encerrar(self):
+        self.encerrado = True
+
+
+class SistemaTroca(SistemaInss):
+    def __init__(self, config, novo):
+        super().__init__(config)
+        self.novo = novo
+
+    def criar_driver(self, enxuto=False):
+        return self.novo
+
+
+@pytest.fixture
+def config(tmp_path):
+    return Config(USAR_CHECKPOINT=False, VIGIAR_MEMORIA=False, USAR_TIMEOUTS_ADAPTATIVOS=False,
+                  ARQUIVO_CACHE_SELETORES=str(tmp_path / "cache_seletores.json"),
+                  DIRETORIO_DEBUG=str(tmp_path / "debug"))
+
+
+def test_troca_do_navegador_fecha_o_antigo_so_depois_do_novo(config):
+    antigo, novo = PaginaPonto(), PaginaPonto()
+    sistema = SistemaTroca(config, novo)
+    sistema.navegador = antigo
+
+    assert sistema.reciclar_driver() is True
+    assert sistema.navegador is novo
+    assert antigo.encerrado and not novo.encerrado
+
+
+def test_troca_que_falha_mantem_o_navegador_atual(config):
+    antigo, novo = PaginaPonto(), PaginaPonto(falhar=True)
+    sistema = SistemaTroca(config, novo)
+    sistema.navegador = antigo
+
+    assert sistema.reciclar_driver() is False
+    assert sistema.navegador is antigo
+    assert novo.encerrado and not antigo.encerrado
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+
+"""Monitoramento do relógio: sessão expirada, leituras que falham e limites do backoff"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from selenium.common.exceptions import TimeoutException
+
+from bater_ponto_inss import BackendNavegador, Config, CredenciaisManager, SessaoExpiradaError, SistemaInss
+from simulacao_expediente import RelogioVirtual
+
+
+class ClienteExpirado:
+    """Sessão HTTP cujo cookie já expirou: toda leitura cai no login"""
+
+    requisicoes = 0
+    encerrado = False
+
+    def ler_texto_relogio(self, url):
+        raise SessaoExpiradaError("Sessão expirada: redirecionado para entrada.php")
+
+    def encerrar(self):
+        self.encerrado = True
+
+
+class PaginaRelogio(BackendNavegador):
+    """Página do ponto com o relógio no horário do relógio virtual"""
+
+    def __init__(self, relogio):
+        self.relogio = relogio
+
+    def sondar(self, seletores, padrao=None, exigir_clicavel=False):
+        texto = self.relogio.agora().strftime("%H:%M:%S")
+        return {"indice": 0, "seletor": seletores[0], "texto": texto, "valor": texto, "elemento": seletores[0]}
+
+    def encerrar(self):
+        pass
+
+
+class SistemaTeste(SistemaInss):
+    def __init__(self, config, relogio):
+        super().__init__(config, relogio=relogio)
+        self.logins = 0
+        self.encerramentos = 0
+
+    def criar_driver(self, enxuto=False):
+        return PaginaRelogio(self.relogio)
+
+    def realizar_login(self):
+        self.logins += 1
+        return True
+
+    def encerrar_expediente(self):
+        self.encerramentos += 1
+        return True
+
+
+@pytest.fixture
+def config(tmp_path):
+    return Config(
+        USAR_CHECKPOINT=False,
+        VIGIAR_MEMORIA=False,
+        USAR_TIMEOUTS_ADAPTATIVOS=False,
+        MODO_SESSAO_HTTP=False,
+        ARQUIVO_CACHE_SELETORES=str(tmp_path / "cache_seletores.json"),
+        DIRETORIO_DEBUG=str(tmp_path / "debug"),
+    )
+
+
+@pytest.fixture
+def sistema(config):
+    relogio = RelogioVirtual(datetime(2026, 3, 2, 13, 0, 0))
+    sistema = SistemaTeste(config, relogio)
+    entrada = relogio.agora() - timedelta(hours=5, minutes=59)
+    sistema.relogio_manager.restaurar(entrada, entrada + timedelta(hours=6))
+    return sistema
+
+
+def test_sessao_expirada_propaga_pelas_leituras(sistema):
+    sistema.cliente_http = ClienteExpirado()
+
+    with pytest.raises(SessaoExpiradaError):
+        sistema.obter_horario_servidor()
+
+
+def test_sessao_expirada_refaz_login_e_encerra(sistema):
+    cliente = ClienteExpirado()
+    sistema.cliente_http = cliente
+
+    assert sistema.monitorar_relogio(retomado=True) is True
+    assert sistema.logins == 1
+    assert sistema.encerramentos == 1
+    assert cliente.encerrado
+    assert sistema.cliente_http is None
+
+
+class SistemaInstavel(SistemaTeste):
+    """Leituras do relógio que falham nas primeiras vezes: devolvem None (erro=None) ou lançam o erro"""
+
+    def __init__(self, config, relogio, falhas, erro):
+        super().__init__(config, relogio)
+        self.falhas = falhas
+        self.erro = erro
+        self.decisao = None
+
+    def obter_horario_servidor(self):
+        if self.falhas:
+            self.falhas -= 1
+            if self.erro:
+                raise self.erro
+            return None
+        return self.relogio.agora()
+
+    def encerrar_expediente(self):
+        self.decisao = self.relogio.agora()
+        return super().encerrar_expediente()
+
+
+def criar_instavel(config, falhas, erro=None):
+    relogio = RelogioVirtual(datetime(2026, 3, 2, 13, 0, 0))
+    sistema = SistemaInstavel(config, relogio, falhas, erro)
+    saida = relogio.agora() + timedelta(minutes=1)
+    sistema.relogio_manager.restaurar(saida - timedelta(hours=6), saida)
+    return sistema
+
+
+def test_leituras_falhas_passam_pela_politica_sem_dormir_alem_da_saida(config):
+    config.LIMITE_FALHAS_DISJUNTOR = 2
+    config.TEMPO_ABERTURA_DISJUNTOR = 300
+    sistema = criar_instavel(config, falhas=6)
+
+    assert sistema.monitorar_relogio(retomado=True) is True
+    assert sistema.politica_monitoramento.falhas == 6
+    assert sistema.politica_monitoramento.disparos_disjuntor >= 1
+    # O disjuntor abriria por 5 minutos; a espera é limitada à saída calculada
+    atraso = (sistema.decisao - sistema.relogio_manager.horario_saida_calculado).total_seconds()
+    assert 0 <= atraso < 10
+
+
+def test_erro_de_formato_no_relogio_nao_abandona_o_dia(config):
+    sistema = criar_instavel(config, falhas=1, erro=ValueError("texto inesperado"))
+
+    assert sistema.monitorar_relogio(retomado=True) is True
+    assert sistema.encerramentos == 1
+
+
+class SistemaCronometrado(SistemaInstavel):
+    """Anota o instante (virtual) de cada leitura do relógio"""
+
+    def __init__(self, config, relogio, falhas):
+        super().__init__(config, relogio, falhas, None)
+        self.leituras = []
+
+    def obter_horario_servidor(self):
+        self.leituras.append(self.relogio.agora())
+        return super().obter_horario_servidor()
+
+
+def test_disjuntor_aberto_adia_as_leituras_do_monitoramento(config):
+    config.LIMITE_FALHAS_DISJUNTOR = 2
+    config.TEMPO_ABERTURA_DISJUNTOR = 300
+    relogio = RelogioVirtual(datetime(2026, 3, 2, 13, 0, 0))
+    sistema = SistemaCronometrado(config, relogio, falhas=2)
+    saida = relogio.agora() + timedelta(hours=1)
+    sistema.relogio_manager.restaurar(saida - timedelta(hours=6), saida)
+
+    assert sistema.monitorar_relogio(retomado=True) is True
+    politica = sistema.politica_monitoramento
+    assert politica.disparos_disjuntor == 1
+    assert politica.tentativas == len(sistema.leituras)
+    # Nenhuma leitura com o disjuntor aberto: a terceira só acontece depois da pausa
+    assert (sistema.leituras[2] - sistema.leituras[1]).total_seconds() >= 300
+
+
+class NavegadorForaDoAr(BackendNavegador):
+    """Toda navegação estoura o tempo"""
+
+    def navegar(self, url):
+        raise TimeoutException("página não respondeu")
+
+    def encerrar(self):
+        pass
+
+
+class SistemaLoginFalho(SistemaInss):
+    def criar_driver(self, enxuto=False):
+        return NavegadorForaDoAr()
+
+
+def test_disjuntor_do_login_dispara_dentro_das_tentativas(config, monkeypatch):
+    monkeypatch.setattr(CredenciaisManager, "obter_credenciais", staticmethod(lambda: ("123", "senha")))
+    relogio = RelogioVirtual(datetime(2026, 3, 2, 8, 0, 0))
+    sistema = SistemaLoginFalho(config, relogio=relogio)
+    sistema.navegador = sistema.criar_driver()
+
+    assert sistema.realizar_login() is False
+    politica = sistema.politica_login
+    assert politica.tentativas == config.MAX_TENTATIVAS_LOGIN
+    # Abre antes da última tentativa e reabre quando o teste semiaberto também falha
+    assert politica.disparos_disjuntor == 2
+    # A última tentativa esperou o disjuntor ficar semiaberto
+    assert politica.tempo_backoff >= config.TEMPO_ABERTURA_DISJUNTOR
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+"""Perfil enxuto no Chrome contra o SISREF fake: o botão 'Encerrar' sem a imagem baixada"""
+
+import shutil
+from datetime import datetime, timedelta
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from bater_ponto_inss import BackendChrome, Config, SistemaInss
+from servidor_sisref_fake import ConfigServidorFake, ServidorSisrefFake, SessaoFake
+
+pytestmark = pytest.mark.skipif(
+    not any(shutil.which(nome) for nome in ("google-chrome", "chromium", "chromium-browser", "chrome")),
+    reason="Chrome não instalado")
+
+
+@pytest.fixture
+def servidor():
+    # <img> sem width/height: com a imagem bloqueada, o tamanho depende só do navegador
+    with ServidorSisrefFake(ConfigServidorFake(PORTA=0, DIMENSOES_BOTAO=False)) as servidor:
+        servidor.sessoes["sessao-teste"] = SessaoFake(entrada=datetime.now() - timedelta(hours=6))
+        yield servidor
+
+
+@pytest.mark.parametrize("sonda_lote", [True, False])
+def test_botao_encerrar_encontrado_com_imagens_bloqueadas(servidor, tmp_path, sonda_lote):
+    config = Config(URL_LOGIN=servidor.url_login, PERFIL_ENXUTO=True, USAR_SONDA_LOTE=sonda_lote,
+                    USAR_CHECKPOINT=False, VIGIAR_MEMORIA=False, USAR_TIMEOUTS_ADAPTATIVOS=False,
+                    TIMEOUT_PADRAO=5, ARQUIVO_CACHE_SELETORES=str(tmp_path / "cache_seletores.json"),
+                    DIRETORIO_DEBUG=str(tmp_path / "debug"))
+    try:
+        navegador = BackendChrome.iniciar(config, enxuto=True)
+    except WebDriverException as e:
+        pytest.skip(f"Chrome não iniciou: {e}")
+
+    sistema = SistemaInss(config)
+    sistema.navegador = navegador
+    try:
+        navegador.restaurar_sessao([{"name": "PHPSESSID", "value": "sessao-teste", "path": "/"}],
+                                   f"{servidor.url_base}/principal.php")
+        assert sistema.localizar_botao_encerrar() is not None
+        assert not servidor.estatisticas.requisicoes.get("/encerrar.png")  # a imagem foi mesmo bloqueada
+    finally:
+        navegador.encerrar()
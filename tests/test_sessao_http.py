@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""Sessão HTTP contra o SISREF fake: sessão expirada e encerramento sem navegador"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from bater_ponto_inss import ClienteSisrefHttp, Config, SessaoExpiradaError, SistemaInss
+from servidor_sisref_fake import ConfigServidorFake, ServidorSisrefFake, SessaoFake
+
+
+@pytest.fixture
+def servidor():
+    with ServidorSisrefFake(ConfigServidorFake(PORTA=0)) as servidor:
+        servidor.sessoes["sessao-teste"] = SessaoFake(entrada=datetime.now() - timedelta(hours=6))
+        yield servidor
+
+
+def cookies(id_sessao="sessao-teste"):
+    return [{"name": "PHPSESSID", "value": id_sessao, "path": "/"}]
+
+
+def test_redirecionamento_para_o_login_e_sessao_expirada(servidor):
+    cliente = ClienteSisrefHttp(cookies("vencida"), timeout=5, caminho_login="/entrada.php")
+    with pytest.raises(SessaoExpiradaError):
+        cliente.ler_pagina(f"{servidor.url_base}/principal.php")
+
+
+class ClienteSemResposta(ClienteSisrefHttp):
+    """O pedido de encerramento sai, mas a resposta se perde"""
+
+    def obter(self, url):
+        if url.endswith("/encerrar.php"):
+            super().obter(url)
+            raise ConnectionError("conexão encerrada sem resposta")
+        return super().obter(url)
+
+
+class SistemaSemNavegador(SistemaInss):
+    def __init__(self, config):
+        super().__init__(config)
+        self.reaberturas = 0
+
+    def reabrir_navegador(self):
+        self.reaberturas += 1
+        return False
+
+
+def test_encerramento_http_enviado_nunca_repete_pelo_navegador(servidor, tmp_path):
+    config = Config(URL_LOGIN=servidor.url_login, ENCERRAR_VIA_HTTP=True, USAR_CHECKPOINT=False,
+                    VIGIAR_MEMORIA=False, USAR_TIMEOUTS_ADAPTATIVOS=False,
+                    ARQUIVO_CACHE_SELETORES=str(tmp_path / "cache_seletores.json"),
+                    DIRETORIO_DEBUG=str(tmp_path / "debug"))
+    sistema = SistemaSemNavegador(config)
+    sistema.cliente_http = ClienteSemResposta(cookies(), timeout=5, caminho_login="/entrada.php")
+    sistema.url_monitorada = f"{servidor.url_base}/principal.php"
+
+    assert sistema.encerrar_expediente() is False
+    assert sistema.reaberturas == 0
+    assert servidor.estatisticas.encerramentos == 1
+
+
+def test_encerramento_http_desativado_por_padrao():
+    assert Config().ENCERRAR_VIA_HTTP is False
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+"""Expedientes simulados em tempo virtual: meia-noite, desvio do relógio local e os modos opcionais"""
+
+import logging
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from bater_ponto_inss import RelógioPontoManager
+from simulacao_expediente import Cenario, RelogioVirtual, config_simulacao, simular_dia
+
+TOLERANCIA = 60
+
+
+def cenario(entrada, desvio, depois_da_entrada=600.0, atraso_pagina=0.5, latencia_comando=0.05, dia=0):
+    """Entrada no relógio do servidor; o programa abre 'depois_da_entrada' segundos depois, no relógio local"""
+    return Cenario(
+        dia=dia,
+        entrada=entrada,
+        inicio_programa=entrada - timedelta(seconds=desvio) + timedelta(seconds=depois_da_entrada),
+        desvio=desvio,
+        atraso_pagina=atraso_pagina,
+        latencia_comando=latencia_comando
+    )
+
+
+def simular(tmp_path, dia: Cenario, **sobrescritas) -> dict:
+    config = config_simulacao(str(tmp_path))
+    for chave, valor in sobrescritas.items():
+        setattr(config, chave, valor)
+    logging.disable(logging.CRITICAL)
+    try:
+        return simular_dia(dia, config, TOLERANCIA)
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def saiu_no_horario(resultado: dict) -> bool:
+    return resultado["sucesso"] and not resultado["saida_antecipada"] and not resultado["saida_atrasada"]
+
+
+CENARIOS = {
+    # Saída devida depois da meia-noite
+    "saida_apos_meia_noite": cenario(datetime(2026, 3, 2, 20, 15, 0), desvio=0),
+    # Servidor já passou da meia-noite, relógio local ainda não (e vice-versa)
+    "servidor_adiantado_na_virada": cenario(datetime(2026, 3, 3, 0, 0, 30), desvio=90, depois_da_entrada=30),
+    "servidor_atrasado_na_virada": cenario(datetime(2026, 3, 3, 23, 59, 0), desvio=-110, depois_da_entrada=100),
+    # Programa aberto horas depois da entrada, já no dia seguinte
+    "programa_aberto_no_dia_seguinte": cenario(datetime(2026, 3, 4, 22, 0, 0), desvio=45,
+                                               depois_da_entrada=3 * 3600),
+    "pagina_lenta": cenario(datetime(2026, 3, 5, 9, 0, 0), desvio=-120, atraso_pagina=11, latencia_comando=2.5),
+}
+
+
+@pytest.mark.parametrize("nome", CENARIOS)
+def test_expediente_simulado(tmp_path, nome):
+    resultado = simular(tmp_path, CENARIOS[nome])
+    assert resultado["erro"] is None
+    assert saiu_no_horario(resultado), resultado
+
+
+@pytest.mark.parametrize("dia", range(6))
+def test_dias_sorteados(tmp_path, dia):
+    resultado = simular(tmp_path, Cenario.sortear(dia, semente=7, desvio_maximo=120, lentidao_maxima=12,
+                                                  taxa_pagina_lenta=0.3))
+    assert saiu_no_horario(resultado), resultado
+
+
+@pytest.mark.parametrize("sobrescritas", [
+    {"USAR_ESTIMADOR_RELOGIO": True},
+    {"USAR_CHECKPOINT": True},
+    {"MODO_AGENDADOR": False, "USAR_ESTIMADOR_RELOGIO": True, "USAR_CHECKPOINT": True},
+])
+def test_modos_opcionais_so_usam_o_tempo_virtual(tmp_path, sobrescritas):
+    inicio = time.perf_counter()
+    resultado = simular(tmp_path, CENARIOS["saida_apos_meia_noite"], **sobrescritas)
+    assert saiu_no_horario(resultado), resultado
+    # Seis horas simuladas: qualquer espera real (time.sleep) estouraria este limite
+    assert time.perf_counter() - inicio < 5
+
+
+def test_relogio_do_servidor_ja_no_dia_seguinte():
+    manager = RelógioPontoManager(relogio=RelogioVirtual(datetime(2026, 3, 2, 23, 59, 20)))
+    assert manager.extrair_horario_relogio("00:00:40") == datetime(2026, 3, 3, 0, 0, 40)
+
+
+def test_relogio_do_servidor_ainda_no_dia_anterior():
+    manager = RelógioPontoManager(relogio=RelogioVirtual(datetime(2026, 3, 3, 0, 0, 30)))
+    assert manager.extrair_horario_relogio("23:59:10") == datetime(2026, 3, 2, 23, 59, 10)
+
+
+def test_entrada_de_ontem_depois_da_meia_noite():
+    manager = RelógioPontoManager(relogio=RelogioVirtual(datetime(2026, 3, 3, 1, 30, 0)))
+    assert manager.extrair_horario_campo("21:00:00") == datetime(2026, 3, 2, 21, 0, 0)
+
+
+def test_entrada_depois_da_meia_noite_do_servidor_adiantado():
+    manager = RelógioPontoManager(relogio=RelogioVirtual(datetime(2026, 3, 2, 23, 59, 30)))
+    assert manager.extrair_horario_campo("00:00:30") == datetime(2026, 3, 3, 0, 0, 30)
+
+
+def test_entrada_pouco_a_frente_do_relogio_local_e_de_hoje():
+    manager = RelógioPontoManager(relogio=RelogioVirtual(datetime(2026, 3, 3, 9, 0, 0)))
+    assert manager.extrair_horario_campo("09:01:30") == datetime(2026, 3, 3, 9, 1, 30)